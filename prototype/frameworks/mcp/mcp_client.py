@@ -1,59 +1,458 @@
 # code from https://modelcontextprotocol.io/quickstart/client
 import asyncio
-from typing import Optional
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
 from contextlib import AsyncExitStack
+from urllib.parse import urlsplit
 import json
 
-from mcp import ClientSession, StdioServerParameters
+import anyio
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
 
-from openai import OpenAI
+from server_pool import ServerPool, describe_error
+
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
+# Tool calls of one model turn run concurrently, this many at a time
+MAX_TOOL_CONCURRENCY = 4
+# Seconds a single tool call may take
+TOOL_TIMEOUT = 30.0
+# Model turns per query; the last one gets no tools so it has to answer
+MAX_STEPS = 5
+# Seconds to wait for the servers at startup; slower ones keep connecting in the background
+CONNECT_TIMEOUT = 10.0
+# Reconnect backoff after a server fails, doubling up to the maximum
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+# Connected servers are pinged this often to notice ones that went away
+HEALTH_INTERVAL = 15.0
+# Between a server's name and its tool in names that collide across servers
+NAME_SEPARATOR = "__"
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """Whether an error means the session is gone rather than that one request failed."""
+    if isinstance(error, McpError):
+        return error.error.code == types.CONNECTION_CLOSED
+    return isinstance(error, (anyio.ClosedResourceError, anyio.BrokenResourceError, ConnectionError))
+
+
+class ServerConnection:
+    """One MCP server, connected and kept connected by a task of its own.
+
+    The task enters the transport and session contexts and exits them itself
+    (anyio requires it), then reconnects with backoff whenever the session is
+    lost, so a failing server never blocks the others or the chat loop. With a
+    pool, the session is leased from its warm, already initialized servers.
+    """
+
+    def __init__(self, name: str, command: Optional[str] = None, args: Optional[List[str]] = None,
+                 env: Optional[Dict[str, str]] = None, url: Optional[str] = None, pool: Optional[ServerPool] = None):
+        if not (command or url or pool):
+            raise ValueError(f"Server {name} needs a command (stdio), a url (SSE) or a server pool")
+        self.name = name
+        self.command = command
+        self.args = args or []
+        self.env = env
+        self.url = url
+        self.pool = pool
+        self.session: Optional[ClientSession] = None
+        self.tools: List[types.Tool] = []
+        self.stale = True
+        # Bumped whenever the tools change, so the merged catalog knows to rebuild
+        self.version = 0
+        self.error: Optional[BaseException] = None
+        self.attempted = asyncio.Event()
+        self.lost = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def transport(self) -> str:
+        if self.pool is not None:
+            return "pooled stdio"
+        return "sse" if self.url else "stdio"
+
+    def _transport(self):
+        """Context manager of the server's read and write streams."""
+        if self.url:
+            return sse_client(self.url)
+        return stdio_client(StdioServerParameters(command=self.command, args=self.args, env=self.env))
+
+    def start(self):
+        """Start connecting in the background."""
+        self.task = asyncio.create_task(self._run(), name=f"mcp-server-{self.name}")
+
+    async def _run(self):
+        """Connect, serve until the session is lost, and reconnect with backoff."""
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                async with AsyncExitStack() as stack:
+                    if self.pool is not None:
+                        session = await stack.enter_async_context(self.pool.lease(self._handle_message))
+                    else:
+                        read, write = await stack.enter_async_context(self._transport())
+                        session = await stack.enter_async_context(
+                            ClientSession(read, write, message_handler=self._handle_message)
+                        )
+                        await asyncio.wait_for(session.initialize(), CONNECT_TIMEOUT)
+                    self.session = session
+                    await self.refresh_tools()
+                    self.error = None
+                    self.attempted.set()
+                    delay = RECONNECT_DELAY
+                    await self._watch(session)
+            except Exception as e:
+                self.error = e
+            finally:
+                self.session = None
+                self.lost.clear()
+            self.attempted.set()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _watch(self, session: ClientSession):
+        """Return once the session is lost: a request failed on it, or a ping did."""
+        while True:
+            try:
+                await asyncio.wait_for(self.lost.wait(), HEALTH_INTERVAL)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(session.send_ping(), CONNECT_TIMEOUT)
+            except Exception as e:
+                self.error = e
+                return
+
+    async def _handle_message(self, message):
+        """Invalidate the tool catalog when the server's tool list changes."""
+        # Only mark it stale: this runs in the session's receive loop, which a
+        # list_tools request from here would wait on forever
+        if isinstance(message, types.ServerNotification) and isinstance(message.root, types.ToolListChangedNotification):
+            self.stale = True
+
+    async def _request(self, request):
+        """Await a request on the session, flagging it lost on connection errors."""
+        try:
+            return await request
+        except Exception as e:
+            if is_connection_error(e):
+                self.error = e
+                self.lost.set()
+            raise
+
+    async def refresh_tools(self) -> List[types.Tool]:
+        """List the server's tools."""
+        response = await self._request(self.session.list_tools())
+        self.tools = response.tools
+        self.stale = False
+        self.version += 1
+        return self.tools
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> types.CallToolResult:
+        """Call one of the server's tools by its own name."""
+        if self.session is None:
+            raise ConnectionError(f"server {self.name} is not connected, reconnecting in the background")
+        return await self._request(self.session.call_tool(name, arguments=arguments))
+
+    async def close(self):
+        """Stop the connection task, closing the session and transport."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+
+def server_name(target: str) -> str:
+    """Default name of a server: its script's stem or its URL's host."""
+    if target.startswith(("http://", "https://")):
+        name = urlsplit(target).netloc
+    else:
+        name = os.path.splitext(os.path.basename(target))[0]
+    return re.sub(r"[^A-Za-z0-9-]+", "_", name).strip("_") or "server"
+
+
+def parse_server(argument: str) -> ServerConnection:
+    """A server from a command-line argument: `[name=]script.py|script.js|http(s)://.../sse`."""
+    name, separator, target = argument.partition("=")
+    if not separator or "/" in name:
+        name, target = "", argument
+    name = name or server_name(target)
+
+    if target.startswith(("http://", "https://")):
+        return ServerConnection(name, url=target)
+    if target.endswith(".py"):
+        return ServerConnection(name, command="python", args=[target])
+    if target.endswith(".js"):
+        return ServerConnection(name, command="node", args=[target])
+    raise ValueError("Server script must be .py or .js, or an SSE URL")
+
+
+def load_servers(config_path: str) -> List[ServerConnection]:
+    """Servers from a JSON file in the usual `{"mcpServers": {name: {command, args, env} | {url}}}` layout."""
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    return [
+        ServerConnection(name, command=entry.get("command"), args=entry.get("args"), env=entry.get("env"), url=entry.get("url"))
+        for name, entry in config.get("mcpServers", config).items()
+    ]
+
+
+class ToolCatalog:
+    """Every connected server's tools under unique names, with the OpenAI tool array prebuilt."""
+
+    def __init__(self):
+        # Exposed name -> (server name, the server's own tool name)
+        self.routes: Dict[str, Tuple[str, str]] = {}
+        # Built once per change and passed as is to every completion
+        self.openai_tools: List[Dict[str, Any]] = []
+        # (server name, tools version) of the listings this was built from
+        self.key: Tuple[Tuple[str, int], ...] = ()
+
+    def build(self, servers: List[ServerConnection]):
+        """Merge the servers' tools; names offered by several servers get the server's name as prefix."""
+        counts: Dict[str, int] = {}
+        for server in servers:
+            for tool in server.tools:
+                counts[tool.name] = counts.get(tool.name, 0) + 1
+
+        self.routes = {}
+        self.openai_tools = []
+        for server in servers:
+            for tool in server.tools:
+                name = tool.name if counts[tool.name] == 1 else f"{server.name}{NAME_SEPARATOR}{tool.name}"
+                self.routes[name] = (server.name, tool.name)
+                self.openai_tools.append({
+                    "type": "function",
+                    "function": {
+                        "name": name,
+                        "description": tool.description or "",
+                        "parameters": tool.inputSchema,
+                    }
+                })
+        self.key = tuple((server.name, server.version) for server in servers)
+
+
+class Completion:
+    """One streamed completion: the assistant message and how fast it arrived."""
 
-class MCPClient:
     def __init__(self):
-        self.session : Optional[ClientSession] = None
-        self.exit_stack = AsyncExitStack()
-        self.openai = OpenAI(
+        self.content = ""
+        self.tool_calls: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.tokens = 0
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Seconds from sending the request to the first streamed token."""
+        if self.first_token is None:
+            return None
+        return self.first_token - self.started
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation rate after the first token."""
+        if self.first_token is None or self.finished is None or self.finished <= self.first_token:
+            return None
+        return self.tokens / (self.finished - self.first_token)
+
+    def message(self) -> Dict[str, Any]:
+        """The assistant message to append to the conversation."""
+        message = {"role": "assistant", "content": self.content or None}
+        if self.tool_calls:
+            message["tool_calls"] = self.tool_calls
+        return message
+
+    def report(self) -> str:
+        """Latency summary of the turn."""
+        ttft = self.time_to_first_token
+        rate = self.tokens_per_second
+        return (
+            f"[first token {ttft:.2f} s" if ttft is not None else "[no tokens"
+        ) + (
+            f" | {self.tokens} tokens, {rate:.1f} tokens/s]" if rate is not None else f" | {self.tokens} tokens]"
+        )
+
+
+class MCPClient:
+    def __init__(self, max_tool_concurrency: int = MAX_TOOL_CONCURRENCY, tool_timeout: float = TOOL_TIMEOUT, max_steps: int = MAX_STEPS):
+        self.servers: Dict[str, ServerConnection] = {}
+        self.catalog = ToolCatalog()
+        # Async so generating never blocks the MCP sessions (pings, notifications)
+        self.openai = AsyncOpenAI(
             api_key=os.getenv("API_KEY"),
             base_url= os.getenv("BASE_URL"),
             ) 
+        self.completions: List[Completion] = []
+        self.tool_slots = asyncio.Semaphore(max_tool_concurrency)
+        self.tool_timeout = tool_timeout
+        self.max_steps = max_steps
+        self.pools: List[ServerPool] = []
+        self.pool_starts: List[asyncio.Task] = []
     
+    async def connect(self, servers: List[ServerConnection], timeout: float = CONNECT_TIMEOUT, pool_size: int = 0):
+        """Connect to several MCP servers concurrently
+        
+        Waits up to `timeout` for the first attempts; servers that are slow or
+        fail keep (re)connecting in the background. With `pool_size`, each
+        stdio server gets a warm pool of that many processes, and its session
+        (and every reconnect) is leased from the pool.
+        """
+        deadline = time.monotonic() + timeout
+        for server in servers:
+            if server.name in self.servers:
+                raise ValueError(f"Duplicate server name {server.name}")
+            if pool_size > 0 and server.pool is None and server.url is None:
+                server.pool = ServerPool(
+                    StdioServerParameters(command=server.command, args=server.args, env=server.env), size=pool_size
+                )
+                self.pools.append(server.pool)
+                self.pool_starts.append(asyncio.create_task(server.pool.start()))
+        # Let the pools warm up first, so the first lease is a hit rather than one more spawn
+        if self.pool_starts:
+            await asyncio.wait(self.pool_starts, timeout=timeout)
+        
+        for server in servers:
+            self.servers[server.name] = server
+            server.start()
+        waiters = [asyncio.create_task(server.attempted.wait()) for server in servers]
+        _, pending = await asyncio.wait(waiters, timeout=max(deadline - time.monotonic(), 0))
+        for waiter in pending:
+            waiter.cancel()
+
+        # Greet through the servers that offer it (tool_server.py does)
+        greetings = await asyncio.gather(*[
+            server.session.read_resource("greeting://Agent_User")
+            for server in servers if server.session is not None
+        ], return_exceptions=True)
+        for response in greetings:
+            if not isinstance(response, BaseException):
+                print(response.contents[0].text)
+
+        await self.get_tools()
+        for server in servers:
+            if server.session is not None:
+                print(f"\nConnected to {server.name} ({server.transport}) with tools:", [tool.name for tool in server.tools])
+            else:
+                print(f"\n{server.name} ({server.transport}) is unavailable ({describe_error(server.error) if server.error else 'timed out'}), retrying in the background")
+
     async def connect_to_server(self, server_script_path: str):
         """Connect to an MCP server
         
         Args:
             server_script_path: Path to the server script (.py or .js file) 
         """
-        is_python = server_script_path.endswith(".py")
-        is_js = server_script_path.endswith(".js")
+        await self.connect([parse_server(server_script_path)])
+
+    async def refresh_tools(self) -> List[str]:
+        """List every connected server's tools again."""
+        for server in self.servers.values():
+            server.stale = True
+        await self.get_tools()
+        return list(self.catalog.routes)
 
-        if not (is_js or is_python):
-            raise ValueError("Server script must be .py or .js")
+    async def get_tools(self) -> List[Dict[str, Any]]:
+        """The merged tools in OpenAI format, listed again only from servers whose catalog is stale."""
+        connected = [server for server in self.servers.values() if server.session is not None]
+        stale = [server for server in connected if server.stale]
+        if stale:
+            await asyncio.gather(*[server.refresh_tools() for server in stale], return_exceptions=True)
+            connected = [server for server in connected if server.session is not None]
+        # Servers dropping out or reconnecting change the key too
+        if tuple((server.name, server.version) for server in connected) != self.catalog.key:
+            self.catalog.build(connected)
+        return self.catalog.openai_tools
 
-        command = "python" if is_python else "node"
-        server_params = StdioServerParameters(
-            command=command,
-            args=[server_script_path],
-            env=None
+    async def complete(self, conversation: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None) -> Completion:
+        """Stream a completion, printing its text as it arrives"""
+        completion = Completion()
+        kwargs = {"tools": tools, "tool_choice": "auto"} if tools else {}
+        stream = await self.openai.chat.completions.create(
+            model=os.getenv("MODEL_NAME"),
+            max_tokens=100,
+            messages=conversation,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
         )
 
-        stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
-        self.stdio, self.write = stdio_transport
-        self.session = await self.exit_stack.enter_async_context(ClientSession(self.stdio, self.write))
+        usage = None
+        async for chunk in stream:
+            if chunk.usage:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content or delta.tool_calls:
+                if completion.first_token is None:
+                    completion.first_token = time.perf_counter()
+                completion.tokens += 1
+            if delta.content:
+                completion.content += delta.content
+                print(delta.content, end="", flush=True)
+            # Tool calls arrive in fragments keyed by their index
+            for fragment in delta.tool_calls or []:
+                while len(completion.tool_calls) <= fragment.index:
+                    completion.tool_calls.append({"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+                tool_call = completion.tool_calls[fragment.index]
+                if fragment.id:
+                    tool_call["id"] = fragment.id
+                if fragment.function and fragment.function.name:
+                    tool_call["function"]["name"] += fragment.function.name
+                if fragment.function and fragment.function.arguments:
+                    tool_call["function"]["arguments"] += fragment.function.arguments
+
+        completion.finished = time.perf_counter()
+        # Chunks are only an estimate of tokens when the server reports no usage
+        if usage is not None and usage.completion_tokens:
+            completion.tokens = usage.completion_tokens
+        if completion.content:
+            print()
+        print(completion.report())
+        self.completions.append(completion)
+        return completion
+
+    async def call_tool(self, tool_call: Dict[str, Any]) -> str:
+        """Run one tool call from the model, returning its result (or error) as text"""
+        name = tool_call["function"]["name"]
+        try:
+            arguments = json.loads(tool_call["function"]["arguments"] or "{}")
+        except ValueError as e:
+            return f"Error: invalid JSON arguments for {name}: {e}"
+        if name not in self.catalog.routes:
+            return f"Error: unknown tool {name}"
+        server_name, tool_name = self.catalog.routes[name]
 
-        await self.session.initialize()
+        print(f"[Calling tool {name} with args {arguments}]")
+        async with self.tool_slots:
+            try:
+                result = await asyncio.wait_for(
+                    self.servers[server_name].call_tool(tool_name, arguments), self.tool_timeout
+                )
+            except asyncio.TimeoutError:
+                return f"Error: {name} timed out after {self.tool_timeout:g} s"
+            except Exception as e:
+                return f"Error: {name} failed: {describe_error(e)}"
 
-        #list available tools
-        response = await self.session.list_tools()
-        tools = response.tools
-        response = await self.session.read_resource("greeting://Agent_User")
-        print(response.contents[0].text)
-        print("\nYou are connected to a server with tools:", [tool.name for tool in tools])
+        text = "\n".join(
+            content.text if isinstance(content, types.TextContent) else content.model_dump_json()
+            for content in result.content
+        )
+        return f"Error: {text}" if result.isError else text
 
     async def process_query(self, query: str) -> str:
         """Process a query using custom client and available tools"""
@@ -63,105 +462,88 @@ class MCPClient:
                 "content": query
             }
         ]
+        final_text = []
 
-        response = await self.session.list_tools()
-        
-        available_tools = [{
-            "name": tool.name,
-            "description": tool.description,
-            "input_schema": tool.inputSchema
-        } for tool in response.tools]
-
-        #Initial LLM API Call
-        response = self.openai.chat.completions.create(
-            model=os.getenv("MODEL_NAME"),
-            max_tokens=100,
-            messages=conversation,
-            tools=available_tools,
-            tool_choice="auto"
-        )
+        for step in range(self.max_steps):
+            # On the last step, leave out the tools so the model answers
+            last_step = step == self.max_steps - 1
+            completion = await self.complete(conversation, tools=None if last_step else await self.get_tools())
+            if completion.content:
+                final_text.append(completion.content)
+            if not completion.tool_calls:
+                break
 
-        # Process response and handle tool calls
-        tool_results = []
-        final_text = []
+            for index, tool_call in enumerate(completion.tool_calls):
+                if not tool_call["id"]:
+                    tool_call["id"] = f"call_{step}_{index}"
+            conversation.append(completion.message())
 
-        for content in response.choices:
-            if content.message.content:
-                print("TEXT")
-                final_text.append(content.message.content)
-            elif content.message.tool_calls:
-                print("TOOL")
-                print(content.message.tool_calls)
-                tool_name = content.message.tool_calls[0].function.name
-                tool_args = content.message.tool_calls[0].function.arguments
-                print(tool_name)
-                print(tool_args)
-                tool_args = json.loads(tool_args)
-                print(type(tool_args))
-                #execute tool call
-                result = await self.session.call_tool(tool_name, arguments=tool_args)
-                print(result)
-                tool_results.append({"call": tool_name, "result": result})
-                final_text.append(f"[Calling tool {tool_name} with args {tool_args}]")
-
-                # # Continue conversation with tool results
-                if content.message.tool_calls:
-                    conversation.append({
-                        "role":"assistant",
-                        "content": str(content.message.tool_calls)
-                    }) 
-                
+            # Every call of the turn runs concurrently; gather keeps them in order
+            results = await asyncio.gather(*[self.call_tool(tool_call) for tool_call in completion.tool_calls])
+            for tool_call, result in zip(completion.tool_calls, results):
+                final_text.append(f"[Called tool {tool_call['function']['name']}]")
                 conversation.append({
-                    "role":"user",
-                    "content": str(result.content)
+                    "role": "tool",
+                    "tool_call_id": tool_call["id"],
+                    "content": result
                 })
 
+        return "\n".join(final_text)
 
-                #Get next response from claude
-                response = self.openai.chat.completions.create(
-                    model = os.getenv("MODEL_NAME"),
-                    max_tokens = 100,
-                    messages = conversation,
-                )
-
-                final_text.append(response.choices[0].message.content)
-            
-            return "\n".join(final_text)
-        
     async def chat_loop(self):
         """Run interactive chat loop"""
         print("\nMCP client started!")
-        print("What's on your mind? Type 'quite' to exit")
+        print("What's on your mind? Type 'quite' to exit, 'refresh' to reload the tool list")
 
         while True:
             try:
-                query = input("\nQuery: ").strip()
+                # Read in a thread so the session keeps running while we wait
+                query = (await asyncio.to_thread(input, "\nQuery: ")).strip()
 
                 if query.lower() == 'quit':
                     break
 
-                response = await self.process_query(query)
-                print("\n" + response)
+                if query.lower() == 'refresh':
+                    tools = await self.refresh_tools()
+                    print("\nTools:", tools)
+                    continue
+
+                # The answer is printed as it streams in
+                await self.process_query(query)
             
             except Exception as e:
                 print(f"\n Error: {str(e)}")
         
     async def cleanup(self):
         """Clean up resources"""
-        await self.exit_stack.aclose()
+        await asyncio.gather(*[server.close() for server in self.servers.values()])
+        await asyncio.gather(*[pool.close() for pool in self.pools])
+        await asyncio.gather(*self.pool_starts, return_exceptions=True)
 
 async def main():
-    if len(sys.argv) < 2:
-        print("Usage: python client.py <path_to_server_script>")
+    arguments = sys.argv[1:]
+    pool_size = 0
+    if "--pool-size" in arguments:
+        index = arguments.index("--pool-size")
+        pool_size = int(arguments[index + 1]) if index + 1 < len(arguments) else -1
+        del arguments[index:index + 2]
+    if not arguments or pool_size < 0:
+        print("Usage: python client.py [--pool-size N] <server> [<server> ...]")
+        print("  where a server is [name=]script.py, [name=]script.js, [name=]http://host/sse or servers.json")
+        print("  --pool-size N keeps N warm processes of each stdio server, leased on (re)connect")
         sys.exit(1)
 
+    servers = []
+    for argument in arguments:
+        servers.extend(load_servers(argument) if argument.endswith(".json") else [parse_server(argument)])
+
     client = MCPClient()
 
     try:
-        await client.connect_to_server(sys.argv[1])
+        await client.connect(servers, pool_size=pool_size)
         await client.chat_loop()
     finally:
-        await client.cleanup
+        await client.cleanup()
 
 if __name__ == "__main__":
     import sys
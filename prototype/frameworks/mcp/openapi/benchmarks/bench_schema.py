@@ -0,0 +1,113 @@
+"""Benchmark input schema generation on a large, generated OpenAPI spec.
+
+The fixture mimics specs like Stripe or Kubernetes: a deep web of
+`components/schemas` refs, some of them recursive, shared by thousands of
+operations. Run from the openapi directory:
+
+    python benchmarks/bench_schema.py --operations 4000 --components 1500
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import click
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from openapi_parser import OpenAPISpec
+from schema_compiler import SchemaCompiler
+
+
+def build_spec(operations: int, components: int, depth: int) -> dict:
+    """Generate a spec whose components reference each other `depth` levels deep."""
+    schemas = {}
+    # Components are split into `depth` layers and each one refs into the next layer
+    layer_size = max(1, components // depth)
+    for i in range(components):
+        properties = {
+            'id': {'type': 'string', 'description': f'Identifier of object {i}'},
+            'created': {'type': 'integer', 'format': 'int64'},
+            'metadata': {'type': 'object', 'additionalProperties': {'type': 'string'}},
+        }
+        next_layer = (i // layer_size + 1) * layer_size
+        if next_layer < components:
+            for step in range(3):
+                child = next_layer + (i * 7 + step) % min(layer_size, components - next_layer)
+                properties[f'child_{step}'] = {'$ref': f'#/components/schemas/Object{child}'}
+        if i % 10 == 0:
+            # A self-referencing list, like a tree node
+            properties['children'] = {'type': 'array', 'items': {'$ref': f'#/components/schemas/Object{i}'}}
+        schemas[f'Object{i}'] = {'type': 'object', 'properties': properties, 'required': ['id']}
+
+    paths = {}
+    for i in range(operations):
+        target = f'#/components/schemas/Object{i % components}'
+        paths[f'/resources{i}/{{id}}'] = {
+            'get': {
+                'operationId': f'get_resource_{i}',
+                'parameters': [
+                    {'name': 'id', 'in': 'path', 'required': True, 'schema': {'type': 'string'}},
+                    {'name': 'expand', 'in': 'query', 'schema': {'type': 'array', 'items': {'type': 'string'}}},
+                ],
+            },
+            'post': {
+                'operationId': f'update_resource_{i}',
+                'requestBody': {'content': {'application/json': {'schema': {'$ref': target}}}},
+            },
+        }
+
+    return {
+        'openapi': '3.0.0',
+        'info': {'title': 'Large benchmark spec', 'version': '1.0.0'},
+        'servers': [{'url': 'http://localhost:8080'}],
+        'paths': paths,
+        'components': {'schemas': schemas},
+    }
+
+
+def time_shared(spec_path: str) -> float:
+    """Generate every input schema with one compiler shared across operations."""
+    start = time.perf_counter()
+    api_spec = OpenAPISpec(spec_path)
+    for endpoint in api_spec.get_endpoints():
+        api_spec.generate_input_schema(endpoint)
+    return time.perf_counter() - start
+
+
+def time_per_operation(spec_path: str) -> float:
+    """Generate every input schema with a fresh compiler per operation (no shared memo)."""
+    api_spec = OpenAPISpec(spec_path)
+    start = time.perf_counter()
+    for endpoint in api_spec.get_endpoints():
+        api_spec.schema_compiler = SchemaCompiler(api_spec.spec)
+        api_spec.generate_input_schema(endpoint)
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--operations', default=4000, help='Number of paths (each has a GET and a POST)')
+@click.option('--components', default=1500, help='Number of component schemas')
+@click.option('--depth', default=8, help='Number of component layers, i.e. how deep refs nest')
+@click.option('--baseline/--no-baseline', default=True, help='Also time the unshared per-operation compiler')
+def main(operations: int, components: int, depth: int, baseline: bool) -> None:
+    """Time schema generation for growing fractions of the fixture."""
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in (0.25, 0.5, 1.0):
+            ops = max(1, int(operations * scale))
+            spec_path = os.path.join(tmp, f'spec_{ops}.json')
+            with open(spec_path, 'w') as f:
+                json.dump(build_spec(ops, components, depth), f)
+            size_mb = os.path.getsize(spec_path) / 1e6
+
+            shared = time_shared(spec_path)
+            line = f"{ops * 2:6d} operations ({size_mb:5.1f} MB): shared memo {shared * 1000:8.1f} ms"
+            if baseline:
+                unshared = time_per_operation(spec_path)
+                line += f" | per-operation compiler {unshared * 1000:8.1f} ms ({unshared / shared:4.1f}x)"
+            click.echo(line)
+
+
+if __name__ == '__main__':
+    main()
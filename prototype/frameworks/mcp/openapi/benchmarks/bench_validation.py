@@ -0,0 +1,137 @@
+"""Benchmark argument validation against the unvalidated dispatch path.
+
+Times, per call, building the request parts alone (no validation), the
+compiled validator followed by the same build, and jsonschema validation
+(what the MCP SDK runs on every call) followed by the build. Run from the
+openapi directory:
+
+    python benchmarks/bench_validation.py --calls 20000
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+import click
+import jsonschema
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from openapi_parser import OpenAPISpec
+from validation import ArgumentValidator
+
+
+def build_spec() -> dict:
+    """A small spec with a flat query operation and a nested JSON body operation."""
+    address = {
+        'type': 'object',
+        'required': ['city'],
+        'properties': {
+            'street': {'type': 'string', 'maxLength': 200},
+            'city': {'type': 'string'},
+            'zip': {'type': 'string', 'pattern': '^[0-9]{5}$'},
+        },
+    }
+    customer = {
+        'type': 'object',
+        'required': ['name', 'email'],
+        'properties': {
+            'name': {'type': 'string', 'minLength': 1},
+            'email': {'type': 'string'},
+            'age': {'type': 'integer', 'minimum': 0, 'maximum': 150},
+            'tier': {'type': 'string', 'enum': ['free', 'pro', 'enterprise']},
+            'tags': {'type': 'array', 'items': {'type': 'string'}, 'maxItems': 20},
+            'address': {'$ref': '#/components/schemas/Address'},
+            'referrer': {'$ref': '#/components/schemas/Customer'},
+        },
+    }
+    return {
+        'openapi': '3.0.0',
+        'info': {'title': 'Validation benchmark spec', 'version': '1.0.0'},
+        'servers': [{'url': 'http://localhost:8080'}],
+        'paths': {
+            '/customers': {
+                'get': {
+                    'operationId': 'list_customers',
+                    'parameters': [
+                        {'name': 'limit', 'in': 'query', 'schema': {'type': 'integer', 'minimum': 1, 'maximum': 100}},
+                        {'name': 'offset', 'in': 'query', 'schema': {'type': 'integer', 'minimum': 0}},
+                        {'name': 'tier', 'in': 'query', 'schema': {'type': 'string', 'enum': ['free', 'pro', 'enterprise']}},
+                        {'name': 'active', 'in': 'query', 'schema': {'type': 'boolean'}},
+                    ],
+                },
+                'post': {
+                    'operationId': 'create_customer',
+                    'requestBody': {'content': {'application/json': {'schema': {'$ref': '#/components/schemas/Customer'}}}},
+                },
+            },
+        },
+        'components': {'schemas': {'Address': address, 'Customer': customer}},
+    }
+
+
+CALLS = {
+    'list_customers': {'limit': 50, 'offset': 100, 'tier': 'pro', 'active': True},
+    'create_customer': {
+        'name': 'Ada',
+        'email': 'ada@example.com',
+        'age': 36,
+        'tier': 'enterprise',
+        'tags': ['math', 'engines', 'poetry'],
+        'address': {'street': '12 St James Sq', 'city': 'London', 'zip': '12345'},
+        'referrer': {'name': 'Charles', 'email': 'cb@example.com', 'address': {'city': 'London'}},
+    },
+}
+
+
+def time_per_call(run: Callable[[], Any], calls: int) -> float:
+    """Mean microseconds per call of `run`."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        run()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+@click.command()
+@click.option('--calls', default=20000, help='Calls timed per operation and path')
+def main(calls: int) -> None:
+    """Time each validation path on a flat and a nested operation."""
+    with tempfile.TemporaryDirectory() as tmp:
+        spec_path = os.path.join(tmp, 'spec.json')
+        with open(spec_path, 'w') as f:
+            json.dump(build_spec(), f)
+        api_spec = OpenAPISpec(spec_path)
+        operations = api_spec.compile_operations()
+
+        for operation_id, arguments in CALLS.items():
+            endpoint = operations[operation_id]
+            schema = api_spec.generate_input_schema(endpoint.endpoint)
+
+            start = time.perf_counter()
+            validator = ArgumentValidator(operation_id, schema)
+            compile_ms = (time.perf_counter() - start) * 1000
+            json_validator = jsonschema.validators.validator_for(schema)(schema)
+
+            def unvalidated(arguments: Dict[str, Any] = arguments) -> Any:
+                return endpoint.build_request_parts(arguments)
+
+            def compiled(arguments: Dict[str, Any] = arguments) -> Any:
+                return endpoint.build_request_parts(validator(arguments))
+
+            def with_jsonschema(arguments: Dict[str, Any] = arguments) -> Any:
+                json_validator.validate(arguments)
+                return endpoint.build_request_parts(arguments)
+
+            base = time_per_call(unvalidated, calls)
+            ours = time_per_call(compiled, calls)
+            theirs = time_per_call(with_jsonschema, max(1, calls // 10))
+            click.echo(
+                f"{operation_id:16s} no validation {base:7.2f} us | compiled {ours:7.2f} us "
+                f"(+{ours - base:6.2f}, compile {compile_ms:.2f} ms) | jsonschema {theirs:8.2f} us"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""Load-test the streamable HTTP transport at several worker counts.
+
+Starts a minimal upstream API, then for each worker count runs the server
+with `--transport http --workers N` and drives it from load generator
+processes posting `tools/call` requests to /mcp. Reports throughput and
+latency per worker count; the scaling only shows on a machine with at least
+as many cores as workers plus load generators. Run from the openapi directory:
+
+    python benchmarks/load_test.py --workers 1,2,4 --clients 4 --duration 10
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+import click
+import httpx
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'mcp_server.py')
+
+PET = json.dumps({'id': 1, 'name': 'Rex', 'tag': 'dog', 'owner': {'id': 7, 'name': 'Ada'}}).encode()
+
+HEADERS = {'Accept': 'application/json, text/event-stream', 'Content-Type': 'application/json'}
+
+
+def build_spec(upstream_port: int) -> dict:
+    """A one-operation spec pointing at the local upstream."""
+    return {
+        'openapi': '3.0.0',
+        'info': {'title': 'Load test spec', 'version': '1.0.0'},
+        'servers': [{'url': f'http://127.0.0.1:{upstream_port}'}],
+        'paths': {
+            '/pets/{petId}': {
+                'get': {
+                    'operationId': 'getPet',
+                    'parameters': [{'name': 'petId', 'in': 'path', 'required': True, 'schema': {'type': 'integer'}}],
+                },
+            },
+        },
+    }
+
+
+def free_port() -> int:
+    """An unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_upstream(port: int) -> None:
+    """Serve a fixed JSON body to every request over keep-alive HTTP/1.1."""
+    response = (
+        b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+        b'Content-Length: ' + str(len(PET)).encode() + b'\r\n\r\n' + PET
+    )
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                await reader.readuntil(b'\r\n\r\n')
+                writer.write(response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    async def serve() -> None:
+        server = await asyncio.start_server(handle, '127.0.0.1', port, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    """Poll a URL until it answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f} s")
+
+
+def generate_load(url: str, concurrency: int, duration: float) -> Tuple[int, int, List[float]]:
+    """Call the tool from `concurrency` loops for `duration` seconds: (ok, failed, latencies)."""
+
+    async def drive() -> Tuple[int, int, List[float]]:
+        ok, failed, latencies = 0, 0, []
+        deadline = time.monotonic() + duration
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+            async def loop(worker: int) -> None:
+                nonlocal ok, failed
+                request_id = 0
+                while time.monotonic() < deadline:
+                    request_id += 1
+                    payload = {
+                        'jsonrpc': '2.0',
+                        'id': request_id,
+                        'method': 'tools/call',
+                        'params': {'name': 'getPet', 'arguments': {'petId': worker}},
+                    }
+                    start = time.perf_counter()
+                    try:
+                        response = await client.post(url, json=payload, headers=HEADERS)
+                        success = response.status_code == 200 and b'"result"' in response.content
+                    except httpx.HTTPError:
+                        success = False
+                    latencies.append(time.perf_counter() - start)
+                    if success:
+                        ok += 1
+                    else:
+                        failed += 1
+
+            await asyncio.gather(*[loop(worker) for worker in range(concurrency)])
+        return ok, failed, latencies
+
+    return asyncio.run(drive())
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """The value below which `fraction` of the sorted values fall."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+@click.command()
+@click.option('--workers', 'worker_counts', default='1,2,4', help='Comma-separated worker counts to test')
+@click.option('--clients', default=4, help='Load generator processes')
+@click.option('--concurrency', default=16, help='Concurrent requests per load generator')
+@click.option('--duration', default=10.0, help='Seconds of load per worker count')
+def main(worker_counts: str, clients: int, concurrency: int, duration: float) -> None:
+    """Report throughput of the HTTP transport at each worker count."""
+    click.echo(f"{os.cpu_count()} CPUs, {clients} load generators x {concurrency} concurrent requests")
+    upstream_port = free_port()
+    upstream = multiprocessing.Process(target=run_upstream, args=(upstream_port,), daemon=True)
+    upstream.start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spec_path = os.path.join(tmp, 'spec.json')
+        with open(spec_path, 'w') as f:
+            json.dump(build_spec(upstream_port), f)
+
+        baseline = None
+        for workers in [int(count) for count in worker_counts.split(',')]:
+            port = free_port()
+            server = subprocess.Popen(
+                [
+                    sys.executable, SERVER, spec_path,
+                    '--transport', 'http', '--workers', str(workers), '--host', '127.0.0.1',
+                    '--port', str(port), '--reload-interval', '0', '--cache-dir', '',
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_until_up(f'http://127.0.0.1:{port}/tools')
+                # Let every worker finish starting before the clock runs
+                time.sleep(1.0 + 0.5 * workers)
+                with multiprocessing.Pool(clients) as pool:
+                    results = pool.starmap(
+                        generate_load, [(f'http://127.0.0.1:{port}/mcp/', concurrency, duration)] * clients
+                    )
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+            ok = sum(result[0] for result in results)
+            failed = sum(result[1] for result in results)
+            latencies = sorted(latency for result in results for latency in result[2])
+            throughput = ok / duration
+            baseline = baseline or throughput
+            click.echo(
+                f"{workers:3d} workers {throughput:9.1f} req/s (x{throughput / baseline:4.2f}) | "
+                f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms | p99 {percentile(latencies, 0.99) * 1000:7.1f} ms | "
+                f"{failed} failed"
+            )
+
+    upstream.terminate()
+
+
+if __name__ == '__main__':
+    main()
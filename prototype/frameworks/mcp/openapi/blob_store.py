@@ -0,0 +1,162 @@
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+BLOB_SCHEME = 'blob'
+
+# Default (and largest) chunk returned by one ranged read
+MAX_READ_BYTES = 1024 * 1024
+
+
+class _Blob:
+    """One stored payload, either held in memory or spilled to a file."""
+
+    __slots__ = ('mime_type', 'size', 'data', 'path', 'created')
+
+    def __init__(self, data: bytes, mime_type: str):
+        """Hold the payload in memory."""
+        self.mime_type = mime_type
+        self.size = len(data)
+        self.data: Optional[bytes] = data
+        self.path: Optional[str] = None
+        self.created = time.monotonic()
+
+
+class BlobStore:
+    """Bounded store for large or binary tool results, read back as blob:// resources.
+
+    Payloads stay in memory up to `max_memory_bytes`; past that the oldest are
+    spilled to files under `spill_dir`, and past `max_disk_bytes` (or `ttl`
+    seconds) the oldest are dropped altogether.
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 1024 * 1024 * 1024,
+        ttl: float = 3600.0,
+        spill_dir: Optional[str] = None,
+    ):
+        """Initialize the memory and disk bounds and where to spill to."""
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self._spill_root = spill_dir
+        self._spill_dir: Optional[str] = None
+        self._blobs: 'OrderedDict[str, _Blob]' = OrderedDict()
+        self.memory_bytes = 0
+        self.disk_bytes = 0
+
+        self.stored = 0
+        self.spilled = 0
+        self.evicted = 0
+        self.reads = 0
+
+    def put(self, data: bytes, mime_type: str) -> str:
+        """Store a payload and return its URI."""
+        if len(data) > max(self.max_memory_bytes, self.max_disk_bytes):
+            raise ValueError(f"Payload of {len(data)} bytes is larger than the blob store")
+        self._expire()
+        blob_id = uuid.uuid4().hex
+        blob = _Blob(data, mime_type)
+        self._blobs[blob_id] = blob
+        self.memory_bytes += blob.size
+        self.stored += 1
+        self._enforce_bounds()
+        return f"{BLOB_SCHEME}://{blob_id}"
+
+    def read(self, uri: str) -> Tuple[bytes, str, int]:
+        """Read a blob URI, honoring `?offset=&length=` (in bytes); returns the chunk, MIME type and total size."""
+        parts = urlsplit(uri)
+        blob = self._blobs.get(parts.netloc) if parts.scheme == BLOB_SCHEME else None
+        if blob is None or self._is_expired(blob):
+            raise ValueError(f"Unknown or expired resource: {uri}")
+
+        query = parse_qs(parts.query)
+        offset = max(0, int(query.get('offset', ['0'])[0]))
+        length = min(MAX_READ_BYTES, max(0, int(query.get('length', [str(MAX_READ_BYTES)])[0])))
+
+        self.reads += 1
+        if blob.data is not None:
+            return blob.data[offset:offset + length], blob.mime_type, blob.size
+        with open(blob.path, 'rb') as f:
+            f.seek(offset)
+            return f.read(length), blob.mime_type, blob.size
+
+    def _is_expired(self, blob: _Blob) -> bool:
+        """Whether a blob outlived the TTL."""
+        return time.monotonic() - blob.created > self.ttl
+
+    def _expire(self) -> None:
+        """Drop blobs past their TTL; they are ordered oldest first."""
+        while self._blobs:
+            blob_id, blob = next(iter(self._blobs.items()))
+            if not self._is_expired(blob):
+                break
+            self._drop(blob_id)
+
+    def _enforce_bounds(self) -> None:
+        """Spill the oldest in-memory blobs to disk, then drop the oldest ones on disk."""
+        for blob_id, blob in list(self._blobs.items()):
+            if self.memory_bytes <= self.max_memory_bytes:
+                break
+            if blob.data is not None:
+                self._spill(blob_id, blob)
+
+        for blob_id, blob in list(self._blobs.items()):
+            if self.disk_bytes <= self.max_disk_bytes:
+                break
+            if blob.path is not None:
+                self._drop(blob_id)
+
+    def _spill(self, blob_id: str, blob: _Blob) -> None:
+        """Move a blob's payload from memory to a file."""
+        if self._spill_dir is None:
+            if self._spill_root:
+                os.makedirs(self._spill_root, exist_ok=True)
+            self._spill_dir = tempfile.mkdtemp(prefix='mcp-blobs-', dir=self._spill_root)
+        path = os.path.join(self._spill_dir, blob_id)
+        with open(path, 'wb') as f:
+            f.write(blob.data)
+        blob.path, blob.data = path, None
+        self.memory_bytes -= blob.size
+        self.disk_bytes += blob.size
+        self.spilled += 1
+
+    def _drop(self, blob_id: str) -> None:
+        """Forget a blob and remove its file."""
+        blob = self._blobs.pop(blob_id)
+        self.evicted += 1
+        if blob.data is not None:
+            self.memory_bytes -= blob.size
+            return
+        self.disk_bytes -= blob.size
+        try:
+            os.unlink(blob.path)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Drop every blob and the spill directory."""
+        self._blobs.clear()
+        self.memory_bytes = self.disk_bytes = 0
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy and counters of the store."""
+        return {
+            'blobs': len(self._blobs),
+            'memory_bytes': self.memory_bytes,
+            'disk_bytes': self.disk_bytes,
+            'stored': self.stored,
+            'spilled': self.spilled,
+            'evicted': self.evicted,
+            'reads': self.reads,
+        }
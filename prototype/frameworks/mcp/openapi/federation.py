@@ -0,0 +1,135 @@
+import asyncio
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import yaml
+
+from openapi_parser import OpenAPISpec, OpenAPIToolsManager, shared_ssl_context
+from spec_loader import is_remote
+
+# Between a spec's namespace and its operation in tool names: `petstore__getPet`
+NAMESPACE_SEPARATOR = '__'
+
+SPEC_EXTENSIONS = ('.yaml', '.yml', '.json')
+
+
+class SpecSource:
+    """One spec served by a federated server: its namespace, location and config overrides."""
+
+    __slots__ = ('namespace', 'spec_path', 'config')
+
+    def __init__(self, namespace: str, spec_path: str, config: Optional[Dict[str, Any]] = None):
+        """Initialize with the tool name prefix, the spec path or URL and per-spec config sections."""
+        if NAMESPACE_SEPARATOR in namespace or not namespace:
+            raise ValueError(f"Invalid namespace {namespace!r}: must be non-empty and not contain {NAMESPACE_SEPARATOR!r}")
+        self.namespace = namespace
+        self.spec_path = spec_path
+        self.config = config or {}
+
+
+def namespace_for(name: str) -> str:
+    """Turn a file name or manifest key into a namespace usable in tool names."""
+    namespace = re.sub(r'[^A-Za-z0-9-]+', '_', name).strip('_')
+    # Runs of underscores would read as the separator
+    return re.sub(r'_{2,}', '_', namespace) or 'api'
+
+
+def discover_specs(directory: str) -> List[SpecSource]:
+    """One source per spec file in a directory, namespaced by file name."""
+    sources = []
+    for filename in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(filename)
+        if extension.lower() in SPEC_EXTENSIONS and not stem.startswith('.'):
+            sources.append(SpecSource(namespace_for(stem), os.path.join(directory, filename)))
+    if not sources:
+        raise ValueError(f"No OpenAPI specs ({', '.join(SPEC_EXTENSIONS)}) found in {directory}")
+    return sources
+
+
+def load_manifest(manifest_path: str) -> List[SpecSource]:
+    """Sources listed in a manifest file.
+
+    The manifest maps namespaces to a spec path or URL, or to
+    `{spec: ..., config: {...}}` whose sections override the server config
+    for that spec. Relative paths are resolved against the manifest's directory.
+    """
+    with open(manifest_path, 'r') as f:
+        manifest = yaml.safe_load(f) or {}
+    entries = manifest.get('specs', manifest)
+    if not isinstance(entries, dict) or not entries:
+        raise ValueError(f"{manifest_path} should map namespaces to specs under `specs:`")
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    sources = []
+    for namespace, entry in entries.items():
+        if isinstance(entry, str):
+            entry = {'spec': entry}
+        spec_path = entry['spec']
+        if not is_remote(spec_path):
+            spec_path = os.path.join(base_dir, os.path.expanduser(spec_path))
+        sources.append(SpecSource(str(namespace), spec_path, entry.get('config')))
+    return sources
+
+
+def merge_config(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """The server config with one spec's sections overriding it, key by key."""
+    merged = dict(base)
+    for section, values in overrides.items():
+        if isinstance(values, dict) and isinstance(base.get(section), dict):
+            merged[section] = dict(base[section], **values)
+        else:
+            merged[section] = values
+    return merged
+
+
+async def load_managers(
+    sources: List[SpecSource],
+    config: Dict[str, Any],
+    cache_dir: Optional[str] = None,
+) -> Dict[str, OpenAPIToolsManager]:
+    """Fetch, parse and compile every spec concurrently, keyed by namespace.
+
+    Remote specs and their external documents are fetched over one pooled
+    client; compiling the operations runs in worker threads. Nothing connects
+    upstream yet: each manager creates its HTTP client on its first call.
+    """
+    namespaces = [source.namespace for source in sources]
+    duplicates = sorted({namespace for namespace in namespaces if namespaces.count(namespace) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate spec namespaces: {', '.join(duplicates)}")
+
+    async def load(source: SpecSource, client: Optional[httpx.AsyncClient]) -> OpenAPIToolsManager:
+        api_spec = await OpenAPISpec.load(source.spec_path, cache_dir=cache_dir, client=client)
+        return await asyncio.to_thread(
+            OpenAPIToolsManager,
+            source.spec_path,
+            cache_dir=cache_dir,
+            config=merge_config(config, source.config),
+            api_spec=api_spec,
+        )
+
+    if any(is_remote(source.spec_path) for source in sources):
+        async with httpx.AsyncClient(follow_redirects=True, verify=shared_ssl_context()) as client:
+            results = await asyncio.gather(*[load(source, client) for source in sources], return_exceptions=True)
+    else:
+        # Local specs only need a client of their own if they reference a URL
+        results = await asyncio.gather(*[load(source, None) for source in sources], return_exceptions=True)
+
+    errors = [
+        f"{source.namespace} ({source.spec_path}): {result}"
+        for source, result in zip(sources, results)
+        if isinstance(result, BaseException)
+    ]
+    if errors:
+        raise ValueError("Failed to load specs:\n" + "\n".join(errors))
+    return dict(zip(namespaces, results))
+
+
+def split_tool_name(name: str) -> Tuple[str, str]:
+    """Split a namespaced tool name into namespace and operation; ('', name) when it has none."""
+    namespace, separator, operation = name.partition(NAMESPACE_SEPARATOR)
+    if not separator:
+        return '', name
+    return namespace, operation
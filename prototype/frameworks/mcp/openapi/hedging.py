@@ -0,0 +1,223 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class LatencyTracker:
+    """Recent latencies in a fixed-size ring buffer, for percentile estimates."""
+
+    __slots__ = ('_samples', '_index', '_count', '_cache', '_dirty')
+
+    def __init__(self, size: int = 256):
+        """Initialize an empty tracker keeping the last `size` samples."""
+        self._samples: List[float] = [0.0] * size
+        self._index = 0
+        self._count = 0
+        self._cache: Dict[float, float] = {}
+        self._dirty = 0
+
+    def observe(self, seconds: float) -> None:
+        """Record one latency sample."""
+        self._samples[self._index] = seconds
+        self._index = (self._index + 1) % len(self._samples)
+        self._count = min(self._count + 1, len(self._samples))
+        self._dirty += 1
+
+    @property
+    def count(self) -> int:
+        """Number of samples currently held."""
+        return self._count
+
+    def percentile(self, p: float) -> Optional[float]:
+        """The p-th percentile of the held samples, or None when there are none."""
+        if not self._count:
+            return None
+        # Re-sorting on every call is wasteful; refresh after a batch of new samples
+        if self._dirty >= 16 or p not in self._cache:
+            if self._dirty >= 16:
+                self._cache.clear()
+                self._dirty = 0
+            ordered = sorted(self._samples[:self._count])
+            self._cache[p] = ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+        return self._cache[p]
+
+
+class HedgeBudget:
+    """Token bucket allowing hedges for at most `ratio` of requests."""
+
+    def __init__(self, ratio: float = 0.1, burst: float = 10.0):
+        """Initialize the extra-load ratio and how many hedges may be saved up."""
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+
+    def on_request(self) -> None:
+        """Earn a fraction of a hedge for every request."""
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one hedge from the budget if available."""
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class Hedger:
+    """Hedged requests for idempotent calls.
+
+    If the first attempt hasn't answered after the operation's recent
+    `percentile` latency, a second attempt is started and whichever succeeds
+    first wins; the other one is cancelled. A global HedgeBudget keeps the
+    extra load to `max_ratio` of requests.
+
+    To report what hedging saves, losing primaries are left to finish while a
+    measurement budget (`measure_ratio` of requests) allows, so their real
+    latency goes into the primary distribution. A loser that is cancelled
+    instead is recorded with its elapsed time at cancellation, a lower bound,
+    so the slow primaries are never missing from it.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_delay: float = 0.01,
+        min_samples: int = 20,
+        max_ratio: float = 0.1,
+        measure_ratio: float = 0.1,
+    ):
+        """Initialize the hedge delay percentile, its floor and the hedge budget."""
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.budget = HedgeBudget(ratio=max_ratio)
+        self.measure_ratio = measure_ratio
+        # Losers kept running only hold a connection longer, they add no requests;
+        # a zero ratio turns measuring off, saved-up burst included
+        self.measure_budget = HedgeBudget(ratio=measure_ratio, burst=10.0 if measure_ratio > 0 else 0.0)
+        self._attempt_latency: Dict[str, LatencyTracker] = {}
+
+        # Latency of primary attempts (what callers would have waited without hedging)
+        # versus what they actually waited
+        self.primary_latency = LatencyTracker(1024)
+        self.effective_latency = LatencyTracker(1024)
+
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self.measured_losers = 0
+        self.censored_losers = 0
+        self.measured_savings = 0.0
+
+    def hedge_delay(self, operation_id: str) -> Optional[float]:
+        """How long to wait before hedging, or None while there's too little history."""
+        tracker = self._attempt_latency.get(operation_id)
+        if tracker is None or tracker.count < self.min_samples:
+            return None
+        return max(self.min_delay, tracker.percentile(self.percentile))
+
+    async def run(self, operation_id: str, attempt: Callable[[], Awaitable[T]]) -> T:
+        """Run attempt(), hedging with a second attempt if the first is slow."""
+        self.requests += 1
+        self.budget.on_request()
+        self.measure_budget.on_request()
+        tracker = self._attempt_latency.get(operation_id)
+        if tracker is None:
+            tracker = self._attempt_latency[operation_id] = LatencyTracker()
+
+        start = time.monotonic()
+        primary = asyncio.ensure_future(attempt())
+        tasks = {primary: start}
+        keep_primary = False
+        try:
+            delay = self.hedge_delay(operation_id)
+            if delay is not None:
+                await asyncio.wait([primary], timeout=delay)
+
+            if not primary.done() and delay is not None:
+                if self.budget.try_spend():
+                    self.hedged += 1
+                    tasks[asyncio.ensure_future(attempt())] = time.monotonic()
+                else:
+                    self.budget_denied += 1
+
+            winner = await self._first_success(tasks)
+            finished = time.monotonic()
+            if winner is not primary:
+                self.hedge_wins += 1
+                if not primary.done():
+                    if self.measure_budget.try_spend():
+                        keep_primary = True
+                        primary.add_done_callback(lambda task: self._measure_loser(task, start, finished))
+                    else:
+                        # It took at least this long
+                        self.primary_latency.observe(finished - start)
+                        self.censored_losers += 1
+        finally:
+            for task in tasks:
+                if not task.done() and not (task is primary and keep_primary):
+                    task.cancel()
+
+        tracker.observe(finished - tasks[winner])
+        self.effective_latency.observe(finished - start)
+        if winner is primary:
+            self.primary_latency.observe(finished - start)
+        return winner.result()
+
+    def _measure_loser(self, primary: asyncio.Future, start: float, hedged_finish: float) -> None:
+        """Record how long a primary that lost to its hedge really took."""
+        if primary.cancelled() or primary.exception() is not None:
+            return
+        elapsed = time.monotonic() - start
+        self.primary_latency.observe(elapsed)
+        self.measured_losers += 1
+        self.measured_savings += elapsed - (hedged_finish - start)
+
+    async def _first_success(self, tasks: Dict[asyncio.Future, float]) -> asyncio.Future:
+        """Wait for the first attempt that succeeds; raise the primary's error if all fail."""
+        pending = set(tasks)
+        failed = []
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task
+                failed.append(task)
+        # Every attempt failed, report the first one's error
+        failed.sort(key=lambda task: tasks[task])
+        raise failed[0].exception()
+
+    def p99_improvement(self) -> Optional[float]:
+        """How much hedging cut the p99: primary attempts' p99 minus what callers waited."""
+        primary = self.primary_latency.percentile(99)
+        effective = self.effective_latency.percentile(99)
+        if primary is None or effective is None:
+            return None
+        return primary - effective
+
+    def stats(self) -> Dict[str, Any]:
+        """Hedge counters and the latency tail with and without hedging."""
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            'requests': self.requests,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'budget_denied': self.budget_denied,
+            'hedge_ratio': self.hedged / self.requests if self.requests else 0.0,
+            'p50_primary_ms': ms(self.primary_latency.percentile(50)),
+            'p50_effective_ms': ms(self.effective_latency.percentile(50)),
+            'p99_primary_ms': ms(self.primary_latency.percentile(99)),
+            'p99_effective_ms': ms(self.effective_latency.percentile(99)),
+            # A lower bound while some losers are censored
+            'p99_improvement_ms': ms(self.p99_improvement()),
+            'measured_losers': self.measured_losers,
+            'censored_losers': self.censored_losers,
+            'avg_saved_ms_per_measured_win': ms(
+                self.measured_savings / self.measured_losers if self.measured_losers else None
+            ),
+        }
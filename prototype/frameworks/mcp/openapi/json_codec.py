@@ -0,0 +1,36 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# How JSON tool responses are handed to the model
+JSON_MODES = ('passthrough', 'minify', 'pretty')
+
+
+def loads(raw: bytes) -> Any:
+    """Parse JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dumps(data: Any, pretty: bool = False) -> str:
+    """Serialize to compact (or indented) JSON text, with orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        try:
+            return orjson.dumps(data, option=option).decode()
+        except TypeError:
+            # orjson is stricter (e.g. non-str keys, big ints); fall back rather than fail the call
+            pass
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+
+
+def minify(raw: bytes) -> str:
+    """Strip insignificant whitespace from a JSON document."""
+    return dumps(loads(raw))
@@ -0,0 +1,210 @@
+import asyncio
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Optional, Sequence
+
+
+class QueueTimeout(Exception):
+    """Raised when a call waited for a concurrency slot past its deadline."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class AIMDLimiter:
+    """Adaptive concurrency limit for one upstream or operation.
+
+    The limit grows by about one per limit's worth of successful calls
+    (additive increase) and shrinks by `backoff` on overload signals: 429/503,
+    timeouts, or latency above `latency_threshold` (multiplicative decrease).
+    Calls over the limit wait in a FIFO queue until their deadline, and a
+    Retry-After from upstream pauses the whole queue.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: float = 20,
+        min_limit: float = 1,
+        max_limit: float = 200,
+        backoff: float = 0.9,
+        latency_threshold: Optional[float] = None,
+    ):
+        """Initialize the limit bounds and the overload signals to react to."""
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.backoff = backoff
+        self.latency_threshold = latency_threshold
+
+        self.inflight = 0
+        self.blocked_until = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+
+        self.acquired = 0
+        self.queued = 0
+        self.timeouts = 0
+        self.drops = 0
+
+    def _has_capacity(self) -> bool:
+        """Whether one more call may start now."""
+        return self.inflight < int(self.limit) and time.monotonic() >= self.blocked_until
+
+    async def acquire(self, deadline: float) -> None:
+        """Take a slot, waiting in line until `deadline` (a time.monotonic() value)."""
+        if not self._waiters and self._has_capacity():
+            self.inflight += 1
+            self.acquired += 1
+            return
+
+        self.queued += 1
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._schedule_wake()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=max(0.0, deadline - time.monotonic()))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just as we gave up; pass it on
+                self.inflight -= 1
+                self._wake()
+            else:
+                waiter.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+                raise QueueTimeout(f"Timed out waiting for a concurrency slot on {self.name}")
+            raise
+        self.acquired += 1
+
+    def release(self, overloaded: Optional[bool], latency: Optional[float] = None) -> None:
+        """Give back a slot and adapt the limit.
+
+        `overloaded=None` means the call says nothing about upstream load (e.g. it was cancelled).
+        """
+        self.inflight -= 1
+        if overloaded is not None:
+            if not overloaded and self.latency_threshold is not None and latency is not None:
+                overloaded = latency > self.latency_threshold
+            if overloaded:
+                self.drops += 1
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self._wake()
+
+    def block_for(self, seconds: float) -> None:
+        """Hold back new calls for `seconds`, as asked by a Retry-After header."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self._schedule_wake()
+
+    def _schedule_wake(self) -> None:
+        """Make sure queued calls are woken when a Retry-After pause ends."""
+        delay = self.blocked_until - time.monotonic()
+        if delay > 0 and self._wake_handle is None:
+            def wake():
+                self._wake_handle = None
+                self._wake()
+                self._schedule_wake()
+            self._wake_handle = asyncio.get_running_loop().call_later(delay, wake)
+
+    def _wake(self) -> None:
+        """Hand free slots to queued calls in order."""
+        while self._waiters and self._has_capacity():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limit, load and counters."""
+        return {
+            'limit': round(self.limit, 2),
+            'inflight': self.inflight,
+            'queued_now': len(self._waiters),
+            'blocked_for_s': round(max(0.0, self.blocked_until - time.monotonic()), 3),
+            'acquired': self.acquired,
+            'queued': self.queued,
+            'timeouts': self.timeouts,
+            'drops': self.drops,
+        }
+
+
+class ConcurrencyLimits:
+    """AIMD limiters keyed by upstream host and, optionally, by operation.
+
+    Limiters are created on first use and outlive spec reloads, so a reload
+    doesn't forget what was learned about the backend.
+    """
+
+    def __init__(self, settings: Dict[str, Any], queue_timeout: float = 30.0, max_retries: int = 2):
+        """Initialize with default limiter settings, the queueing deadline and Retry-After retries."""
+        self.settings = settings
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self._hosts: Dict[str, AIMDLimiter] = {}
+        self._operations: Dict[str, AIMDLimiter] = {}
+
+    def _create(self, name: str, overrides: Optional[Dict[str, Any]] = None) -> AIMDLimiter:
+        """Create a limiter from the defaults and per-operation overrides."""
+        settings = dict(self.settings, **(overrides or {}))
+        latency_threshold = settings.get('latency_threshold_ms')
+        return AIMDLimiter(
+            name,
+            initial=settings.get('initial', 20),
+            min_limit=settings.get('min', 1),
+            max_limit=settings.get('max', 200),
+            backoff=settings.get('backoff', 0.9),
+            latency_threshold=None if latency_threshold is None else latency_threshold / 1000,
+        )
+
+    def for_host(self, host: str) -> AIMDLimiter:
+        """The limiter shared by every call to an upstream host."""
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            limiter = self._hosts[host] = self._create(host)
+        return limiter
+
+    def for_operation(self, operation_id: str, overrides: Optional[Dict[str, Any]] = None) -> AIMDLimiter:
+        """The limiter of one operation."""
+        limiter = self._operations.get(operation_id)
+        if limiter is None:
+            limiter = self._operations[operation_id] = self._create(operation_id, overrides)
+        return limiter
+
+    @staticmethod
+    async def acquire(limiters: Sequence[AIMDLimiter], deadline: float) -> None:
+        """Take a slot on every limiter, or on none of them."""
+        acquired = []
+        try:
+            for limiter in limiters:
+                await limiter.acquire(deadline)
+                acquired.append(limiter)
+        except BaseException:
+            for limiter in acquired:
+                limiter.release(None)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """State of every host and operation limiter."""
+        return {
+            'hosts': {name: limiter.stats() for name, limiter in self._hosts.items()},
+            'operations': {name: limiter.stats() for name, limiter in self._operations.items()},
+        }
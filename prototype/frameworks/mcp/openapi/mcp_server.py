@@ -1,21 +1,94 @@
+import asyncio
+import base64
 import click
+import concurrent.futures
+import contextlib
 import json
-from typing import Dict, List, Optional, Any
+import os
+import weakref
+import yaml
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 import anyio
-from mcp.server.lowlevel import Server
+from mcp.server.lowlevel import NotificationOptions, Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
 import mcp.types as types
-from openapi_parser import OpenAPIToolsManager
+from openapi_parser import CompiledEndpoint, OpenAPISpec, OpenAPIToolsManager, is_text_content_type
+from federation import NAMESPACE_SEPARATOR, discover_specs, load_managers, load_manifest, split_tool_name
+from pagination import PAGINATED_SUFFIX
+from blob_store import BLOB_SCHEME, BlobStore
+from streaming import ProgressCallback
+import json_codec
+from validation import ArgumentValidator
+import metrics
 from mcp.server.fastmcp.prompts import Prompt, PromptManager
 from custom_prompts import create_agent_prompt
 
+# Resource exposing the request pipeline's runtime state (limits, caches, upstreams)
+STATS_RESOURCE_URI = "stats://pipeline"
+
+# Built-in tool running several operations concurrently in one call
+BATCH_TOOL_NAME = "batch_call"
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mcp-openapi")
+
+ToolContent = types.TextContent | types.ImageContent | types.EmbeddedResource | types.ResourceLink
+
 class MCPOpenAPIServer:
     """MCP Server that provides OpenAPI tools and prompts."""
     
-    def __init__(self, spec_path: str):
-        """Initialize the server with an OpenAPI specification."""
-        self.api_tools = OpenAPIToolsManager(spec_path)
+    def __init__(
+        self,
+        spec_path: Optional[str] = None,
+        reload_interval: float = 0,
+        cache_dir: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        apis: Optional[Dict[str, OpenAPIToolsManager]] = None,
+    ):
+        """Initialize the server with an OpenAPI specification, or several keyed by namespace.
+        
+        With `apis`, each spec's tools are named `<namespace>__<operationId>`.
+        """
+        self.config = config or {}
+        if apis is None:
+            apis = {'': OpenAPIToolsManager(spec_path, cache_dir=cache_dir, config=self.config)}
+        self.apis = apis
+        # A lone spec keeps its plain operation ids as tool names
+        self.federated = '' not in self.apis
         self.app = Server(name="mcp-openapi-tools-and-prompts")
         self.prompt_manager = PromptManager(warn_on_duplicate_prompts=True)
+        self.reload_interval = reload_interval
+        
+        batch_config = self.config.get('batch', {})
+        self.batch_enabled = batch_config.get('enabled', True)
+        self.batch_max_calls = batch_config.get('max_calls', 20)
+        self.batch_concurrency = batch_config.get('concurrency', 8)
+        self.batch_timeout = batch_config.get('timeout', 30.0)
+        self.batch_validator = ArgumentValidator(
+            BATCH_TOOL_NAME, self._batch_tool().inputSchema,
+            coerce=self.config.get('validation', {}).get('coerce', True),
+        )
+        
+        # Large and binary results are kept here and returned as blob:// links
+        blob_config = self.config.get('blobs', {})
+        # Off when several worker processes serve the same clients, since a link only resolves in its own process
+        self.blob_links = blob_config.get('links', True)
+        self.inline_max_bytes = blob_config.get('inline_max_bytes', 64 * 1024)
+        self.preview_chars = blob_config.get('preview_chars', 1000)
+        self.blobs = BlobStore(
+            max_memory_bytes=blob_config.get('max_memory_bytes', 64 * 1024 * 1024),
+            max_disk_bytes=blob_config.get('max_disk_bytes', 1024 * 1024 * 1024),
+            ttl=blob_config.get('ttl', 3600.0),
+            spill_dir=blob_config.get('spill_dir'),
+        )
+        
+        # Sessions that have talked to us, so spec reloads can notify them
+        self._sessions = weakref.WeakSet()
+        
+        # Materialize the tool list once; list_tools serves it from memory
+        self._spec_tools: Dict[str, List[types.Tool]] = {}
+        self._tools: List[types.Tool] = []
+        self._tools_payload: Optional[bytes] = None
+        self._rebuild_tools()
         
         # Register prompts
         self._register_prompts()
@@ -37,12 +110,28 @@ class MCPOpenAPIServer:
         """Set up handlers for the MCP server."""
         @self.app.list_tools()
         async def list_tools() -> List[types.Tool]:
+            self._track_session()
             return self._get_tools()
             
-        @self.app.call_tool()
-        async def call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        # Each API checks (and coerces) arguments with its compiled validators, or passes them through when its
+        # `validation` is off; the SDK's strict check would reject "42" for an integer and validate twice
+        @self.app.call_tool(validate_input=False)
+        async def call_tool(name: str, arguments: Dict[str, Any]) -> List[ToolContent]:
+            self._track_session()
             return await self._execute_tool(name, arguments)
             
+        @self.app.list_resources()
+        async def list_resources() -> List[types.Resource]:
+            return self._get_resources()
+            
+        @self.app.list_resource_templates()
+        async def list_resource_templates() -> List[types.ResourceTemplate]:
+            return self._get_resource_templates()
+            
+        @self.app.read_resource()
+        async def read_resource(uri) -> List[ReadResourceContents]:
+            return self._read_resource(str(uri))
+            
         @self.app.list_prompts()
         async def list_prompts() -> List[types.Prompt]:
             return self._get_prompts()
@@ -51,43 +140,302 @@ class MCPOpenAPIServer:
         async def get_prompt(name: str, arguments: Optional[Dict[str, str]] = None) -> types.GetPromptResult:
             return await self._get_prompt_result(name, arguments)
     
-    async def _execute_tool(self, name: str, arguments: Dict[str, Any]) -> List[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+    async def _execute_tool(self, name: str, arguments: Dict[str, Any]) -> List[ToolContent]:
         """Execute a tool by name with the given arguments."""
         try:
-            # Initialize client if needed
-            if self.api_tools.client is None:
-                await self.api_tools.initialize_client()
-                
-            result = await self.api_tools.execute_api_call(name, arguments)
-            
-            content_type = result.get('content_type', '')
-            data = result.get('data', '')
-            
-            if 'application/json' in content_type:
-                if isinstance(data, dict) or isinstance(data, list):
-                    return [types.TextContent(type="text", text=json.dumps(data, indent=2))]
-                else:
-                    return [types.TextContent(type="text", text=str(data))]
-            elif 'image/' in content_type and isinstance(data, bytes):
-                return [types.ImageContent(type="image", data=data)]
-            else:
-                return [types.TextContent(type="text", text=str(data))]
+            if name == BATCH_TOOL_NAME and self.batch_enabled:
+                if self.config.get('validation', {}).get('enabled', True):
+                    arguments = self.batch_validator(arguments)
+                return await self._execute_batch(arguments)
+        
+            result = await self._call_api(name, arguments, progress=self._progress_callback())
+            return self._tool_content(result)
         except Exception as e:
             return [types.TextContent(type="text", text=f"Error executing tool: {str(e)}")]
     
+    async def _execute_batch(self, arguments: Dict[str, Any]) -> List[ToolContent]:
+        """Run the calls of a batch_call concurrently and return every result, in order."""
+        calls = arguments.get('calls') or []
+        if len(calls) > self.batch_max_calls:
+            raise ValueError(f"A batch takes at most {self.batch_max_calls} calls, got {len(calls)}")
+        timeout = min(arguments.get('timeout') or self.batch_timeout, self.batch_timeout)
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+    
+        async def run(call: Dict[str, Any]) -> Tuple[bool, List[ToolContent]]:
+            name = call.get('operation_id', '')
+            async with semaphore:
+                try:
+                    if name == BATCH_TOOL_NAME:
+                        raise ValueError("batch_call can't be nested")
+                    result = await asyncio.wait_for(self._call_api(name, call.get('arguments') or {}), timeout)
+                except asyncio.TimeoutError:
+                    return False, [types.TextContent(type="text", text=f"Error: timed out after {timeout}s")]
+                except Exception as e:
+                    return False, [types.TextContent(type="text", text=f"Error: {str(e)}")]
+            return True, self._tool_content(result)
+        
+        results = await asyncio.gather(*[run(call) for call in calls])
+        
+        # One header block per call, followed by that call's content
+        content: List[ToolContent] = []
+        for index, (call, (ok, call_content)) in enumerate(zip(calls, results)):
+            status = "ok" if ok else "failed"
+            content.append(types.TextContent(type="text", text=f"[{index}] {call.get('operation_id', '')}: {status}"))
+            content.extend(call_content)
+        return content
+    
+    def _resolve_tool(self, name: str) -> Tuple[OpenAPIToolsManager, str]:
+        """The manager serving a tool and the tool's name within that spec."""
+        if not self.federated:
+            return self.apis[''], name
+        namespace, operation = split_tool_name(name)
+        api_tools = self.apis.get(namespace)
+        if api_tools is None:
+            raise ValueError(f"Unknown tool: {name}")
+        return api_tools, operation
+    
+    async def _call_api(
+        self, name: str, arguments: Dict[str, Any], progress: Optional[ProgressCallback] = None
+    ) -> Dict[str, Any]:
+        """Route a tool call to its spec, creating that spec's HTTP client on first use."""
+        api_tools, operation = self._resolve_tool(name)
+        await api_tools.ensure_client()
+        return await api_tools.execute_api_call(operation, arguments, progress=progress)
+    
+    def _tool_content(self, result: Dict[str, Any]) -> List[ToolContent]:
+        """Turn an API call result into tool content, moving large or binary payloads to the blob store."""
+        content_type = result.get('content_type', '')
+        data = result.get('data', '')
+        mime_type = content_type.split(';')[0].strip() or 'application/octet-stream'
+        
+        if isinstance(data, bytes):
+            if mime_type.startswith('image/') and (len(data) <= self.inline_max_bytes or not self.blob_links):
+                return [types.ImageContent(type="image", data=base64.b64encode(data).decode(), mimeType=mime_type)]
+            if not self.blob_links:
+                return [self._embedded_result(data, mime_type)]
+            return self._blob_result(data, mime_type)
+        
+        if 'application/json' in content_type and isinstance(data, (dict, list)):
+            text = json_codec.dumps(data, pretty=True)
+        else:
+            text = str(data)
+        if len(text) > self.inline_max_bytes and self.blob_links:
+            return self._blob_result(text.encode(), mime_type, preview=text[:self.preview_chars])
+        return [types.TextContent(type="text", text=text)]
+    
+    def _progress_callback(self) -> Optional[ProgressCallback]:
+        """Progress callback sending notifications/progress for the current request, if it asked for them."""
+        try:
+            ctx = self.app.request_context
+        except LookupError:
+            return None
+        token = ctx.meta.progressToken if ctx.meta is not None else None
+        if token is None:
+            return None
+        
+        async def progress(done: float, total: Optional[float], message: Optional[str]) -> None:
+            await ctx.session.send_progress_notification(
+                token, done, total=total, message=message, related_request_id=ctx.request_id
+            )
+        return progress
+    
+    def _blob_result(self, data: bytes, mime_type: str, preview: Optional[str] = None) -> List[ToolContent]:
+        """Store a payload in the blob store and return a summary with a link to it."""
+        uri = self.blobs.put(data, mime_type)
+        summary = (
+            f"The response ({mime_type}, {len(data)} bytes) is too large to inline and was stored as {uri}. "
+            f"Read it with resources/read; add ?offset=N&length=M for a byte range."
+        )
+        if preview:
+            summary += f"\n\nFirst {len(preview)} characters:\n{preview}"
+        return [
+            types.TextContent(type="text", text=summary),
+            types.ResourceLink(type="resource_link", uri=uri, name=uri, mimeType=mime_type, size=len(data)),
+        ]
+    
+    def _embedded_result(self, data: bytes, mime_type: str) -> types.EmbeddedResource:
+        """A binary payload embedded in the tool result, for when blob links are off."""
+        return types.EmbeddedResource(
+            type="resource",
+            resource=types.BlobResourceContents(
+                uri=f"data:{mime_type};base64,", mimeType=mime_type, blob=base64.b64encode(data).decode()
+            ),
+        )
+    
+    def _get_resources(self) -> List[types.Resource]:
+        """Get the resources served next to the tools."""
+        return [
+            types.Resource(
+                uri=STATS_RESOURCE_URI,
+                name="pipeline-stats",
+                description="Concurrency limits, cache, coalescing, hedging, upstream and blob store counters",
+                mimeType="application/json",
+            )
+        ]
+    
+    def _get_resource_templates(self) -> List[types.ResourceTemplate]:
+        """Get the templates of resources created on the fly."""
+        if not self.blob_links:
+            return []
+        return [
+            types.ResourceTemplate(
+                uriTemplate=f"{BLOB_SCHEME}://{{id}}{{?offset,length}}",
+                name="tool-result",
+                description="A large or binary tool result; offset and length select a byte range",
+            )
+        ]
+    
+    def _read_resource(self, uri: str) -> List[ReadResourceContents]:
+        """Read a resource by URI."""
+        if uri == STATS_RESOURCE_URI:
+            return [ReadResourceContents(content=json.dumps(self._get_stats()), mime_type="application/json")]
+        if uri.startswith(f"{BLOB_SCHEME}://"):
+            chunk, mime_type, size = self.blobs.read(uri)
+            content = chunk.decode('utf-8', errors='replace') if is_text_content_type(mime_type) else chunk
+            return [ReadResourceContents(content=content, mime_type=mime_type, meta={'size': size})]
+        raise ValueError(f"Unknown resource: {uri}")
+    
+    def _get_stats(self) -> Dict[str, Any]:
+        """Runtime counters of the request pipeline and the blob store."""
+        if self.federated:
+            stats = {'apis': {namespace: api.get_stats() for namespace, api in self.apis.items()}}
+        else:
+            stats = self.apis[''].get_stats()
+        stats['blobs'] = self.blobs.stats()
+        return stats
+    
+    def _get_metrics(self) -> str:
+        """Per-operation instruments and pipeline stats in the Prometheus text format."""
+        exposition = metrics.Exposition()
+        for namespace, api_tools in self.apis.items():
+            metrics.add_api_metrics(exposition, api_tools.metrics, api_tools.get_stats(), namespace)
+        exposition.add_stats('blobs', self.blobs.stats())
+        return exposition.text()
+    
     def _get_tools(self) -> List[types.Tool]:
-        """Get a list of all tools from the OpenAPI specification."""
+        """Get the prebuilt list of tools from the OpenAPI specification."""
+        return self._tools
+    
+    def _get_tools_payload(self) -> bytes:
+        """Get the tools/list result serialized once, ready to send as JSON."""
+        if self._tools_payload is None:
+            result = types.ListToolsResult(tools=self._tools)
+            self._tools_payload = result.model_dump_json(by_alias=True, exclude_none=True).encode()
+        return self._tools_payload
+    
+    def _build_tools(
+        self, namespace: str, api_spec: OpenAPISpec, operations: Dict[str, CompiledEndpoint]
+    ) -> List[types.Tool]:
+        """Build the tool list from an OpenAPI specification and its compiled operations."""
+        api_tools = self.apis[namespace]
+        prefix = namespace + NAMESPACE_SEPARATOR if namespace else ''
         tools = []
         
-        for endpoint in self.api_tools.get_endpoints():
+        for endpoint in api_spec.get_endpoints():
+            description = endpoint.get('summary', '') or endpoint.get('description', '') or f"Call {endpoint['method'].upper()} {endpoint['path']}"
             tools.append(types.Tool(
-                name=endpoint['operation_id'],
-                description=endpoint.get('summary', '') or endpoint.get('description', '') or f"Call {endpoint['method'].upper()} {endpoint['path']}",
-                inputSchema=self.api_tools.generate_input_schema(endpoint)
+                name=prefix + endpoint['operation_id'],
+                description=description,
+                inputSchema=api_tools.tool_input_schema(api_spec, endpoint)
             ))
-        
+            
+            compiled = operations.get(endpoint['operation_id'])
+            if compiled is not None and compiled.pagination is not None:
+                tools.append(types.Tool(
+                    name=prefix + endpoint['operation_id'] + PAGINATED_SUFFIX,
+                    description=f"{description.rstrip('.')}. Fetches every page and returns all items in one result.",
+                    inputSchema=api_tools.paginated_input_schema(api_spec, endpoint, compiled.pagination)
+                ))
         return tools
     
+    def _batch_tool(self) -> types.Tool:
+        """The built-in batch_call tool."""
+        return types.Tool(
+            name=BATCH_TOOL_NAME,
+            description=(
+                "Run several independent tool calls concurrently and get every result in one response. "
+                "Each call names another tool of this server and its arguments; results come back in order, "
+                "each after an '[index] tool: ok|failed' line."
+            ),
+            inputSchema={
+                'type': 'object',
+                'properties': {
+                    'calls': {
+                        'type': 'array',
+                        'minItems': 1,
+                        'maxItems': self.batch_max_calls,
+                        'items': {
+                            'type': 'object',
+                            'properties': {
+                                'operation_id': {'type': 'string', 'description': "Name of the tool to call"},
+                                'arguments': {'type': 'object', 'description': "That tool's arguments"},
+                            },
+                            'required': ['operation_id'],
+                        },
+                    },
+                    'timeout': {
+                        'type': 'number',
+                        'description': f"Seconds each call may take (at most {self.batch_timeout})",
+                    },
+                },
+                'required': ['calls'],
+            },
+        )
+    
+    def _rebuild_tools(self) -> None:
+        """Rebuild every spec's tools and the combined list."""
+        for namespace, api_tools in self.apis.items():
+            self._spec_tools[namespace] = self._build_tools(namespace, api_tools.api_spec, api_tools.operations)
+        self._combine_tools()
+    
+    def _combine_tools(self) -> None:
+        """Join the per-spec tool lists and drop the stale serialized payload."""
+        tools = [tool for spec_tools in self._spec_tools.values() for tool in spec_tools]
+        if self.batch_enabled:
+            tools.append(self._batch_tool())
+        self._tools, self._tools_payload = tools, None
+    
+    def _track_session(self) -> None:
+        """Remember the session of the current request for list_changed notifications."""
+        try:
+            self._sessions.add(self.app.request_context.session)
+        except LookupError:
+            pass
+    
+    async def _notify_tools_changed(self) -> None:
+        """Send notifications/tools/list_changed to every known session."""
+        for session in list(self._sessions):
+            try:
+                await session.send_tool_list_changed()
+            except Exception:
+                # The session went away, it will be dropped from the weak set
+                pass
+    
+    async def _watch_spec(self) -> None:
+        """Poll the local spec files and hot-reload a spec's tools when its content changes."""
+        while True:
+            await anyio.sleep(self.reload_interval)
+            changed_any = False
+            for namespace, api_tools in self.apis.items():
+                if api_tools.api_spec.is_remote or not api_tools.spec_modified():
+                    continue
+                try:
+                    # Parse and compile off the event loop, then swap everything in at once
+                    changed = await anyio.to_thread.run_sync(api_tools.load_changed_spec)
+                    if changed is None:
+                        continue
+                    api_spec, operations = changed
+                    spec_tools = await anyio.to_thread.run_sync(self._build_tools, namespace, api_spec, operations)
+                except Exception:
+                    # Keep serving the last good spec while the file is mid-edit or invalid
+                    continue
+                api_tools.apply_spec(api_spec, operations)
+                self._spec_tools[namespace] = spec_tools
+                changed_any = True
+            if changed_any:
+                self._combine_tools()
+                await self._notify_tools_changed()
+    
     def _get_prompts(self) -> List[types.Prompt]:
         """Get a list of all available prompts."""
         return [
@@ -135,21 +483,60 @@ class MCPOpenAPIServer:
         except Exception as e:
             raise ValueError(f"Error rendering prompt {name}: {str(e)}")
     
-    async def run(self, transport: str, port: int):
-        """Run the MCP server with the specified transport."""
-        # Initialize the HTTP client
-        await self.api_tools.initialize_client()
+    def _initialization_options(self):
+        """Initialization options advertising tools/list_changed support."""
+        return self.app.create_initialization_options(
+            notification_options=NotificationOptions(tools_changed=True)
+        )
+    
+    @contextlib.asynccontextmanager
+    async def serving(self) -> AsyncIterator[None]:
+        """Connect, watch the spec files while serving, and clean up afterwards."""
+        # A lone spec connects (and prewarms) up front; federated specs connect on their first call
+        if not self.federated:
+            await self.apis[''].ensure_client()
         
         try:
+            async with anyio.create_task_group() as tg:
+                if self.reload_interval > 0 and any(not api.api_spec.is_remote for api in self.apis.values()):
+                    tg.start_soon(self._watch_spec)
+                yield
+                tg.cancel_scope.cancel()
+        finally:
+            # Clean up the HTTP clients and spilled blobs
+            for api_tools in self.apis.values():
+                await api_tools.close_client()
+            self.blobs.close()
+    
+    async def run(self, transport: str, port: int, debug: bool = False, host: str = "0.0.0.0"):
+        """Run the MCP server with the stdio or SSE transport."""
+        async with self.serving():
             if transport == "sse":
-                await self._run_sse(port)
+                await self._run_sse(port, debug, host)
             else:
                 await self._run_stdio()
-        finally:
-            # Clean up the HTTP client
-            await self.api_tools.close_client()
     
-    async def _run_sse(self, port: int):
+    def _http_routes(self) -> List[Any]:
+        """Plain HTTP routes served next to the MCP transport."""
+        from starlette.responses import JSONResponse, Response
+        from starlette.routing import Route
+        
+        async def handle_tools(request):
+            return Response(self._get_tools_payload(), media_type="application/json")
+        
+        async def handle_stats(request):
+            return JSONResponse(self._get_stats())
+        
+        async def handle_metrics(request):
+            return Response(self._get_metrics(), media_type=metrics.CONTENT_TYPE)
+        
+        return [
+            Route("/tools", endpoint=handle_tools),
+            Route("/stats", endpoint=handle_stats),
+            Route("/metrics", endpoint=handle_metrics),
+        ]
+    
+    async def _run_sse(self, port: int, debug: bool = False, host: str = "0.0.0.0"):
         """Run the server with SSE transport."""
         from mcp.server.sse import SseServerTransport
         from starlette.applications import Starlette
@@ -163,48 +550,255 @@ class MCPOpenAPIServer:
                 request.scope, request.receive, request._send
             ) as streams:
                 await self.app.run(
-                    streams[0], streams[1], self.app.create_initialization_options()
+                    streams[0], streams[1], self._initialization_options()
                 )
         
         starlette_app = Starlette(
-            debug=True,
+            debug=debug,
             routes=[
                 Route("/sse", endpoint=handle_sse),
                 Mount("/messages/", app=sse.handle_post_message),
+                *self._http_routes(),
             ],
         )
         
-        config = uvicorn.Config(starlette_app, host="0.0.0.0", port=port)
+        config = uvicorn.Config(starlette_app, host=host, port=port)
         server = uvicorn.Server(config)
         await server.serve()
     
+    def http_app(self, debug: bool = False):
+        """ASGI app serving the stateless streamable HTTP transport at /mcp.
+        
+        Every request is self-contained (no session lives in this process),
+        so any number of worker processes can serve the same clients as long
+        as blob links are off. Clients aren't sent tools/list_changed here.
+        """
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        from starlette.applications import Starlette
+        from starlette.routing import Mount
+        
+        session_manager = StreamableHTTPSessionManager(app=self.app, stateless=True)
+        
+        @contextlib.asynccontextmanager
+        async def lifespan(app) -> AsyncIterator[None]:
+            async with self.serving(), session_manager.run():
+                yield
+        
+        return Starlette(
+            debug=debug,
+            routes=[
+                Mount("/mcp", app=session_manager.handle_request),
+                *self._http_routes(),
+            ],
+            lifespan=lifespan,
+        )
+    
     async def _run_stdio(self):
         """Run the server with stdio transport."""
         from mcp.server.stdio import stdio_server
         
         async with stdio_server() as streams:
             await self.app.run(
-                streams[0], streams[1], self.app.create_initialization_options()
+                streams[0], streams[1], self._initialization_options()
             )
 
+def load_config(config_path: Optional[str]) -> Dict[str, Any]:
+    """Load the optional YAML file tuning the request pipeline."""
+    if not config_path:
+        return {}
+    with open(config_path, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+def create_server(
+    spec_path: Optional[str],
+    manifest_path: Optional[str] = None,
+    reload_interval: float = 0,
+    cache_dir: Optional[str] = None,
+    config: Optional[Dict[str, Any]] = None,
+) -> MCPOpenAPIServer:
+    """Build the server for a spec (file, URL or directory of specs) or a manifest."""
+    config = config or {}
+    sources = None
+    if manifest_path:
+        sources = load_manifest(manifest_path)
+    elif os.path.isdir(spec_path):
+        sources = discover_specs(spec_path)
+    
+    apis = None
+    if sources is not None:
+        # Specs are fetched and parsed concurrently
+        apis = anyio.run(load_managers, sources, config, cache_dir)
+    return MCPOpenAPIServer(
+        spec_path,
+        reload_interval=reload_interval,
+        cache_dir=cache_dir,
+        config=config,
+        apis=apis,
+    )
+
+def create_app():
+    """ASGI app factory for the streamable HTTP transport, configured from MCP_OPENAPI_* variables.
+    
+    Each `--workers` process calls this; it also works with
+    `uvicorn --factory mcp_server:create_app`.
+    """
+    def build() -> MCPOpenAPIServer:
+        config = load_config(os.environ.get("MCP_OPENAPI_CONFIG") or None)
+        if int(os.environ.get("MCP_OPENAPI_WORKERS") or 1) > 1:
+            # A blob:// link read back through another worker would not resolve, so results stay inline
+            config.setdefault('blobs', {})['links'] = False
+        return create_server(
+            os.environ.get("MCP_OPENAPI_SPEC") or None,
+            manifest_path=os.environ.get("MCP_OPENAPI_MANIFEST") or None,
+            reload_interval=float(os.environ.get("MCP_OPENAPI_RELOAD_INTERVAL", "0")),
+            cache_dir=os.environ.get("MCP_OPENAPI_CACHE_DIR", DEFAULT_CACHE_DIR) or None,
+            config=config,
+        )
+    
+    # uvicorn calls factories inside its running loop, where specs can't be fetched synchronously
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        server = pool.submit(build).result()
+    debug = os.environ.get("MCP_OPENAPI_DEBUG", "").lower() in ("1", "true", "yes")
+    return server.http_app(debug=debug)
+
+def uvloop_available() -> bool:
+    """Whether uvloop is installed (it comes with `uvicorn[standard]`)."""
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
 @click.command()
-@click.argument('spec_path')
-@click.option("--port", default=8000, help="Port to listen on for SSE")
+@click.argument('spec_path', required=False, envvar="MCP_OPENAPI_SPEC")
+@click.option(
+    "--manifest",
+    "manifest_path",
+    envvar="MCP_OPENAPI_MANIFEST",
+    type=click.Path(exists=True, dir_okay=False),
+    help="YAML file mapping namespaces to specs, all served by this one server",
+)
+@click.option("--host", default="0.0.0.0", envvar="MCP_OPENAPI_HOST", help="Address to listen on for SSE and HTTP")
+@click.option("--port", default=8000, envvar="MCP_OPENAPI_PORT", help="Port to listen on for SSE and HTTP")
+@click.option(
+    "--reload-interval",
+    default=5.0,
+    envvar="MCP_OPENAPI_RELOAD_INTERVAL",
+    help="Seconds between checks of a local spec file for changes (0 disables hot reload)",
+)
 @click.option(
     "--transport",
-    type=click.Choice(["stdio", "sse"]),
+    type=click.Choice(["stdio", "sse", "http"]),
     default="stdio",
-    help="Transport type",
+    envvar="MCP_OPENAPI_TRANSPORT",
+    help="Transport type; http is the stateless streamable HTTP transport at /mcp",
+)
+@click.option(
+    "--workers",
+    default=1,
+    envvar="MCP_OPENAPI_WORKERS",
+    help="Worker processes serving the http transport",
+)
+@click.option(
+    "--debug/--no-debug",
+    default=False,
+    envvar="MCP_OPENAPI_DEBUG",
+    help="Return tracebacks from the SSE and HTTP apps",
 )
-def main(spec_path: str, port: int, transport: str) -> int:
-    """Create MCP server with tools from an OpenAPI specification and custom prompts."""
-    server = MCPOpenAPIServer(spec_path)
+@click.option(
+    "--cache-dir",
+    envvar="MCP_OPENAPI_CACHE_DIR",
+    default=DEFAULT_CACHE_DIR,
+    help="Directory for the binary cache of parsed specs (empty string disables it)",
+)
+@click.option(
+    "--config",
+    "config_path",
+    envvar="MCP_OPENAPI_CONFIG",
+    type=click.Path(exists=True, dir_okay=False),
+    help="YAML file with response cache and other request pipeline settings",
+)
+@click.option(
+    "--prewarm-cache",
+    is_flag=True,
+    help="Parse and compile the spec into the cache, then exit (e.g. at image build time)",
+)
+def main(
+    spec_path: Optional[str],
+    manifest_path: Optional[str],
+    host: str,
+    port: int,
+    transport: str,
+    workers: int,
+    debug: bool,
+    reload_interval: float,
+    cache_dir: str,
+    config_path: Optional[str],
+    prewarm_cache: bool,
+) -> int:
+    """Create MCP server with tools from an OpenAPI specification and custom prompts.
+    
+    SPEC_PATH is a spec file or URL, or a directory whose specs are all served
+    with their tools namespaced by file name (as with --manifest).
+    """
+    if bool(spec_path) == bool(manifest_path):
+        raise click.UsageError("Give either SPEC_PATH or --manifest")
+    if workers > 1 and transport != "http":
+        raise click.UsageError("--workers needs --transport http; stdio and SSE sessions live in one process")
+    
+    if prewarm_cache:
+        if not cache_dir:
+            raise click.UsageError("--prewarm-cache needs a --cache-dir")
+        config = load_config(config_path)
+        # Loading through the manager compiles every operation and writes the cache
+        if manifest_path:
+            anyio.run(load_managers, load_manifest(manifest_path), config, cache_dir)
+        elif os.path.isdir(spec_path):
+            anyio.run(load_managers, discover_specs(spec_path), config, cache_dir)
+        else:
+            OpenAPIToolsManager(spec_path, cache_dir=cache_dir, config=config)
+        return 0
+    
+    if transport == "http":
+        import uvicorn
+        
+        # Worker processes build their own server from these
+        for name, value in (
+            ("MCP_OPENAPI_SPEC", spec_path),
+            ("MCP_OPENAPI_MANIFEST", manifest_path and os.path.abspath(manifest_path)),
+            ("MCP_OPENAPI_CONFIG", config_path and os.path.abspath(config_path)),
+            ("MCP_OPENAPI_CACHE_DIR", cache_dir),
+            ("MCP_OPENAPI_RELOAD_INTERVAL", str(reload_interval)),
+            ("MCP_OPENAPI_DEBUG", "1" if debug else "0"),
+            ("MCP_OPENAPI_WORKERS", str(workers)),
+        ):
+            os.environ[name] = value or ""
+        # "auto" picks uvloop and httptools when installed
+        uvicorn.run(
+            "mcp_server:create_app",
+            factory=True,
+            app_dir=os.path.dirname(os.path.abspath(__file__)),
+            host=host,
+            port=port,
+            workers=workers,
+            loop="auto",
+            http="auto",
+        )
+        return 0
+    
+    server = create_server(
+        spec_path,
+        manifest_path=manifest_path,
+        reload_interval=reload_interval,
+        cache_dir=cache_dir or None,
+        config=load_config(config_path),
+    )
     
     async def run_server():
-        await server.run(transport, port)
+        await server.run(transport, port, debug=debug, host=host)
     
-    anyio.run(run_server)
+    anyio.run(run_server, backend_options={"use_uvloop": uvloop_available()})
     return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,189 @@
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Upper bounds, in bytes, of the payload size histogram buckets
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))  # 256 B .. 64 MiB
+
+# Stats keys that only ever grow, exposed as counters; every other number is a gauge
+STAT_COUNTERS = {
+    'hits', 'misses', 'revalidations', 'stores', 'evictions', 'calls', 'upstream_calls', 'coalesced',
+    'requests', 'hedged', 'hedge_wins', 'budget_denied', 'measured_losers', 'censored_losers', 'acquired', 'queued',
+    'timeouts', 'drops', 'failures', 'ejections', 'stored', 'spilled', 'evicted', 'reads',
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    """Fixed-bucket histogram; observing is a bisect and two additions, no allocation."""
+
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        """Initialize with the bucket upper bounds (a last +Inf bucket is implied)."""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class OperationMetrics:
+    """Instruments of one operation, allocated once on its first call.
+
+    The server runs on a single event loop, so plain attribute updates are
+    safe without locks.
+    """
+
+    __slots__ = ('queue', 'upstream', 'serialization', 'response_bytes', 'in_flight', 'statuses', 'errors')
+
+    def __init__(self):
+        """Create the histograms and zero the counters."""
+        # Waiting for concurrency limiter slots, per upstream attempt
+        self.queue = Histogram(LATENCY_BUCKETS)
+        # Sending to an upstream until the response (or, when streaming, its headers) arrived
+        self.upstream = Histogram(LATENCY_BUCKETS)
+        # Turning the response into the tool result
+        self.serialization = Histogram(LATENCY_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.in_flight = 0
+        # Upstream responses by status code; 0 counts attempts that got no response
+        self.statuses: Dict[int, int] = {}
+        # Calls that ended with an error
+        self.errors = 0
+
+    def status(self, code: int) -> None:
+        """Count an upstream response status."""
+        self.statuses[code] = self.statuses.get(code, 0) + 1
+
+
+class MetricsRegistry:
+    """Per-operation instruments of one API, kept across spec reloads."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.operations: Dict[str, OperationMetrics] = {}
+
+    def operation(self, operation_id: str) -> OperationMetrics:
+        """The instruments of an operation, created on its first call."""
+        metrics = self.operations.get(operation_id)
+        if metrics is None:
+            metrics = self.operations[operation_id] = OperationMetrics()
+        return metrics
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    """Render a label set."""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + '}'
+
+
+def _number(value: float) -> str:
+    """Render a sample value."""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Exposition:
+    """Collects samples by metric family and renders the Prometheus text format."""
+
+    def __init__(self, prefix: str = 'mcp'):
+        """Initialize with the prefix of every metric name."""
+        self.prefix = prefix
+        # name -> (type, help, sample lines)
+        self._families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def _family(self, name: str, kind: str, help_text: str) -> List[str]:
+        """Sample lines of a family, declaring it on first use."""
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = (kind, help_text, [])
+        return family[2]
+
+    def add(self, name: str, kind: str, help_text: str, value: Any, labels: Optional[Dict[str, str]] = None) -> None:
+        """Add a counter or gauge sample; None values are skipped."""
+        if value is None:
+            return
+        name = f"{self.prefix}_{name}"
+        if kind == 'counter':
+            name += '_total'
+        self._family(name, kind, help_text).append(f"{name}{_labels(labels or {})} {_number(value)}")
+
+    def add_histogram(self, name: str, help_text: str, histogram: Histogram, labels: Dict[str, str]) -> None:
+        """Add a histogram's cumulative buckets, sum and count."""
+        name = f"{self.prefix}_{name}"
+        lines = self._family(name, 'histogram', help_text)
+        cumulative = 0
+        for bound, count in zip(histogram.bounds + (float('inf'),), histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(dict(labels, le=_number(bound)))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+
+    def add_stats(self, section: str, stats: Dict[str, Any], labels: Optional[Dict[str, str]] = None) -> None:
+        """Add the numeric fields of a stats dict, counters or gauges by key."""
+        for key, value in stats.items():
+            if isinstance(value, bool):
+                value = int(value)
+            if value is not None and not isinstance(value, (int, float)):
+                continue
+            kind = 'counter' if key in STAT_COUNTERS else 'gauge'
+            self.add(f"{section}_{key}", kind, f"{section} {key.replace('_', ' ')}", value, labels)
+
+    def text(self) -> str:
+        """The exposition text."""
+        out = []
+        for name, (kind, help_text, lines) in self._families.items():
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(lines)
+        return '\n'.join(out) + '\n'
+
+
+def add_api_metrics(exposition: Exposition, registry: MetricsRegistry, stats: Dict[str, Any], api: str) -> None:
+    """Add one API's per-operation instruments and pipeline stats; `api` labels them on a federated server."""
+    base = {'api': api} if api else {}
+    for operation_id, metrics in registry.operations.items():
+        labels = dict(base, operation=operation_id)
+        exposition.add_histogram(
+            'operation_queue_seconds', "Time waiting for concurrency limiter slots", metrics.queue, labels
+        )
+        exposition.add_histogram(
+            'operation_upstream_seconds', "Time from sending to an upstream to its response", metrics.upstream, labels
+        )
+        exposition.add_histogram(
+            'operation_serialization_seconds', "Time rendering responses into tool results", metrics.serialization, labels
+        )
+        exposition.add_histogram(
+            'operation_response_bytes', "Size of upstream response bodies", metrics.response_bytes, labels
+        )
+        exposition.add('operation_in_flight', 'gauge', "Tool calls in progress", metrics.in_flight, labels)
+        exposition.add('operation_errors', 'counter', "Tool calls that failed", metrics.errors, labels)
+        for code, count in sorted(metrics.statuses.items()):
+            exposition.add(
+                'operation_responses', 'counter', "Upstream responses by status code (0: no response)",
+                count, dict(labels, status=str(code)),
+            )
+
+    for section in ('response_cache', 'coalescing', 'hedging'):
+        if section in stats:
+            exposition.add_stats(section, stats[section], base)
+    limits = stats.get('limits') or {}
+    for scope in ('hosts', 'operations'):
+        for name, limiter_stats in (limits.get(scope) or {}).items():
+            exposition.add_stats('limiter', limiter_stats, dict(base, scope=scope[:-1], name=name))
+    for upstream in stats.get('upstreams') or []:
+        exposition.add_stats('upstream', upstream, dict(base, upstream=upstream['base_url']))
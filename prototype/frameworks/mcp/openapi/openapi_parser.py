@@ -1,208 +1,991 @@
-import json
-import yaml
+import asyncio
+import os
+import ssl
+import time
 import httpx
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlparse
+from schema_compiler import SchemaCompiler
+from spec_cache import SpecCache
+from spec_loader import HTTPCache, LoadedSpec, SpecLoader
+from response_cache import DROPPED_HEADERS, ResponseCache
+from singleflight import SingleFlight
+from upstreams import Upstream, UpstreamPool
+from hedging import Hedger
+from limiter import ConcurrencyLimits, parse_retry_after
+import json_codec
+from projection import FIELDS_ARGUMENT, FIELDS_SCHEMA, fit_json, fit_text, estimate_tokens, parse_fields, project, returns_json
+from streaming import ProgressCallback, declares_ndjson, is_ndjson, read_capped, read_ndjson
+from pagination import MAX_ITEMS_ARGUMENT, PAGINATED_SUFFIX, Pagination, Paginator, detect_pagination
+from validation import ArgumentValidator
+from metrics import MetricsRegistry, OperationMetrics
+
+HTTP_METHODS = ('get', 'post', 'put', 'delete', 'patch')
+
+# Upstream answers that mean "too much load", shrinking the concurrency limit
+OVERLOAD_STATUS_CODES = (429, 503)
+
+def is_text_content_type(content_type: str) -> bool:
+    """Whether a response media type is text the model can read (as opposed to binary)."""
+    media_type = content_type.split(';')[0].strip().lower()
+    if not media_type or media_type.startswith('text/'):
+        return True
+    return media_type.endswith(('json', 'xml', 'javascript', 'yaml', 'x-www-form-urlencoded'))
+
+_ssl_context: Optional[ssl.SSLContext] = None
+
+def shared_ssl_context() -> ssl.SSLContext:
+    """One verifying SSL context for every client; building one loads the CA bundle (~0.5 MB, ~100 ms)."""
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = httpx.create_ssl_context()
+    return _ssl_context
+
+# Tool argument holding the request body when it isn't an object we can flatten
+BODY_ARGUMENT = 'body'
+
+class CompiledEndpoint:
+    """Precompiled view of a single OpenAPI operation used for tool dispatch."""
+
+    __slots__ = (
+        'operation_id', 'method', 'path', 'endpoint',
+        'path_params', 'query_params', 'header_params', 'body_content_type', 'body_wrapped',
+        'cacheable', 'cache_ttl', 'coalesce', 'hedge', 'idempotent', 'concurrency',
+        'fields', 'fields_argument', 'max_tokens', 'stream', 'pagination',
+        'validator', 'paginated_validator', 'metrics',
+    )
+
+    def __init__(self, endpoint: Dict[str, Any], body_wrapped: bool = False):
+        """Partition the endpoint parameters and decide how the body is sent."""
+        self.endpoint = endpoint
+        self.operation_id = endpoint['operation_id']
+        self.method = endpoint['method'].upper()
+        self.path = endpoint['path']
+
+        self.path_params: List[str] = []
+        self.query_params: List[str] = []
+        self.header_params: List[str] = []
+        for param in endpoint['parameters']:
+            location = param.get('in')
+            if location == 'path':
+                self.path_params.append(param['name'])
+            elif location == 'query':
+                self.query_params.append(param['name'])
+            elif location == 'header':
+                self.header_params.append(param['name'])
+
+        self.body_content_type = self.select_body_content_type(endpoint.get('request_body') or {})
+        self.body_wrapped = body_wrapped
+        
+        # Per-operation behaviour, filled in from config by OpenAPIToolsManager
+        self.cacheable = False
+        self.cache_ttl: Optional[float] = None
+        self.coalesce = False
+        self.hedge = False
+        self.idempotent = False
+        self.concurrency: Optional[Dict[str, Any]] = None
+        self.fields: Optional[Dict[str, Any]] = None
+        self.fields_argument = False
+        self.max_tokens: Optional[int] = None
+        self.stream = False
+        self.pagination: Optional[Pagination] = None
+        # Compiled on first call from the tool's input schema
+        self.validator: Optional[ArgumentValidator] = None
+        self.paginated_validator: Optional[ArgumentValidator] = None
+        # Latency, size and status instruments, attached on the first call
+        self.metrics: Optional[OperationMetrics] = None
+
+    @staticmethod
+    def select_body_content_type(request_body: Dict[str, Any]) -> Optional[str]:
+        """Pick the request body media type to send, preferring JSON."""
+        content_types = list(request_body.get('content', {}).keys())
+        if 'application/json' in content_types:
+            return 'application/json'
+        for content_type in content_types:
+            if content_type.endswith('+json'):
+                return content_type
+        if 'application/x-www-form-urlencoded' in content_types:
+            return 'application/x-www-form-urlencoded'
+        return None
+
+    def build_request_parts(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Split tool arguments into the keyword arguments for an HTTP request."""
+        path = self.path
+        query_params = {}
+        headers = {}
+        consumed = set()
+
+        for name in self.path_params:
+            if name in arguments:
+                path = path.replace(f"{{{name}}}", str(arguments[name]))
+                consumed.add(name)
+        for name in self.query_params:
+            if name in arguments:
+                query_params[name] = arguments[name]
+                consumed.add(name)
+        for name in self.header_params:
+            if name in arguments:
+                headers[name] = str(arguments[name])
+                consumed.add(name)
+
+        parts = {'method': self.method, 'url': path, 'params': query_params, 'headers': headers}
+
+        if self.body_content_type is not None:
+            if self.body_wrapped:
+                body_params = arguments.get(BODY_ARGUMENT)
+            else:
+                # Arguments that aren't path, query or header params make up the body
+                body_params = {k: v for k, v in arguments.items() if k not in consumed}
+            if body_params is not None and body_params != {}:
+                if self.body_content_type == 'application/x-www-form-urlencoded':
+                    parts['data'] = body_params
+                else:
+                    parts['json'] = body_params
+                    if self.body_content_type != 'application/json':
+                        headers['Content-Type'] = self.body_content_type
+
+        return parts
 
 class OpenAPISpec:
     """Class for parsing and working with OpenAPI specifications."""
     
-    def __init__(self, spec_path: str):
-        """Initialize with path to an OpenAPI spec file or URL."""
-        self.spec = self._load_spec(spec_path)
+    def __init__(self, spec_path: str, cache_dir: Optional[str] = None, loaded: Optional[LoadedSpec] = None):
+        """Initialize with path to an OpenAPI spec file or URL.
+        
+        This reads the spec synchronously (URLs included, outside a running
+        event loop); `await OpenAPISpec.load(...)` reads it without blocking.
+        """
+        self.spec_path = spec_path
+        self.cache = SpecCache(cache_dir) if cache_dir else None
+        self._endpoints: Optional[List[Dict[str, Any]]] = None
+        self._input_schemas: Dict[str, Dict[str, Any]] = {}
+        # Operations whose request body is passed as a single `body` argument
+        self._wrapped_bodies = set()
+        # Whether the spec and its compiled schemas came from the binary cache
+        self.from_cache = False
+        if loaded is None:
+            loaded = self._loader(cache_dir).load_sync(spec_path)
+        self.content_hash: Optional[str] = loaded.content_hash
+        self.mtime_ns: Optional[int] = loaded.mtime_ns
+        # Hashes of the external documents bundled into the spec, by location
+        self.documents = loaded.documents
+        self.spec = self._apply_loaded(loaded)
         self.base_url = self._get_base_url()
+        self.schema_compiler = SchemaCompiler(self.spec)
+    
+    @classmethod
+    async def load(
+        cls, spec_path: str, cache_dir: Optional[str] = None, client: Optional[httpx.AsyncClient] = None
+    ) -> 'OpenAPISpec':
+        """Load a spec without blocking the event loop, fetching its external documents concurrently over `client`."""
+        loaded = await cls._loader(cache_dir, client).load(spec_path)
+        return cls(spec_path, cache_dir=cache_dir, loaded=loaded)
+    
+    @staticmethod
+    def _loader(cache_dir: Optional[str], client: Optional[httpx.AsyncClient] = None) -> SpecLoader:
+        """A loader using the binary spec cache and the HTTP cache under `cache_dir`."""
+        if not cache_dir:
+            return SpecLoader(client=client)
+        return SpecLoader(SpecCache(cache_dir), HTTPCache(os.path.join(cache_dir, 'http')), client=client)
+    
+    def _apply_loaded(self, loaded: LoadedSpec) -> Dict[str, Any]:
+        """Take the parsed spec, or the spec and compiled schemas of a binary cache hit."""
+        payload = loaded.payload
+        if payload is None:
+            return loaded.spec
+        self._endpoints = payload['endpoints']
+        self._input_schemas = payload['input_schemas']
+        self._wrapped_bodies = set(payload['wrapped_bodies'])
+        self.from_cache = True
+        return payload['spec']
+    
+    def save_cache(self) -> bool:
+        """Compile every operation and write the result to the binary cache."""
+        if self.cache is None or self.content_hash is None:
+            return False
         
-    async def _fetch_spec(self, url: str) -> Dict[str, Any]:
-        """Fetch an OpenAPI spec from a URL."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            content = response.text
-            
-            if url.endswith('.yaml') or url.endswith('.yml'):
-                return yaml.safe_load(content)
-            else:
-                return json.loads(content)
+        endpoints = self.get_endpoints()
+        for endpoint in endpoints:
+            self.generate_input_schema(endpoint)
+        
+        return self.cache.store(self.content_hash, {
+            'spec': self.spec,
+            'endpoints': endpoints,
+            'input_schemas': self._input_schemas,
+            'wrapped_bodies': sorted(self._wrapped_bodies),
+            'documents': self.documents,
+        })
     
-    def _load_spec(self, spec_path: str) -> Dict[str, Any]:
-        """Load and parse the OpenAPI spec file or URL."""
-        if spec_path.startswith('http://') or spec_path.startswith('https://'):
-            # For URLs, we need to run this in an event loop
-            import asyncio
-            try:
-                return asyncio.run(self._fetch_spec(spec_path))
-            except Exception as e:
-                raise ValueError(f"Failed to fetch OpenAPI spec from URL: {e}")
-        else:
-            # For local files
-            with open(spec_path, 'r') as f:
-                if spec_path.endswith('.yaml') or spec_path.endswith('.yml'):
-                    return yaml.safe_load(f)
-                else:
-                    return json.load(f)
+    @property
+    def is_remote(self) -> bool:
+        """Whether the spec was loaded from a URL rather than a local file."""
+        return self.spec_path.startswith('http://') or self.spec_path.startswith('https://')
     
     def _get_base_url(self) -> str:
         """Extract the base URL from the OpenAPI spec."""
-        if 'servers' in self.spec and self.spec['servers']:
-            return self.spec['servers'][0]['url']
-        return ""
+        server_urls = self.get_server_urls()
+        return server_urls[0] if server_urls else ""
+    
+    def get_server_urls(self) -> List[str]:
+        """All server URLs from the spec, with server variables set to their defaults."""
+        urls = []
+        for server in self.spec.get('servers') or []:
+            url = server.get('url', '')
+            for name, variable in (server.get('variables') or {}).items():
+                url = url.replace(f"{{{name}}}", str(variable.get('default', '')))
+            if self.is_remote and not urlparse(url).scheme:
+                # Relative server URLs are relative to where the spec was served from
+                url = urljoin(self.spec_path, url)
+            urls.append(url)
+        return urls
     
     def get_endpoints(self) -> List[Dict[str, Any]]:
         """Extract endpoints from the OpenAPI spec."""
+        if self._endpoints is not None:
+            return self._endpoints
+        
+        resolve = self.schema_compiler.resolve_node
         endpoints = []
         
         for path, path_item in self.spec.get('paths', {}).items():
+            path_item = resolve(path_item)
+            path_parameters = [resolve(p) for p in path_item.get('parameters', [])]
             for method, operation in path_item.items():
-                if method in ['get', 'post', 'put', 'delete', 'patch']:
+                if method in HTTP_METHODS:
+                    # Operation parameters override path-level ones with the same name and location
+                    parameters = {(p.get('name'), p.get('in')): p for p in path_parameters}
+                    for param in operation.get('parameters', []):
+                        param = resolve(param)
+                        parameters[(param.get('name'), param.get('in'))] = param
+                    
                     endpoint = {
                         'path': path,
                         'method': method,
                         'operation_id': operation.get('operationId', f"{method}_{path}".replace('/', '_')),
                         'summary': operation.get('summary', ''),
                         'description': operation.get('description', ''),
-                        'parameters': operation.get('parameters', []),
-                        'request_body': operation.get('requestBody', {}),
-                        'responses': operation.get('responses', {})
+                        'parameters': list(parameters.values()),
+                        'request_body': resolve(operation.get('requestBody', {})),
+                        'responses': operation.get('responses', {}),
+                        'operation': operation
                     }
                     endpoints.append(endpoint)
         
+        self._endpoints = endpoints
         return endpoints
     
+    def compile_operations(self) -> Dict[str, CompiledEndpoint]:
+        """Build the operation_id -> CompiledEndpoint registry used for dispatch."""
+        registry = {}
+        for endpoint in self.get_endpoints():
+            # Keep the first definition, matching the previous linear lookup
+            if endpoint['operation_id'] not in registry:
+                self.generate_input_schema(endpoint)
+                body_wrapped = endpoint['operation_id'] in self._wrapped_bodies
+                registry[endpoint['operation_id']] = CompiledEndpoint(endpoint, body_wrapped=body_wrapped)
+        return registry
+    
     def generate_input_schema(self, endpoint: Dict[str, Any]) -> Dict[str, Any]:
         """Generate JSON Schema for the endpoint parameters."""
+        operation_id = endpoint['operation_id']
+        if operation_id in self._input_schemas:
+            return self._input_schemas[operation_id]
+        
+        compiler = self.schema_compiler
         properties = {}
         required = []
+        deps = frozenset()
         
-        # Path and query parameters
+        # Path, query and header parameters
         for param in endpoint['parameters']:
             param_name = param['name']
-            param_schema = param.get('schema', {})
+            param_schema, param_deps = compiler.compile(param.get('schema') or {'type': 'string'})
+            deps |= param_deps
             
-            properties[param_name] = {
-                'type': param_schema.get('type', 'string'),
-                'description': param.get('description', '')
-            }
+            properties[param_name] = dict(param_schema)
+            if param.get('description'):
+                properties[param_name]['description'] = param['description']
             
             if param.get('required', False):
                 required.append(param_name)
         
         # Request body if it exists
-        if 'requestBody' in endpoint and endpoint['requestBody']:
-            content = endpoint['requestBody'].get('content', {})
-            if 'application/json' in content:
-                body_schema = content['application/json'].get('schema', {})
-                
-                if 'properties' in body_schema:
-                    for prop_name, prop_schema in body_schema['properties'].items():
-                        properties[prop_name] = {
-                            'type': prop_schema.get('type', 'string'),
-                            'description': prop_schema.get('description', '')
-                        }
-                
-                if 'required' in body_schema:
-                    required.extend(body_schema['required'])
-        
-        return {
+        request_body = endpoint.get('request_body') or {}
+        body_wrapped = False
+        content_type = CompiledEndpoint.select_body_content_type(request_body)
+        if content_type is not None:
+            body_schema, body_deps = compiler.compile(request_body['content'][content_type].get('schema', {}))
+            deps |= body_deps
+            
+            body_properties = self._object_properties(compiler.expand(body_schema))
+            if body_properties is not None:
+                # Flatten object bodies into top-level tool arguments
+                body_props, body_required = body_properties
+                properties.update(body_props)
+                required.extend(body_required)
+            else:
+                body_wrapped = True
+                properties[BODY_ARGUMENT] = body_schema
+                if request_body.get('required', False):
+                    required.append(BODY_ARGUMENT)
+        
+        schema = {
             'type': 'object',
             'properties': properties,
             'required': required
         }
+        if body_wrapped:
+            self._wrapped_bodies.add(operation_id)
+        if deps:
+            schema['$defs'] = compiler.defs_for(deps)
+        
+        self._input_schemas[operation_id] = schema
+        return schema
+    
+    @staticmethod
+    def _object_properties(schema: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+        """Return the properties and required names of an object schema, merging allOf parts."""
+        if not isinstance(schema, dict) or '$ref' in schema:
+            return None
+        parts = schema.get('allOf', [])
+        if 'properties' not in schema and not parts:
+            return None
+        
+        properties = dict(schema.get('properties', {}))
+        required = list(schema.get('required', []))
+        for part in parts:
+            merged = OpenAPISpec._object_properties(part)
+            if merged is None:
+                return None
+            properties.update(merged[0])
+            required.extend(merged[1])
+        return properties, required
 
 class OpenAPIToolsManager:
     """Class for creating MCP tools from OpenAPI specifications."""
     
-    def __init__(self, spec_path: str):
-        """Initialize with path to an OpenAPI spec file."""
-        self.api_spec = OpenAPISpec(spec_path)
+    def __init__(
+        self,
+        spec_path: str,
+        cache_dir: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        api_spec: Optional[OpenAPISpec] = None,
+    ):
+        """Initialize with path to an OpenAPI spec file (or the spec, already loaded) and optional tuning config."""
+        self.cache_dir = cache_dir
+        self.config = config or {}
+        self.api_spec = self._load_api_spec(spec_path, api_spec)
+        self.operations = self._compile_operations(self.api_spec)
         self.client = None
+        self._client_lock = asyncio.Lock()
+        
+        cache_config = self.config.get('response_cache', {})
+        self.response_cache = None
+        if cache_config.get('enabled', False):
+            self.response_cache = ResponseCache(
+                max_bytes=cache_config.get('max_bytes', 64 * 1024 * 1024),
+                max_entries=cache_config.get('max_entries', 2048),
+                default_ttl=cache_config.get('default_ttl', 0.0),
+            )
+        
+        # Identical concurrent GET/HEAD calls share one upstream request
+        self.singleflight = SingleFlight() if self.config.get('coalesce', {}).get('enabled', True) else None
+        
+        self.upstreams = self._create_upstream_pool(self.api_spec)
+        
+        hedging_config = self.config.get('hedging', {})
+        self.hedger = None
+        if hedging_config.get('enabled', False):
+            self.hedger = Hedger(
+                percentile=hedging_config.get('percentile', 95.0),
+                min_delay=hedging_config.get('min_delay_ms', 10) / 1000,
+                min_samples=hedging_config.get('min_samples', 20),
+                max_ratio=hedging_config.get('max_ratio', 0.1),
+                measure_ratio=hedging_config.get('measure_ratio', 0.1),
+            )
+        
+        self.json_mode = self.config.get('response', {}).get('json_mode', 'passthrough')
+        if self.json_mode not in json_codec.JSON_MODES:
+            raise ValueError(f"response.json_mode must be one of {', '.join(json_codec.JSON_MODES)}")
+        
+        streaming_config = self.config.get('streaming', {})
+        self.stream_max_bytes = streaming_config.get('max_bytes', 32 * 1024 * 1024)
+        self.stream_max_items = streaming_config.get('max_items', 1000)
+        
+        # Arguments are checked (and coerced) against the tool schema before dispatch
+        validation_config = self.config.get('validation', {})
+        self.validate_arguments = validation_config.get('enabled', True)
+        self.coerce_arguments = validation_config.get('coerce', True)
+        
+        self.metrics = MetricsRegistry()
+        
+        limits_config = self.config.get('limits', {})
+        self.limits = None
+        if limits_config.get('enabled', True):
+            self.limits = ConcurrencyLimits(
+                limits_config,
+                queue_timeout=limits_config.get('queue_timeout', 30.0),
+                max_retries=limits_config.get('max_retries', 2),
+            )
+    
+    def _create_upstream_pool(self, api_spec: OpenAPISpec) -> UpstreamPool:
+        """Create the pool balancing requests over every server the spec (or config) lists."""
+        http_config = self.config.get('http', {})
+        servers = http_config.get('servers') or api_spec.get_server_urls() or [api_spec.base_url]
+        return UpstreamPool(
+            servers,
+            failure_threshold=http_config.get('failure_threshold', 5),
+            ejection_time=http_config.get('ejection_time', 30.0),
+            max_ejection_percent=http_config.get('max_ejection_percent', 50.0),
+        )
+    
+    def _compile_operations(self, api_spec: OpenAPISpec) -> Dict[str, CompiledEndpoint]:
+        """Compile the operation registry and apply per-operation settings."""
+        operations = api_spec.compile_operations()
+        for endpoint in operations.values():
+            self._configure_operation(endpoint)
+            endpoint.fields_argument = self._has_fields_argument(api_spec, endpoint.endpoint)
+        return operations
+    
+    def operation_setting(self, endpoint: CompiledEndpoint, section: str, extension: str) -> Any:
+        """Per-operation setting from the config file, falling back to an `x-mcp-*` spec extension."""
+        overrides = self.config.get(section, {}).get('operations', {})
+        if endpoint.operation_id in overrides:
+            return overrides[endpoint.operation_id]
+        return endpoint.endpoint.get('operation', {}).get(extension)
+    
+    def _configure_operation(self, endpoint: CompiledEndpoint) -> None:
+        """Apply config and spec extensions to a compiled operation."""
+        cache_setting = self.operation_setting(endpoint, 'response_cache', 'x-mcp-cache')
+        if cache_setting is None:
+            cache_setting = self.config.get('response_cache', {}).get('default', True)
+        endpoint.cacheable = endpoint.method == 'GET' and cache_setting is not False
+        if isinstance(cache_setting, dict):
+            endpoint.cache_ttl = cache_setting.get('ttl')
+        
+        coalesce_setting = self.operation_setting(endpoint, 'coalesce', 'x-mcp-coalesce')
+        endpoint.coalesce = endpoint.method in ('GET', 'HEAD') and coalesce_setting is not False
+        
+        # Only idempotent operations may be sent twice
+        endpoint.idempotent = endpoint.method in ('GET', 'HEAD') or endpoint.endpoint.get('operation', {}).get('x-mcp-idempotent') is True
+        hedge_setting = self.operation_setting(endpoint, 'hedging', 'x-mcp-hedge')
+        endpoint.hedge = endpoint.idempotent and hedge_setting is not False
+        
+        # An operation gets its own limiter (on top of its host's) when configured
+        concurrency_setting = self.operation_setting(endpoint, 'limits', 'x-mcp-concurrency')
+        if concurrency_setting is None:
+            concurrency_setting = self.config.get('limits', {}).get('per_operation', False)
+        if isinstance(concurrency_setting, dict):
+            endpoint.concurrency = concurrency_setting
+        elif concurrency_setting is True:
+            endpoint.concurrency = {}
+        
+        projection_setting = self.operation_setting(endpoint, 'projection', 'x-mcp-projection') or {}
+        endpoint.fields = parse_fields(projection_setting.get('fields'))
+        endpoint.max_tokens = projection_setting.get(
+            'max_tokens', self.config.get('projection', {}).get('max_tokens', 0)
+        ) or None
+        
+        # NDJSON endpoints are streamed unless told otherwise
+        stream_setting = self.operation_setting(endpoint, 'streaming', 'x-mcp-stream')
+        if stream_setting is None:
+            stream_setting = self.config.get('streaming', {}).get('default', False) or declares_ndjson(endpoint.endpoint.get('operation', {}))
+        endpoint.stream = bool(stream_setting)
+        
+        # List operations get a `*_all` tool walking every page
+        pagination_setting = self.operation_setting(endpoint, 'pagination', 'x-mcp-pagination')
+        if not self.config.get('pagination', {}).get('enabled', True) or pagination_setting is False:
+            endpoint.pagination = None
+        elif isinstance(pagination_setting, dict):
+            endpoint.pagination = Pagination(
+                pagination_setting.get('style', 'link'),
+                param=pagination_setting.get('param'),
+                size_param=pagination_setting.get('size_param'),
+            )
+        else:
+            endpoint.pagination = detect_pagination(endpoint.endpoint)
+    
+    def _has_fields_argument(self, api_spec: OpenAPISpec, endpoint: Dict[str, Any]) -> bool:
+        """Whether the tool for an endpoint takes the `_fields` projection argument."""
+        if not self.config.get('projection', {}).get('fields_argument', True):
+            return False
+        if not returns_json(endpoint.get('operation', {})):
+            return False
+        # Never shadow a real parameter of the same name
+        return FIELDS_ARGUMENT not in api_spec.generate_input_schema(endpoint)['properties']
+    
+    def _load_api_spec(self, spec_path: str, api_spec: Optional[OpenAPISpec] = None) -> OpenAPISpec:
+        """Load a spec (unless already loaded), refreshing the binary cache when it was stale or missing."""
+        if api_spec is None:
+            api_spec = OpenAPISpec(spec_path, cache_dir=self.cache_dir)
+        if api_spec.cache is not None and not api_spec.from_cache:
+            api_spec.save_cache()
+        return api_spec
+    
+    def spec_modified(self) -> bool:
+        """Check whether the local spec file's mtime moved since it was loaded."""
+        if self.api_spec.is_remote:
+            return False
+        try:
+            return os.stat(self.api_spec.spec_path).st_mtime_ns != self.api_spec.mtime_ns
+        except OSError:
+            return False
+    
+    def load_changed_spec(self) -> Optional[Tuple[OpenAPISpec, Dict[str, CompiledEndpoint]]]:
+        """Re-read the spec file and return it only if its content hash changed.
+        
+        This does the parsing work and is safe to run in a worker thread.
+        """
+        spec = OpenAPISpec(self.api_spec.spec_path, cache_dir=self.cache_dir)
+        if spec.content_hash == self.api_spec.content_hash and spec.documents == self.api_spec.documents:
+            # Touched but identical, remember the new mtime so we stop re-reading it
+            self.api_spec.mtime_ns = spec.mtime_ns
+            return None
+        if spec.cache is not None and not spec.from_cache:
+            spec.save_cache()
+        # Compile here too so swapping it in is cheap
+        return spec, self._compile_operations(spec)
+    
+    def apply_spec(self, spec: OpenAPISpec, operations: Dict[str, CompiledEndpoint]) -> None:
+        """Swap in a freshly loaded spec and its operation registry in one step."""
+        if spec.get_server_urls() != self.api_spec.get_server_urls():
+            self.upstreams = self._create_upstream_pool(spec)
+        self.api_spec, self.operations = spec, operations
     
     async def initialize_client(self) -> None:
         """Initialize the HTTP client."""
+        http_config = self.config.get('http', {})
+        
+        http2 = http_config.get('http2', False)
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                raise ValueError("http.http2 needs the 'h2' package (pip install 'httpx[http2]')")
+        
+        timeout = http_config.get('timeout', 5.0)
+        if isinstance(timeout, dict):
+            timeout = httpx.Timeout(timeout.get('default', 5.0), **{
+                k: v for k, v in timeout.items() if k in ('connect', 'read', 'write', 'pool')
+            })
+        
         self.client = httpx.AsyncClient(
-            base_url=self.api_spec.base_url,
+            # Requests are built against the primary server and re-aimed per upstream
+            base_url=str(self.upstreams.primary.base_url),
             follow_redirects=True,
             headers={
                 "User-Agent": "MCP OpenAPI Tool (github.com/modelcontextprotocol/python-sdk)",
                 "Accept": "application/json"
-            }
+            },
+            limits=httpx.Limits(
+                max_connections=http_config.get('max_connections', 100),
+                max_keepalive_connections=http_config.get('max_keepalive_connections', 20),
+                keepalive_expiry=http_config.get('keepalive_expiry', 5.0),
+            ),
+            timeout=timeout,
+            http2=http2,
+            verify=shared_ssl_context(),
         )
+        
+        await self._prewarm_connections(http_config.get('prewarm_connections', 0))
+    
+    async def ensure_client(self) -> None:
+        """Create the HTTP client on first use, once even under concurrent first calls."""
+        if self.client is not None:
+            return
+        async with self._client_lock:
+            if self.client is None:
+                await self.initialize_client()
+    
+    async def _prewarm_connections(self, per_upstream: int) -> None:
+        """Open keep-alive connections to every upstream before the first tool call."""
+        if per_upstream <= 0:
+            return
+        
+        async def warm(upstream: Upstream) -> None:
+            try:
+                await self.client.head(str(upstream.base_url))
+            except httpx.HTTPError:
+                # An unreachable server will be found out (and ejected) by real traffic
+                pass
+        
+        # Concurrent requests so each one needs its own connection
+        await asyncio.gather(*[
+            warm(upstream)
+            for upstream in self.upstreams.upstreams
+            for _ in range(per_upstream)
+        ])
     
     async def close_client(self) -> None:
         """Close the HTTP client."""
         if self.client:
             await self.client.aclose()
     
+    def get_stats(self) -> Dict[str, Any]:
+        """Runtime counters of the request pipeline."""
+        stats = {}
+        if self.response_cache is not None:
+            stats['response_cache'] = self.response_cache.stats()
+        if self.singleflight is not None:
+            stats['coalescing'] = self.singleflight.stats()
+        if self.hedger is not None:
+            stats['hedging'] = self.hedger.stats()
+        if self.limits is not None:
+            stats['limits'] = self.limits.stats()
+        stats['upstreams'] = self.upstreams.stats()
+        return stats
+    
     def get_endpoints(self) -> List[Dict[str, Any]]:
         """Get all endpoints from the OpenAPI spec."""
         return self.api_spec.get_endpoints()
     
     def generate_input_schema(self, endpoint: Dict[str, Any]) -> Dict[str, Any]:
         """Generate JSON Schema for the endpoint parameters."""
-        return self.api_spec.generate_input_schema(endpoint)
+        return self.tool_input_schema(self.api_spec, endpoint)
     
-    async def execute_api_call(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute an API call by making the appropriate HTTP request."""
-        # Find the endpoint that corresponds to this tool name
-        matching_endpoints = [
-            e for e in self.api_spec.get_endpoints() 
-            if e['operation_id'] == name
-        ]
+    def tool_input_schema(self, api_spec: OpenAPISpec, endpoint: Dict[str, Any]) -> Dict[str, Any]:
+        """Input schema of an endpoint's tool: its parameters plus the `_fields` argument."""
+        schema = api_spec.generate_input_schema(endpoint)
+        if not self._has_fields_argument(api_spec, endpoint):
+            return schema
+        # The spec's schema is memoized and shared, extend a copy
+        return dict(schema, properties=dict(schema['properties'], **{FIELDS_ARGUMENT: FIELDS_SCHEMA}))
+    
+    def paginated_input_schema(self, api_spec: OpenAPISpec, endpoint: Dict[str, Any], pagination: Pagination) -> Dict[str, Any]:
+        """Input schema of an endpoint's `*_all` tool: the page-selecting parameter is ours to drive."""
+        schema = self.tool_input_schema(api_spec, endpoint)
+        properties = {name: value for name, value in schema['properties'].items() if name != pagination.param}
+        properties[MAX_ITEMS_ARGUMENT] = {
+            'type': 'integer',
+            'minimum': 1,
+            'description': f"Stop after this many items (default {self.config.get('pagination', {}).get('max_items', 1000)})",
+        }
+        required = [name for name in schema['required'] if name != pagination.param]
+        return dict(schema, properties=properties, required=required)
+    
+    async def execute_api_call(
+        self,
+        name: str,
+        arguments: Dict[str, Any],
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """Execute an API call by making the appropriate HTTP request.
         
-        if not matching_endpoints:
+        `progress` is called as the body of a streamed response arrives.
+        """
+        endpoint = self.operations.get(name)
+        paginated = False
+        if endpoint is None and name.endswith(PAGINATED_SUFFIX):
+            endpoint = self.operations.get(name[:-len(PAGINATED_SUFFIX)])
+            paginated = endpoint is not None and endpoint.pagination is not None
+            if not paginated:
+                endpoint = None
+        if endpoint is None:
             raise ValueError(f"Unknown endpoint: {name}")
         
-        endpoint = matching_endpoints[0]
-        path = endpoint['path']
-        method = endpoint['method']
+        metrics = endpoint.metrics
+        if metrics is None:
+            # Operations that are never called cost nothing; reloads keep the same instruments
+            metrics = endpoint.metrics = self.metrics.operation(endpoint.operation_id)
+        metrics.in_flight += 1
+        try:
+            return await self._execute(endpoint, arguments, paginated, progress)
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.in_flight -= 1
+    
+    async def _execute(
+        self,
+        endpoint: CompiledEndpoint,
+        arguments: Dict[str, Any],
+        paginated: bool,
+        progress: Optional[ProgressCallback],
+    ) -> Dict[str, Any]:
+        """Validate the arguments, call the operation and render the result."""
+        if self.validate_arguments:
+            arguments = self._validator(endpoint, paginated)(arguments)
         
-        # Process path parameters
-        path_params = {}
-        query_params = {}
-        body_params = {}
+        fields = endpoint.fields
+        if endpoint.fields_argument and FIELDS_ARGUMENT in arguments:
+            arguments = dict(arguments)
+            fields = parse_fields(arguments.pop(FIELDS_ARGUMENT)) or fields
         
-        for param in endpoint['parameters']:
-            param_name = param['name']
-            if param_name in arguments:
-                if param['in'] == 'path':
-                    path_params[param_name] = arguments[param_name]
-                    path = path.replace(f"{{{param_name}}}", str(arguments[param_name]))
-                elif param['in'] == 'query':
-                    query_params[param_name] = arguments[param_name]
-        
-        # Check if there's a request body
-        if 'requestBody' in endpoint and endpoint['requestBody']:
-            content_type = list(endpoint['requestBody'].get('content', {}).keys())
-            if 'application/json' in content_type:
-                # Filter arguments that aren't path or query params
-                body_params = {
-                    k: v for k, v in arguments.items()
-                    if k not in path_params and k not in query_params
-                }
-        
-        # Make the request
-        response = None
-        if method == 'get':
-            response = await self.client.get(path, params=query_params)
-        elif method == 'post':
-            response = await self.client.post(path, params=query_params, json=body_params if body_params else None)
-        elif method == 'put':
-            response = await self.client.put(path, params=query_params, json=body_params if body_params else None)
-        elif method == 'delete':
-            response = await self.client.delete(path, params=query_params)
-        elif method == 'patch':
-            response = await self.client.patch(path, params=query_params, json=body_params if body_params else None)
+        if paginated:
+            return await self._execute_paginated(endpoint, arguments, fields)
+        
+        request = self.client.build_request(**endpoint.build_request_parts(arguments))
+        if endpoint.stream:
+            return await self._execute_streamed(endpoint, request, fields, progress)
+        response = await self._send(endpoint, request)
         
         response.raise_for_status()
+        start = time.monotonic()
+        result = self._render_response(endpoint, response, fields)
+        endpoint.metrics.serialization.observe(time.monotonic() - start)
+        return result
+    
+    def _validator(self, endpoint: CompiledEndpoint, paginated: bool) -> ArgumentValidator:
+        """The compiled validator of an endpoint's tool (or its `*_all` tool), built on first use."""
+        if paginated:
+            if endpoint.paginated_validator is None:
+                schema = self.paginated_input_schema(self.api_spec, endpoint.endpoint, endpoint.pagination)
+                endpoint.paginated_validator = ArgumentValidator(
+                    endpoint.operation_id + PAGINATED_SUFFIX, schema, coerce=self.coerce_arguments
+                )
+            return endpoint.paginated_validator
+        if endpoint.validator is None:
+            schema = self.tool_input_schema(self.api_spec, endpoint.endpoint)
+            endpoint.validator = ArgumentValidator(endpoint.operation_id, schema, coerce=self.coerce_arguments)
+        return endpoint.validator
+    
+    async def _execute_streamed(
+        self,
+        endpoint: CompiledEndpoint,
+        request: httpx.Request,
+        fields: Optional[Dict[str, Any]],
+        progress: Optional[ProgressCallback],
+    ) -> Dict[str, Any]:
+        """Execute a call reading the body as it arrives, record by record for NDJSON.
+        
+        Streamed calls skip the response cache, coalescing and hedging, which all need the whole body.
+        """
+        response = await self._send_upstream(endpoint, request, stream=True)
+        try:
+            response.raise_for_status()
+            if is_ndjson(response.headers.get('content-type', '')):
+                records, stopped = await read_ndjson(
+                    response, self.stream_max_items, self.stream_max_bytes, fields, progress
+                )
+                start = time.monotonic()
+                data = self._render_records(records, stopped, endpoint.max_tokens)
+                endpoint.metrics.serialization.observe(time.monotonic() - start)
+                return {'content_type': 'application/json', 'data': data}
+            body = await read_capped(response, self.stream_max_bytes, progress)
+        finally:
+            await response.aclose()
+            endpoint.metrics.response_bytes.observe(response.num_bytes_downloaded)
+        
+        # The body is decoded already, so drop the headers describing its encoding
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in DROPPED_HEADERS]
+        buffered = httpx.Response(response.status_code, headers=headers, content=body, request=request)
+        start = time.monotonic()
+        result = self._render_response(endpoint, buffered, fields)
+        endpoint.metrics.serialization.observe(time.monotonic() - start)
+        return result
+    
+    async def _execute_paginated(
+        self,
+        endpoint: CompiledEndpoint,
+        arguments: Dict[str, Any],
+        fields: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Execute a `*_all` call: fetch every page and return the items together."""
+        pagination_config = self.config.get('pagination', {})
+        arguments = dict(arguments)
+        max_items = arguments.pop(MAX_ITEMS_ARGUMENT, None) or pagination_config.get('max_items', 1000)
+        
+        async def fetch(page_arguments: Dict[str, Any], url: Optional[str]) -> httpx.Response:
+            parts = endpoint.build_request_parts(page_arguments)
+            if url is not None:
+                # Next links already carry the query
+                parts['url'] = url
+                parts.pop('params', None)
+            response = await self._send(endpoint, self.client.build_request(**parts))
+            response.raise_for_status()
+            return response
         
+        paginator = Paginator(
+            endpoint.pagination,
+            fetch,
+            max_items=max_items,
+            max_bytes=pagination_config.get('max_bytes', 5 * 1024 * 1024),
+            max_pages=pagination_config.get('max_pages', 100),
+            concurrency=pagination_config.get('concurrency', 4),
+        )
+        result = await paginator.run(arguments)
+        start = time.monotonic()
+        result['items'] = project(result['items'], fields)
+        data = self._serialize(result, endpoint.max_tokens)
+        endpoint.metrics.serialization.observe(time.monotonic() - start)
+        return {'content_type': 'application/json', 'data': data}
+    
+    def _render_records(self, records: List[Any], stopped: Optional[str], max_tokens: Optional[int]) -> str:
+        """Serialize streamed records as a JSON array, noting when the stream was cut short."""
+        if stopped is not None:
+            records = records + [f"... stream truncated after {len(records)} records ({stopped}), more records followed ..."]
+        return self._serialize(records, max_tokens)
+    
+    def _serialize(self, data: Any, max_tokens: Optional[int]) -> str:
+        """Serialize a result in the configured JSON mode, within the token budget if there is one."""
+        pretty = self.json_mode == 'pretty'
+        if max_tokens:
+            # Trimming arrays may not be enough (e.g. one huge string), cut the text as a last resort
+            return fit_text(fit_json(data, max_tokens, pretty=pretty)[1], max_tokens)
+        return json_codec.dumps(data, pretty=pretty)
+    
+    def _render_response(
+        self,
+        endpoint: CompiledEndpoint,
+        response: httpx.Response,
+        fields: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Turn a successful response into the tool result's content type and data."""
         # Determine content type
         content_type = response.headers.get('content-type', '')
         
         if 'application/json' in content_type:
             return {
                 'content_type': 'application/json',
-                'data': response.json()
+                'data': self._render_json(response, fields, endpoint.max_tokens)
+            }
+        elif not is_text_content_type(content_type):
+            return {
+                'content_type': content_type,
+                'data': response.content
             }
         else:
+            text = response.text
             return {
                 'content_type': content_type,
-                'data': response.text
-            }
\ No newline at end of file
+                'data': fit_text(text, endpoint.max_tokens) if endpoint.max_tokens else text
+            }
+    
+    def _render_json(
+        self,
+        response: httpx.Response,
+        fields: Optional[Dict[str, Any]] = None,
+        max_tokens: Optional[int] = None,
+    ) -> Any:
+        """JSON body for the model: upstream text as-is, minified, or parsed for pretty printing.
+        
+        The body is only parsed when the mode, a field projection or the token budget needs it.
+        """
+        if fields is not None or (max_tokens and estimate_tokens(response.text) > max_tokens):
+            try:
+                data = project(json_codec.loads(response.content), fields)
+            except ValueError:
+                return fit_text(response.text, max_tokens) if max_tokens else response.text
+            return self._serialize(data, max_tokens)
+        
+        if self.json_mode == 'passthrough' or not response.content:
+            # Upstream bytes are already JSON, no need to parse and re-encode them
+            return response.text
+        try:
+            if self.json_mode == 'minify':
+                return json_codec.minify(response.content)
+            return json_codec.loads(response.content)
+        except ValueError:
+            # Mislabelled body, hand it over untouched
+            return response.text
+    
+    async def _send(self, endpoint: CompiledEndpoint, request: httpx.Request) -> httpx.Response:
+        """Send a request, going through the response cache for cacheable operations."""
+        if self.response_cache is not None and endpoint.cacheable:
+            return await self.response_cache.fetch(
+                request,
+                lambda request: self._send_coalesced(endpoint, request),
+                default_ttl=endpoint.cache_ttl,
+            )
+        return await self._send_coalesced(endpoint, request)
+    
+    async def _send_coalesced(self, endpoint: CompiledEndpoint, request: httpx.Request) -> httpx.Response:
+        """Send a request, joining an identical one already in flight when allowed."""
+        if self.singleflight is None or not endpoint.coalesce:
+            return await self._send_hedged(endpoint, request)
+        
+        # Same method, URL (path + query) and every header sent, header parameters
+        # included; the conditional headers (not part of the cache key) change the answer too
+        key = (
+            ResponseCache.key(request),
+            request.headers.get('if-none-match'),
+            request.headers.get('if-modified-since'),
+        )
+        return await self.singleflight.do(key, lambda: self._send_hedged(endpoint, request))
+    
+    async def _send_hedged(self, endpoint: CompiledEndpoint, request: httpx.Request) -> httpx.Response:
+        """Send a request, hedging slow attempts of idempotent operations."""
+        if self.hedger is None or not endpoint.hedge:
+            return await self._send_upstream(endpoint, request)
+        return await self.hedger.run(endpoint.operation_id, lambda: self._send_upstream(endpoint, request))
+    
+    async def _send_upstream(
+        self,
+        endpoint: CompiledEndpoint,
+        request: httpx.Request,
+        stream: bool = False,
+    ) -> httpx.Response:
+        """Send a request to the least loaded healthy upstream within its concurrency limits.
+        
+        With `stream`, the response is returned once its headers arrive and the caller must close it.
+        Connect errors fail over to another upstream; a 429/503 with Retry-After
+        pauses the host's queue and is retried once the wait is over, if that is
+        before the call's queueing deadline.
+        """
+        metrics = endpoint.metrics
+        tried = []
+        retries = 0
+        deadline = time.monotonic() + self.limits.queue_timeout if self.limits is not None else None
+        while True:
+            upstream = self.upstreams.pick(exclude=tried)
+            limiters = []
+            if self.limits is not None:
+                if endpoint.concurrency is not None:
+                    limiters.append(self.limits.for_operation(endpoint.operation_id, endpoint.concurrency))
+                host_limiter = self.limits.for_host(upstream.base_url.netloc.decode('ascii'))
+                limiters.append(host_limiter)
+                queued = time.monotonic()
+                await self.limits.acquire(limiters, deadline)
+                metrics.queue.observe(time.monotonic() - queued)
+            
+            self.upstreams.begin(upstream)
+            # None: the attempt says nothing about load (cancelled, connect error, ...)
+            overloaded = None
+            start = time.monotonic()
+            try:
+                response = await self.client.send(upstream.rewrite(request, self.upstreams.primary), stream=stream)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                metrics.status(0)
+                self.upstreams.end(upstream, ok=False)
+                tried.append(upstream)
+                # Nothing reached the server, so any method is safe to retry elsewhere
+                if len(tried) == len(self.upstreams.upstreams):
+                    raise
+                continue
+            except httpx.TimeoutException:
+                metrics.status(0)
+                overloaded = True
+                self.upstreams.end(upstream, ok=False)
+                raise
+            except asyncio.CancelledError:
+                self.upstreams.end(upstream, ok=None)
+                raise
+            except Exception:
+                metrics.status(0)
+                self.upstreams.end(upstream, ok=False)
+                raise
+            else:
+                overloaded = response.status_code in OVERLOAD_STATUS_CODES
+            finally:
+                latency = time.monotonic() - start
+                metrics.upstream.observe(latency)
+                for limiter in limiters:
+                    limiter.release(overloaded, latency)
+            self.upstreams.end(upstream, ok=response.status_code < 500)
+            metrics.status(response.status_code)
+            if not stream:
+                metrics.response_bytes.observe(len(response.content))
+            
+            if self.limits is None or not overloaded:
+                return response
+            retry_after = parse_retry_after(response.headers.get('retry-after'))
+            if retry_after is None:
+                return response
+            host_limiter.block_for(retry_after)
+            # A 429 was refused before any work was done; a 503 may have been half-processed
+            retryable = response.status_code == 429 or endpoint.idempotent
+            if not retryable or retries >= self.limits.max_retries or time.monotonic() + retry_after > deadline:
+                return response
+            retries += 1
+            await response.aclose()
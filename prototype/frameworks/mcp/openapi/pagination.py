@@ -0,0 +1,291 @@
+import asyncio
+import math
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+import json_codec
+
+# Suffix of the generated tool that walks every page of a list operation
+PAGINATED_SUFFIX = '_all'
+
+# Tool argument capping how many items the paginated tool collects
+MAX_ITEMS_ARGUMENT = '_max_items'
+
+# Query parameter names (lower-cased) that give each pagination style away
+CURSOR_PARAMS = (
+    'cursor', 'page_token', 'pagetoken', 'next_token', 'nexttoken', 'continuation_token',
+    'continuationtoken', 'starting_after', 'after', 'marker',
+)
+OFFSET_PARAMS = ('offset', 'skip', 'start')
+PAGE_PARAMS = ('page', 'page_number', 'pagenumber', 'page_no')
+SIZE_PARAMS = ('limit', 'per_page', 'perpage', 'page_size', 'pagesize', 'size', 'count', 'max_results', 'maxresults')
+
+# Where response bodies usually put the items, the next cursor, the total and "more pages" flags
+ITEM_KEYS = ('items', 'data', 'results', 'records', 'entries', 'values', 'objects', 'nodes', 'edges', 'content')
+NEXT_KEYS = (
+    'next_cursor', 'nextCursor', 'next_page_token', 'nextPageToken', 'next_token', 'nextToken',
+    'continuation_token', 'continuationToken', 'endCursor', 'cursor', 'next',
+)
+TOTAL_KEYS = ('total', 'total_count', 'totalCount', 'total_results', 'totalResults', 'total_items', 'totalItems')
+HAS_MORE_KEYS = ('has_more', 'hasMore', 'hasNextPage', 'has_next', 'more')
+META_KEYS = ('meta', 'pagination', 'page_info', 'pageInfo', 'paging', 'links', '_links')
+
+STYLES = ('cursor', 'offset', 'page', 'link')
+
+# Cursor parameters (lower-cased) that take the id of the last item seen, as with Stripe
+ITEM_ID_CURSOR_PARAMS = ('starting_after', 'after')
+
+
+class Pagination:
+    """How an operation pages: the style and the query parameters involved."""
+
+    __slots__ = ('style', 'param', 'size_param')
+
+    def __init__(self, style: str, param: Optional[str] = None, size_param: Optional[str] = None):
+        """Initialize with the style and the page-selecting and page-size parameters."""
+        if style not in STYLES:
+            raise ValueError(f"Unknown pagination style {style!r}, expected one of {', '.join(STYLES)}")
+        self.style = style
+        self.param = param
+        self.size_param = size_param
+
+
+def detect_pagination(endpoint: Dict[str, Any]) -> Optional[Pagination]:
+    """Guess an operation's pagination style from its query parameter names."""
+    if endpoint['method'].lower() != 'get':
+        return None
+    names = {param['name'].lower(): param['name'] for param in endpoint['parameters'] if param.get('in') == 'query'}
+
+    def find(candidates: Tuple[str, ...]) -> Optional[str]:
+        return next((names[name] for name in candidates if name in names), None)
+
+    size_param = find(SIZE_PARAMS)
+    for style, candidates in (('cursor', CURSOR_PARAMS), ('offset', OFFSET_PARAMS), ('page', PAGE_PARAMS)):
+        param = find(candidates)
+        if param is not None:
+            return Pagination(style, param, size_param)
+    return None
+
+
+def _lookup(body: Any, keys: Tuple[str, ...]) -> Any:
+    """First of `keys` found at the top of a body or inside its usual metadata objects."""
+    if not isinstance(body, dict):
+        return None
+    containers = [body] + [body[key] for key in META_KEYS if isinstance(body.get(key), dict)]
+    for container in containers:
+        for key in keys:
+            value = container.get(key)
+            if value is not None:
+                return value
+    return None
+
+
+def extract_items(body: Any) -> Optional[List[Any]]:
+    """The list of items in a page: the body itself, a well-known key, or its only list."""
+    if isinstance(body, list):
+        return body
+    if not isinstance(body, dict):
+        return None
+    for key in ITEM_KEYS:
+        if isinstance(body.get(key), list):
+            return body[key]
+    lists = [value for value in body.values() if isinstance(value, list)]
+    return lists[0] if len(lists) == 1 else None
+
+
+def next_page(response: httpx.Response, body: Any) -> Tuple[Optional[str], Optional[str]]:
+    """Where the next page is: (absolute URL, None) or (None, cursor token), or (None, None) at the end."""
+    link = response.links.get('next', {}).get('url')
+    if link:
+        return str(response.request.url.join(link)), None
+
+    if _lookup(body, HAS_MORE_KEYS) is False:
+        return None, None
+    value = _lookup(body, NEXT_KEYS)
+    if isinstance(value, dict):
+        value = value.get('href') or value.get('url')
+    if not isinstance(value, (str, int)) or isinstance(value, bool) or value == '':
+        return None, None
+    value = str(value)
+    if value.startswith(('http://', 'https://', '/', '?')):
+        return str(response.request.url.join(value)), None
+    return None, value
+
+
+def last_item_id(items: List[Any]) -> Optional[str]:
+    """The `id` of a page's last item, for APIs whose cursor is the last item seen."""
+    if not items or not isinstance(items[-1], dict):
+        return None
+    value = items[-1].get('id')
+    if not isinstance(value, (str, int)) or isinstance(value, bool) or value == '':
+        return None
+    return str(value)
+
+
+def total_items(body: Any) -> Optional[int]:
+    """The total item count a page reports, if any."""
+    value = _lookup(body, TOTAL_KEYS)
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+# fetch(arguments, url) -> response; url, when given, replaces the operation's URL and query
+FetchPage = Callable[[Dict[str, Any], Optional[str]], Awaitable[httpx.Response]]
+
+
+class Paginator:
+    """Walk the pages of one call and aggregate their items, within item, byte and page limits."""
+
+    def __init__(
+        self,
+        pagination: Pagination,
+        fetch: FetchPage,
+        max_items: int = 1000,
+        max_bytes: int = 5 * 1024 * 1024,
+        max_pages: int = 100,
+        concurrency: int = 4,
+    ):
+        """Initialize with the operation's pagination, a page fetcher and the limits."""
+        self.pagination = pagination
+        self.fetch = fetch
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+
+        self.items: List[Any] = []
+        self.pages = 0
+        self.bytes = 0
+        self.stopped: Optional[str] = None
+        # A limit the items reached exactly; the result is only incomplete if another page exists
+        self.limit: Optional[str] = None
+
+    async def run(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Collect the items of every page, starting from the call's arguments."""
+        response, items, body = await self._fetch(arguments, None)
+        if items is None:
+            raise ValueError("Can't find the list of items in the response to paginate over")
+        self._add(items)
+        if items and self.stopped is None:
+            if self.pagination.style in ('offset', 'page'):
+                await self._run_numbered(arguments, len(items), total_items(body))
+            else:
+                await self._run_linked(arguments, response, body)
+        return {
+            'items': self.items,
+            'count': len(self.items),
+            'pages': self.pages,
+            'complete': self.stopped is None,
+            **({'stopped_by': self.stopped} if self.stopped else {}),
+        }
+
+    async def _fetch(self, arguments: Dict[str, Any], url: Optional[str]) -> Tuple[httpx.Response, Optional[List[Any]], Any]:
+        """Fetch and parse one page."""
+        response = await self.fetch(arguments, url)
+        self.pages += 1
+        self.bytes += len(response.content)
+        body = json_codec.loads(response.content) if response.content else None
+        return response, extract_items(body), body
+
+    def _add(self, items: List[Any]) -> bool:
+        """Keep a page's items; False once a limit says to stop.
+
+        Dropping items stops the walk as incomplete right away. A limit that's
+        only reached is kept in `limit`, for `_more_pages` to report if there
+        turns out to be another page.
+        """
+        room = self.max_items - len(self.items)
+        self.items.extend(items[:room])
+        if len(items) > room:
+            self.stopped = 'max_items'
+            return False
+        if len(self.items) >= self.max_items:
+            self.limit = 'max_items'
+        elif self.bytes >= self.max_bytes:
+            self.limit = 'max_bytes'
+        elif self.pages >= self.max_pages:
+            self.limit = 'max_pages'
+        return self.limit is None
+
+    def _more_pages(self) -> bool:
+        """Called when another page exists: whether to fetch it, or stop as incomplete at the reached limit."""
+        if self.limit is not None:
+            self.stopped = self.limit
+            return False
+        return True
+
+    async def _run_linked(self, arguments: Dict[str, Any], response: httpx.Response, body: Any) -> None:
+        """Follow next links or cursors one page at a time."""
+        items = extract_items(body)
+        previous = None
+        while True:
+            url, cursor = next_page(response, body)
+            has_more = _lookup(body, HAS_MORE_KEYS) is True
+            if url is None and cursor is None and not has_more:
+                return
+            if not self._more_pages():
+                return
+            if url is None and cursor is None:
+                # More pages but no cursor: Stripe-style APIs page from the last item's id
+                cursor = self._item_id_cursor(items)
+                if cursor is None or cursor == previous:
+                    self.stopped = 'no_next_cursor'
+                    return
+            if url is not None:
+                response, items, body = await self._fetch(arguments, url)
+            elif cursor is not None and self.pagination.param is not None:
+                response, items, body = await self._fetch(dict(arguments, **{self.pagination.param: cursor}), None)
+                previous = cursor
+            else:
+                return
+            if not items:
+                return
+            self._add(items)
+            if self.stopped is not None:
+                return
+
+    def _item_id_cursor(self, items: Optional[List[Any]]) -> Optional[str]:
+        """The last item's id, when the cursor parameter takes one."""
+        param = self.pagination.param
+        if param is None or param.lower() not in ITEM_ID_CURSOR_PARAMS:
+            return None
+        return last_item_id(items or [])
+
+    async def _run_numbered(self, arguments: Dict[str, Any], first_count: int, total: Optional[int]) -> None:
+        """Fetch offset/page-numbered pages concurrently, a wave of `concurrency` at a time."""
+        param = self.pagination.param
+        offset_style = self.pagination.style == 'offset'
+        first = arguments.get(param, 0 if offset_style else 1)
+        # The first page shows the page size the server actually uses, which may be capped below the one asked for
+        page_size = first_count
+        start_item = first if offset_style else (first - 1) * page_size
+        requested = arguments.get(self.pagination.size_param) if self.pagination.size_param is not None else None
+        if requested and first_count < requested and (total is None or start_item + first_count >= total):
+            # A short page is the last one, unless the total says otherwise
+            return
+
+        last_index = None
+        if total is not None:
+            # The reported total tells us how many pages there are
+            last_index = max(0, math.ceil((total - start_item) / page_size) - 1)
+
+        index = 1
+        while last_index is None or index <= last_index:
+            if not self._more_pages():
+                return
+            room = self.max_items - len(self.items)
+            wave = min(self.concurrency, math.ceil(room / page_size), self.max_pages - self.pages)
+            if last_index is not None:
+                wave = min(wave, last_index - index + 1)
+            pages = await asyncio.gather(*[
+                self._fetch(dict(arguments, **{param: first + (i * page_size if offset_style else i)}), None)
+                for i in range(index, index + wave)
+            ])
+            index += wave
+            # Keep pages in order; without a total, the first short one is the last
+            for _, items, _ in pages:
+                if not items or not self._more_pages():
+                    return
+                self._add(items)
+                if self.stopped is not None or (total is None and len(items) < page_size):
+                    return
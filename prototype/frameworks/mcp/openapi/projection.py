@@ -0,0 +1,133 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import json_codec
+
+# Tool argument selecting which fields of a JSON response to return
+FIELDS_ARGUMENT = '_fields'
+
+FIELDS_SCHEMA = {
+    'type': 'string',
+    'description': (
+        "Optional comma-separated fields to return from the JSON response, e.g. "
+        "'id,name,owner.name'. Arrays are traversed implicitly; JSONPath like "
+        "'$.items[*].id' also works. Omit to return every field."
+    ),
+}
+
+# Rough characters-per-token ratio for JSON text
+CHARS_PER_TOKEN = 4
+
+_ARRAY_SELECTOR = re.compile(r'\[(\*|\d*)\]')
+
+
+def parse_fields(fields: Union[str, List[str], None]) -> Optional[Dict[str, Any]]:
+    """Parse a field selection into a tree of nested keys; None selects everything."""
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        field = _ARRAY_SELECTOR.sub('', field.strip())
+        if field.startswith('$'):
+            field = field[1:]
+        keys = [key for key in field.split('.') if key]
+        if not keys:
+            continue
+        node = tree
+        for key in keys[:-1]:
+            child = node.setdefault(key, {})
+            if child is None:
+                # A parent was already selected whole
+                break
+            node = child
+        else:
+            node[keys[-1]] = None
+    return tree or None
+
+
+def project(data: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    """Keep only the selected fields, applying the selection to every element of arrays."""
+    if tree is None:
+        return data
+    if isinstance(data, list):
+        return [project(item, tree) for item in data]
+    if isinstance(data, dict):
+        return {key: project(data[key], subtree) for key, subtree in tree.items() if key in data}
+    return data
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for budgeting."""
+    return len(text) // CHARS_PER_TOKEN
+
+
+def _trim_arrays(data: Any, keep: int) -> Any:
+    """Shorten every array longer than 2*keep+1 to `keep` items from each end and a count summary."""
+    if isinstance(data, list):
+        if len(data) <= 2 * keep + 1:
+            return [_trim_arrays(item, keep) for item in data]
+        head = [_trim_arrays(item, keep) for item in data[:keep]]
+        tail = [_trim_arrays(item, keep) for item in data[-keep:]]
+        summary = f"... {len(data) - 2 * keep} of {len(data)} items omitted ..."
+        return head + [summary] + tail
+    if isinstance(data, dict):
+        return {key: _trim_arrays(value, keep) for key, value in data.items()}
+    return data
+
+
+def _longest_array(data: Any) -> int:
+    """Length of the longest array anywhere in the document."""
+    if isinstance(data, list):
+        return max([len(data)] + [_longest_array(item) for item in data])
+    if isinstance(data, dict):
+        return max([0] + [_longest_array(value) for value in data.values()])
+    return 0
+
+
+def fit_json(data: Any, max_tokens: int, pretty: bool = False) -> Tuple[Any, str]:
+    """Trim arrays until the serialized document fits the token budget.
+
+    Every array keeps the same number of head and tail items, halving that
+    number until the document fits, so the result only depends on the input.
+    Returns the (possibly trimmed) data and its serialization.
+    """
+    text = json_codec.dumps(data, pretty=pretty)
+    if estimate_tokens(text) <= max_tokens:
+        return data, text
+
+    # Start from the largest `keep` that still shortens the longest array
+    keep = (_longest_array(data) - 1) // 2
+    trimmed = data
+    while keep >= 1:
+        trimmed = _trim_arrays(data, keep)
+        text = json_codec.dumps(trimmed, pretty=pretty)
+        if estimate_tokens(text) <= max_tokens:
+            break
+        keep //= 2
+    return trimmed, text
+
+
+def fit_text(text: str, max_tokens: int) -> str:
+    """Cut text that is over the token budget, saying how much was left out."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + f"\n... {len(text) - max_chars} of {len(text)} characters omitted ..."
+
+
+def returns_json(operation: Dict[str, Any]) -> bool:
+    """Whether an operation may answer with JSON, so projecting its result makes sense."""
+    responses = operation.get('responses')
+    if not responses:
+        return True
+    for response in responses.values():
+        if not isinstance(response, dict) or '$ref' in response:
+            # Can't tell without resolving, don't hide the option
+            return True
+        for media_type in (response.get('content') or {}):
+            if media_type == 'application/json' or media_type.endswith('+json'):
+                return True
+    return False
@@ -0,0 +1,249 @@
+import hashlib
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+# Request headers that never select a different response: connection handling, and the
+# conditional headers the cache adds itself. Every other header (auth, header parameters
+# like X-Tenant, Accept, ...) is part of the cache key.
+UNKEYED_HEADERS = {'host', 'connection', 'content-length', 'if-none-match', 'if-modified-since'}
+
+CACHEABLE_STATUS_CODES = {200, 203}
+
+# The stored body is already decoded, so these no longer describe it
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into a directive -> argument map."""
+    directives = {}
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, argument = part.partition('=')
+        directives[name.strip().lower()] = argument.strip().strip('"') or None
+    return directives
+
+
+def _parse_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a delta-seconds directive argument."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    """Parse an HTTP date header into a POSIX timestamp."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class CachedResponse:
+    """A stored upstream response with its freshness and validators."""
+
+    __slots__ = ('status_code', 'headers', 'content', 'expires_at', 'etag', 'last_modified', 'vary', 'size')
+
+    def __init__(self, response: httpx.Response, expires_at: float, vary: Tuple[Tuple[str, Optional[str]], ...] = ()):
+        """Capture the parts of a response needed to replay it."""
+        self.status_code = response.status_code
+        self.headers: List[Tuple[str, str]] = [
+            (name, value) for name, value in response.headers.multi_items()
+            if name.lower() not in DROPPED_HEADERS
+        ]
+        self.content = response.content
+        self.expires_at = expires_at
+        self.etag = response.headers.get('etag')
+        self.last_modified = response.headers.get('last-modified')
+        # Values of the request headers the response's Vary names, which a request must match
+        self.vary = vary
+        self.size = len(self.content) + sum(len(k) + len(v) for k, v in self.headers)
+
+    def matches(self, request: httpx.Request) -> bool:
+        """Whether a request has the header values this response was stored for."""
+        return all(request.headers.get(name) == value for name, value in self.vary)
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        """Rebuild an httpx.Response for the given request."""
+        return httpx.Response(
+            status_code=self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=request,
+        )
+
+
+class ResponseCache:
+    """LRU + TTL cache for idempotent GET responses.
+
+    Freshness follows Cache-Control (max-age, s-maxage, no-cache, no-store,
+    private) and Expires; expired entries with an ETag or Last-Modified are revalidated
+    with a conditional request. Size is bounded both by entry count and bytes.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_entries: int = 2048, default_ttl: float = 0.0):
+        """Initialize the cache bounds and the TTL used when upstream gives none."""
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: 'OrderedDict[str, CachedResponse]' = OrderedDict()
+        self.current_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(request: httpx.Request) -> str:
+        """Cache key: method, full URL and a digest of every header the request sends but the unkeyed ones."""
+        scope = hashlib.sha1()
+        headers = sorted(
+            (name.lower(), value) for name, value in request.headers.multi_items()
+            if name.lower() not in UNKEYED_HEADERS
+        )
+        for name, value in headers:
+            scope.update(f"{name}:{value}\n".encode())
+        return f"{request.method} {request.url} {scope.hexdigest()}"
+
+    async def fetch(
+        self,
+        request: httpx.Request,
+        send: Callable[[httpx.Request], Awaitable[httpx.Response]],
+        default_ttl: Optional[float] = None,
+    ) -> httpx.Response:
+        """Serve a request from the cache, revalidating or sending it upstream as needed."""
+        key = self.key(request)
+        entry = self._entries.get(key)
+        if entry is not None and not entry.matches(request):
+            # Stored for other values of a header its Vary names
+            entry = None
+        now = time.time()
+
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if entry.expires_at > now:
+                self.hits += 1
+                return entry.to_response(request)
+
+            if entry.etag or entry.last_modified:
+                if entry.etag:
+                    request.headers['If-None-Match'] = entry.etag
+                if entry.last_modified:
+                    request.headers['If-Modified-Since'] = entry.last_modified
+                response = await send(request)
+                if response.status_code == 304:
+                    self.revalidations += 1
+                    expires_at = self._expires_at(response, time.time(), default_ttl)
+                    if expires_at is not None:
+                        entry.expires_at = expires_at
+                    return entry.to_response(request)
+                self.misses += 1
+                self._store(key, request, response, default_ttl)
+                return response
+
+        self.misses += 1
+        response = await send(request)
+        self._store(key, request, response, default_ttl)
+        return response
+
+    def _expires_at(self, response: httpx.Response, now: float, default_ttl: Optional[float]) -> Optional[float]:
+        """Compute when a response stops being fresh; None means don't store it."""
+        directives = parse_cache_control(response.headers.get('cache-control', ''))
+        # Entries are shared by every caller whose request has the same key, so per-user responses aren't kept
+        if 'no-store' in directives or 'private' in directives:
+            return None
+        if 'no-cache' in directives:
+            # Store it, but always revalidate before use
+            return now
+
+        # We serve many sessions, so behave like a shared cache and prefer s-maxage
+        max_age = _parse_seconds(directives.get('s-maxage')) if 's-maxage' in directives else None
+        if max_age is None and 'max-age' in directives:
+            max_age = _parse_seconds(directives.get('max-age'))
+        if max_age is not None:
+            age = _parse_seconds(response.headers.get('age')) or 0.0
+            return now + max_age - age
+
+        expires = _parse_http_date(response.headers.get('expires'))
+        if expires is not None:
+            date = _parse_http_date(response.headers.get('date')) or now
+            return now + (expires - date)
+
+        ttl = self.default_ttl if default_ttl is None else default_ttl
+        return now + ttl
+
+    def _store(self, key: str, request: httpx.Request, response: httpx.Response, default_ttl: Optional[float]) -> None:
+        """Store a response if it is cacheable and fits the byte bound."""
+        if response.request.method != 'GET' or response.status_code not in CACHEABLE_STATUS_CODES:
+            return
+
+        now = time.time()
+        expires_at = self._expires_at(response, now, default_ttl)
+        if expires_at is None:
+            return
+        if expires_at <= now and not (response.headers.get('etag') or response.headers.get('last-modified')):
+            # Already stale and impossible to revalidate
+            return
+
+        vary = self._vary(request, response)
+        if vary is None:
+            return
+
+        entry = CachedResponse(response, expires_at, vary)
+        if entry.size > self.max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = entry
+        self.current_bytes += entry.size
+        self.stores += 1
+
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.size
+            self.evictions += 1
+
+    @staticmethod
+    def _vary(request: httpx.Request, response: httpx.Response) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+        """The request header values a response varies on; None for `Vary: *`, which can't be matched."""
+        names = []
+        for value in response.headers.get_list('vary'):
+            names.extend(name.strip().lower() for name in value.split(',') if name.strip())
+        if '*' in names:
+            return None
+        return tuple((name, request.headers.get(name)) for name in sorted(set(names)))
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry.size
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and occupancy of the cache."""
+        lookups = self.hits + self.revalidations + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'hit_ratio': (self.hits + self.revalidations) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,200 @@
+from typing import Any, Dict, FrozenSet, Set, Tuple
+
+NO_DEPS: FrozenSet[str] = frozenset()
+
+# Keywords that only make sense in OpenAPI documents, not in a tool input schema
+OPENAPI_ONLY_KEYWORDS = {'nullable', 'discriminator', 'xml', 'externalDocs', 'example'}
+
+# Keywords whose value is a map of name -> schema
+SCHEMA_MAP_KEYWORDS = {'properties', 'patternProperties', 'dependentSchemas'}
+
+# Keywords whose value is a single schema
+SCHEMA_KEYWORDS = {
+    'items', 'additionalProperties', 'additionalItems', 'not', 'contains',
+    'propertyNames', 'if', 'then', 'else', 'unevaluatedProperties', 'unevaluatedItems',
+}
+
+# Keywords whose value is a list of schemas
+SCHEMA_LIST_KEYWORDS = {'allOf', 'anyOf', 'oneOf', 'prefixItems'}
+
+# Components bigger than this many schema nodes once expanded go to $defs instead of being inlined
+MAX_INLINE_NODES = 256
+
+
+class SchemaCompiler:
+    """Compile OpenAPI schemas into self-contained JSON Schemas.
+
+    Local `$ref`s are resolved and compiled once and the result is shared by
+    every operation that uses them, so compiling a whole spec is linear in its
+    size. Refs that are part of a cycle can't be inlined, and inlining very large
+    shared components would blow up the serialized schema; both are emitted as
+    `{"$ref": "#/$defs/<name>"}` and the operation schema gets a `$defs` entry
+    for each such component it reaches.
+    """
+
+    def __init__(self, spec: Dict[str, Any], max_inline_nodes: int = MAX_INLINE_NODES):
+        """Initialize with a parsed OpenAPI document."""
+        self.spec = spec
+        self.max_inline_nodes = max_inline_nodes
+        # ref -> raw node it points at
+        self._resolved: Dict[str, Any] = {}
+        # ref -> (compiled schema, $defs refs it needs, expanded node count)
+        self._compiled: Dict[str, Tuple[Dict[str, Any], FrozenSet[str], int]] = {}
+        # $defs ref -> (compiled body, $defs refs its body needs)
+        self._defs: Dict[str, Tuple[Dict[str, Any], FrozenSet[str]]] = {}
+        self._def_names: Dict[str, str] = {}
+        self._def_refs: Dict[str, str] = {}
+        self._in_progress: Set[str] = set()
+        self._recursive: Set[str] = set()
+
+    def resolve(self, ref: str) -> Any:
+        """Resolve a local JSON pointer like `#/components/schemas/Pet`."""
+        if ref in self._resolved:
+            return self._resolved[ref]
+        if not ref.startswith('#'):
+            raise ValueError(f"Unsupported external $ref: {ref}")
+
+        node: Any = self.spec
+        for token in ref[1:].split('/')[1:]:
+            token = token.replace('~1', '/').replace('~0', '~')
+            if isinstance(node, list):
+                node = node[int(token)]
+            else:
+                node = node[token]
+
+        self._resolved[ref] = node
+        return node
+
+    def resolve_node(self, node: Any) -> Any:
+        """Follow `$ref`s on a parameter, request body or other component object."""
+        seen = set()
+        while isinstance(node, dict) and isinstance(node.get('$ref'), str) and node['$ref'].startswith('#'):
+            ref = node['$ref']
+            if ref in seen:
+                raise ValueError(f"Circular $ref: {ref}")
+            seen.add(ref)
+            node = self.resolve(ref)
+        return node
+
+    def compile(self, schema: Any) -> Tuple[Any, FrozenSet[str]]:
+        """Compile a schema, returning it with the `$defs` refs it depends on."""
+        compiled, deps, _ = self._compile(schema)
+        return compiled, deps
+
+    def expand(self, schema: Any) -> Any:
+        """Return the body behind a `#/$defs/` stub, or the schema itself."""
+        if isinstance(schema, dict) and len(schema) == 1 and isinstance(schema.get('$ref'), str):
+            ref = self._def_refs.get(schema['$ref'])
+            if ref in self._defs:
+                return self._defs[ref][0]
+        return schema
+
+    def defs_for(self, deps: FrozenSet[str]) -> Dict[str, Any]:
+        """Build the `$defs` map needed by a schema with the given dependencies."""
+        defs = {}
+        pending = sorted(deps, reverse=True)
+        seen = set()
+        while pending:
+            ref = pending.pop()
+            if ref in seen:
+                continue
+            seen.add(ref)
+            body, body_deps = self._defs[ref]
+            defs[self._def_names[ref]] = body
+            pending.extend(sorted(body_deps, reverse=True))
+        # Sort so the output doesn't depend on set iteration order
+        return dict(sorted(defs.items()))
+
+    def _compile(self, schema: Any) -> Tuple[Any, FrozenSet[str], int]:
+        """Compile a schema, also returning its expanded node count."""
+        if not isinstance(schema, dict):
+            return schema, NO_DEPS, 1
+
+        ref = schema.get('$ref')
+        if isinstance(ref, str) and ref.startswith('#'):
+            compiled, deps, size = self._compile_ref(ref)
+            if len(schema) == 1:
+                return compiled, deps, size
+            # Sibling keywords (e.g. a description next to the $ref) override the target
+            siblings, sibling_deps, sibling_size = self._compile_keywords({k: v for k, v in schema.items() if k != '$ref'})
+            return {**compiled, **siblings}, deps | sibling_deps, size + sibling_size
+
+        return self._compile_keywords(schema)
+
+    def _compile_ref(self, ref: str) -> Tuple[Dict[str, Any], FrozenSet[str], int]:
+        """Compile the target of a local ref once, detecting cycles."""
+        if ref in self._compiled:
+            return self._compiled[ref]
+
+        if ref in self._in_progress:
+            # We are inside this ref's own definition: it's recursive
+            self._recursive.add(ref)
+            return self._def_stub(ref), frozenset((ref,)), 1
+
+        self._in_progress.add(ref)
+        try:
+            body, deps, size = self._compile(self.resolve(ref))
+        finally:
+            self._in_progress.discard(ref)
+
+        if ref in self._recursive or size > self.max_inline_nodes:
+            self._defs[ref] = (body, deps)
+            result = (self._def_stub(ref), frozenset((ref,)), 1)
+        else:
+            result = (body, deps, size)
+
+        self._compiled[ref] = result
+        return result
+
+    def _def_stub(self, ref: str) -> Dict[str, Any]:
+        """Return the `$defs` reference used in place of a recursive or oversized ref."""
+        if ref not in self._def_names:
+            name = ref.rsplit('/', 1)[-1] or 'schema'
+            unique = name
+            counter = 2
+            while f"#/$defs/{unique}" in self._def_refs:
+                unique = f"{name}{counter}"
+                counter += 1
+            self._def_names[ref] = unique
+            self._def_refs[f"#/$defs/{unique}"] = ref
+        return {'$ref': f"#/$defs/{self._def_names[ref]}"}
+
+    def _compile_keywords(self, schema: Dict[str, Any]) -> Tuple[Dict[str, Any], FrozenSet[str], int]:
+        """Compile every subschema of an inline schema object."""
+        compiled = {}
+        deps = NO_DEPS
+        size = 1
+
+        for key, value in schema.items():
+            if key in OPENAPI_ONLY_KEYWORDS:
+                continue
+            if key in SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+                sub_map = {}
+                for name, sub_schema in value.items():
+                    sub_map[name], sub_deps, sub_size = self._compile(sub_schema)
+                    size += sub_size
+                    if sub_deps:
+                        deps = deps | sub_deps
+                compiled[key] = sub_map
+            elif key in SCHEMA_KEYWORDS and isinstance(value, dict):
+                compiled[key], sub_deps, sub_size = self._compile(value)
+                size += sub_size
+                if sub_deps:
+                    deps = deps | sub_deps
+            elif key in SCHEMA_LIST_KEYWORDS and isinstance(value, list):
+                sub_list = []
+                for sub_schema in value:
+                    sub_compiled, sub_deps, sub_size = self._compile(sub_schema)
+                    sub_list.append(sub_compiled)
+                    size += sub_size
+                    if sub_deps:
+                        deps = deps | sub_deps
+                compiled[key] = sub_list
+            else:
+                compiled[key] = value
+
+        # OpenAPI 3.0 `nullable` becomes a JSON Schema type union
+        if schema.get('nullable') and isinstance(compiled.get('type'), str):
+            compiled['type'] = [compiled['type'], 'null']
+
+        return compiled, deps, size
@@ -0,0 +1,74 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one in-flight call.
+
+    The first caller for a key starts the call; callers arriving with the same
+    key while it is running wait for the same result (or exception). The call
+    runs in its own task, so one waiter being cancelled doesn't cancel it for
+    the others; it is only cancelled once every waiter is gone.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._inflight: Dict[Hashable, _Flight] = {}
+
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn for key, or join the identical call already in flight."""
+        self.calls += 1
+        flight = self._inflight.get(key)
+        if flight is None:
+            self.executions += 1
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda done: self._finish(key, flight))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Last one waiting, nobody needs the result anymore
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finish(self, key: Hashable, flight: '_Flight') -> None:
+        """Forget a finished call so the next caller starts a fresh one."""
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.task.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            flight.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters showing how many calls were served by another in-flight call."""
+        return {
+            'calls': self.calls,
+            'upstream_calls': self.executions,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._inflight),
+            'coalescing_ratio': self.coalesced / self.calls if self.calls else 0.0,
+        }
+
+
+class _Flight:
+    """A call in flight and the number of callers waiting on it."""
+
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: asyncio.Task):
+        """Wrap the task running the call."""
+        self.task = task
+        self.waiters = 0
@@ -0,0 +1,72 @@
+import json
+import marshal
+import mmap
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+# Bump whenever parsing or schema compilation output changes, so old caches are ignored
+PARSER_VERSION = 1
+
+MAGIC = b'MCPOASC\x00'
+
+
+class SpecCache:
+    """On-disk cache of parsed and compiled OpenAPI specs.
+
+    Entries are keyed by the spec's content hash and PARSER_VERSION and stored
+    with marshal, which loads much faster than YAML or JSON parsing. Shared
+    objects (like compiled component schemas) stay shared in the file.
+    """
+
+    def __init__(self, cache_dir: str):
+        """Initialize with the directory holding cache files."""
+        self.cache_dir = cache_dir
+
+    def _path(self, content_hash: str) -> str:
+        """Path of the cache file for a given spec content hash."""
+        return os.path.join(self.cache_dir, f"{content_hash}.v{PARSER_VERSION}.marshal")
+
+    def _header(self, content_hash: str) -> bytes:
+        """Header identifying the content hash and parser version of a cache file."""
+        return MAGIC + f"{PARSER_VERSION}:{content_hash}\n".encode()
+
+    def load(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Load a cached payload, or return None if it's missing or stale."""
+        header = self._header(content_hash)
+        try:
+            with open(self._path(content_hash), 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if mapped[:len(header)] != header:
+                        return None
+                    # marshal reads straight from the mapped pages without an extra copy
+                    with memoryview(mapped) as view:
+                        return marshal.loads(view[len(header):])
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+
+    def store(self, content_hash: str, payload: Dict[str, Any]) -> bool:
+        """Write a payload for a spec content hash; return whether it was stored."""
+        try:
+            data = marshal.dumps(payload)
+        except ValueError:
+            # YAML can produce types marshal doesn't know (e.g. dates), store them as strings
+            data = marshal.dumps(json.loads(json.dumps(payload, default=str)))
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial cache
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(self._header(content_hash))
+                    f.write(data)
+                # mkstemp creates 0600 files; the server may run as another user than the prewarm step
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, self._path(content_hash))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            return False
+        return True
@@ -0,0 +1,291 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Generator, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+import yaml
+
+from spec_cache import SpecCache
+
+# Key of the root spec under which external documents are bundled
+DOCUMENTS_KEY = 'x-mcp-documents'
+
+# Guard against runaway ref graphs
+MAX_DOCUMENTS = 200
+
+# A load yields the locations it needs read next and is sent their contents
+LoadSteps = Generator[List[str], Dict[str, bytes], 'LoadedSpec']
+
+
+def is_remote(location: str) -> bool:
+    """Whether a spec location is a URL rather than a local file."""
+    return location.startswith('http://') or location.startswith('https://')
+
+
+def resolve_location(base: str, reference: str) -> str:
+    """Location of a document referenced (by relative path or URL) from the document at `base`."""
+    if is_remote(reference) or is_remote(base):
+        return urljoin(base, reference)
+    return os.path.normpath(os.path.join(os.path.dirname(base), reference))
+
+
+def parse_document(raw: bytes, location: str) -> Any:
+    """Parse a JSON or YAML document, going by its extension and falling back to YAML."""
+    if urlsplit(location).path.endswith(('.yaml', '.yml')):
+        return yaml.safe_load(raw)
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return yaml.safe_load(raw)
+
+
+def _ref_holders(node: Any) -> List[Dict[str, Any]]:
+    """Every object in a document holding a string `$ref`, each once even if YAML anchors share it."""
+    holders = []
+    seen = set()
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            if isinstance(node.get('$ref'), str):
+                holders.append(node)
+            pending.extend(node.values())
+        elif isinstance(node, list):
+            pending.extend(node)
+    return holders
+
+
+def _advance(steps: LoadSteps, contents: Optional[Dict[str, bytes]]) -> Tuple[Optional[List[str]], Optional['LoadedSpec']]:
+    """Run a load to its next read: (locations to read, None), or (None, result) once it's done."""
+    try:
+        return steps.send(contents), None
+    except StopIteration as done:
+        return None, done.value
+
+
+class LoadedSpec:
+    """A spec's content as read by SpecLoader: parsed and bundled, or a valid binary cache payload."""
+
+    __slots__ = ('content_hash', 'spec', 'payload', 'documents', 'mtime_ns')
+
+    def __init__(
+        self,
+        content_hash: str,
+        spec: Optional[Dict[str, Any]] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        documents: Optional[Dict[str, str]] = None,
+        mtime_ns: Optional[int] = None,
+    ):
+        """Initialize with the root's hash, the spec or cache payload, and the external documents' hashes."""
+        self.content_hash = content_hash
+        self.spec = spec
+        self.payload = payload
+        self.documents = documents or {}
+        self.mtime_ns = mtime_ns
+
+
+class HTTPCache:
+    """On-disk cache of fetched documents with their ETag/Last-Modified, so restarts only revalidate."""
+
+    def __init__(self, cache_dir: str):
+        """Initialize with the directory holding cached responses."""
+        self.cache_dir = cache_dir
+
+    def _path(self, url: str) -> str:
+        """Path of the cache file for a URL."""
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest() + '.http')
+
+    def load(self, url: str) -> Optional[Tuple[Dict[str, str], bytes]]:
+        """The cached validators and body for a URL, if any."""
+        try:
+            with open(self._path(url), 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+        return meta, body
+
+    def store(self, url: str, response: httpx.Response) -> None:
+        """Remember a response body if it came with validators to revalidate it by."""
+        meta = {'url': url, 'etag': response.headers.get('etag'), 'last_modified': response.headers.get('last-modified')}
+        if not meta['etag'] and not meta['last_modified']:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(json.dumps(meta).encode() + b'\n')
+                    f.write(response.content)
+                os.replace(tmp_path, self._path(url))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            pass
+
+
+class SpecLoader:
+    """Read a spec and every document its external `$ref`s reach, and bundle them into one spec.
+
+    External documents are placed under `x-mcp-documents` in the root spec and
+    every ref is rewritten to a local pointer, so the rest of the parser only
+    deals with local refs. Remote documents are fetched concurrently, a level of
+    the ref graph at a time, over one pooled client, and revalidated against the
+    HTTP cache. When the binary spec cache has an entry for the root, only the
+    documents it was built from are read to check it's still current.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[SpecCache] = None,
+        http_cache: Optional[HTTPCache] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """Initialize with the binary spec cache, the HTTP cache and an optional shared client."""
+        self.cache = cache
+        self.http_cache = http_cache
+        self.client = client
+        self._owns_client = False
+        self.mtime_ns: Optional[int] = None
+
+    async def load(self, location: str) -> LoadedSpec:
+        """Load a spec without blocking the event loop."""
+        steps = self._steps(location)
+        try:
+            # Parsing and bundling are CPU work, run them off the loop
+            wave, loaded = await asyncio.to_thread(_advance, steps, None)
+            while loaded is None:
+                contents = await asyncio.gather(*[self._read(l) for l in wave])
+                wave, loaded = await asyncio.to_thread(_advance, steps, dict(zip(wave, contents)))
+            return loaded
+        finally:
+            if self._owns_client:
+                await self.client.aclose()
+                self.client, self._owns_client = None, False
+
+    def load_sync(self, location: str) -> LoadedSpec:
+        """Load a spec synchronously; remote documents need an event loop of our own."""
+        steps = self._steps(location)
+        wave, loaded = _advance(steps, None)
+        while loaded is None:
+            if any(is_remote(l) for l in wave):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    return asyncio.run(self.load(location))
+                raise RuntimeError(
+                    f"Can't fetch {wave[0]} synchronously inside a running event loop; "
+                    "use `await OpenAPISpec.load(...)` instead"
+                )
+            wave, loaded = _advance(steps, {l: self._read_file(l) for l in wave})
+        return loaded
+
+    async def _read(self, location: str) -> bytes:
+        """Read one document, revalidating remote ones against the HTTP cache."""
+        if not is_remote(location):
+            return await asyncio.to_thread(self._read_file, location)
+
+        cached = self.http_cache.load(location) if self.http_cache is not None else None
+        headers = {}
+        if cached is not None:
+            meta = cached[0]
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        if self.client is None:
+            # Only loads that reach a URL pay for a client
+            self.client = httpx.AsyncClient(follow_redirects=True)
+            self._owns_client = True
+        try:
+            response = await self.client.get(location, headers=headers)
+            if response.status_code == 304 and cached is not None:
+                return cached[1]
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise ValueError(f"Failed to fetch OpenAPI document from {location}: {e}")
+        if self.http_cache is not None:
+            self.http_cache.store(location, response)
+        return response.content
+
+    def _read_file(self, location: str) -> bytes:
+        """Read a local document, remembering the root's mtime for hot reload."""
+        with open(location, 'rb') as f:
+            if self.mtime_ns is None:
+                self.mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            return f.read()
+
+    def _steps(self, location: str) -> LoadSteps:
+        """The load itself, yielding each batch of locations to read."""
+        if not is_remote(location):
+            location = os.path.abspath(location)
+        raw = (yield [location])[location]
+        content_hash = hashlib.sha256(raw).hexdigest()
+
+        if self.cache is not None:
+            payload = self.cache.load(content_hash)
+            if payload is not None:
+                documents = payload.get('documents') or {}
+                current = (yield list(documents)) if documents else {}
+                if all(hashlib.sha256(current[l]).hexdigest() == h for l, h in documents.items()):
+                    return LoadedSpec(content_hash, payload=payload, documents=documents, mtime_ns=self.mtime_ns)
+
+        spec = parse_document(raw, location)
+        # location -> (id under DOCUMENTS_KEY, parsed document, its ref holders)
+        bundle: Dict[str, Tuple[str, Any, List[Dict[str, Any]]]] = {location: ('', spec, _ref_holders(spec))}
+        documents: Dict[str, str] = {}
+        pending = self._external_locations(location, bundle[location][2], bundle)
+        while pending:
+            if len(bundle) + len(pending) > MAX_DOCUMENTS:
+                raise ValueError(f"The spec references more than {MAX_DOCUMENTS} documents")
+            contents = yield pending
+            for target in pending:
+                documents[target] = hashlib.sha256(contents[target]).hexdigest()
+                document = parse_document(contents[target], target)
+                bundle[target] = (f"doc{len(bundle)}", document, _ref_holders(document))
+            pending = sorted({
+                found
+                for target in pending
+                for found in self._external_locations(target, bundle[target][2], bundle)
+            })
+
+        if len(bundle) > 1:
+            self._rewrite_refs(bundle)
+            spec[DOCUMENTS_KEY] = {doc_id: document for doc_id, document, _ in bundle.values() if doc_id}
+        return LoadedSpec(content_hash, spec=spec, documents=documents, mtime_ns=self.mtime_ns)
+
+    @staticmethod
+    def _external_locations(base: str, holders: List[Dict[str, Any]], bundle: Dict[str, Any]) -> List[str]:
+        """Documents referenced from one document that aren't loaded yet."""
+        locations = set()
+        for holder in holders:
+            path = holder['$ref'].partition('#')[0]
+            if path:
+                target = resolve_location(base, path)
+                if target not in bundle:
+                    locations.add(target)
+        return sorted(locations)
+
+    @staticmethod
+    def _rewrite_refs(bundle: Dict[str, Tuple[str, Any, List[Dict[str, Any]]]]) -> None:
+        """Point every ref at its target inside the bundled root spec."""
+        prefixes = {
+            location: f"/{DOCUMENTS_KEY}/{doc_id}" if doc_id else ''
+            for location, (doc_id, _, _) in bundle.items()
+        }
+        for location, (_, _, holders) in bundle.items():
+            for holder in holders:
+                path, _, fragment = holder['$ref'].partition('#')
+                target = resolve_location(location, path) if path else location
+                holder['$ref'] = '#' + prefixes[target] + fragment
@@ -0,0 +1,104 @@
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+import json_codec
+from projection import project
+
+# Media types parsed record by record instead of as one document
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/json-seq')
+
+# progress(bytes_so_far, total_bytes_or_None, message)
+ProgressCallback = Callable[[float, Optional[float], Optional[str]], Awaitable[None]]
+
+
+def is_ndjson(content_type: str) -> bool:
+    """Whether a media type is newline-delimited JSON."""
+    return content_type.split(';')[0].strip().lower() in NDJSON_CONTENT_TYPES
+
+
+def declares_ndjson(operation: Dict[str, Any]) -> bool:
+    """Whether an operation documents an NDJSON response."""
+    for response in (operation.get('responses') or {}).values():
+        if isinstance(response, dict) and any(is_ndjson(media_type) for media_type in (response.get('content') or {})):
+            return True
+    return False
+
+
+class ProgressReporter:
+    """Forward download progress to a callback at most every `interval` seconds."""
+
+    def __init__(self, response: httpx.Response, callback: Optional[ProgressCallback], interval: float = 0.25):
+        """Initialize for one response; the total comes from its Content-Length when known."""
+        self.response = response
+        self.callback = callback
+        self.interval = interval
+        self._last = 0.0
+        try:
+            self.total: Optional[float] = float(response.headers['content-length'])
+        except (KeyError, ValueError):
+            self.total = None
+
+    async def update(self, message: Optional[str] = None, force: bool = False) -> None:
+        """Report the bytes received so far, unless the last report was too recent."""
+        if self.callback is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        await self.callback(float(self.response.num_bytes_downloaded), self.total, message)
+
+
+async def read_capped(response: httpx.Response, max_bytes: int, progress: Optional[ProgressCallback] = None) -> bytes:
+    """Read a streamed body, failing once it grows past `max_bytes`."""
+    reporter = ProgressReporter(response, progress)
+    chunks = []
+    size = 0
+    async for chunk in response.aiter_bytes():
+        size += len(chunk)
+        if size > max_bytes:
+            raise ValueError(f"Response is larger than the {max_bytes} byte streaming limit")
+        chunks.append(chunk)
+        await reporter.update()
+    await reporter.update(force=True)
+    return b''.join(chunks)
+
+
+async def read_ndjson(
+    response: httpx.Response,
+    max_items: int,
+    max_bytes: int,
+    fields: Optional[Dict[str, Any]] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """Parse a streamed NDJSON body record by record.
+
+    Reading stops once `max_items` records (projected to `fields`) are kept
+    and another one arrives, or once the records add up to more than
+    `max_bytes`, so an endless (watch or tail) stream still returns.
+    Returns the kept records and what cut the stream short, if anything:
+    'max_items' or 'max_bytes'.
+    """
+    reporter = ProgressReporter(response, progress)
+    records = []
+    size = 0
+    stopped = None
+    async for line in response.aiter_lines():
+        size += len(line.encode()) + 1
+        if size > max_bytes:
+            stopped = 'max_bytes'
+            break
+        line = line.strip()
+        # RFC 7464 json-seq prefixes records with a record separator
+        line = line.lstrip('\x1e')
+        if not line:
+            continue
+        if len(records) >= max_items:
+            stopped = 'max_items'
+            break
+        records.append(project(json_codec.loads(line), fields))
+        await reporter.update(f"{len(records)} records")
+    await reporter.update(f"{len(records)} records", force=True)
+    return records, stopped
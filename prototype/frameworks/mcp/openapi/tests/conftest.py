@@ -0,0 +1,49 @@
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from openapi_parser import OpenAPIToolsManager
+
+BASE_URL = 'http://api.test/v1'
+
+PET_SPEC = {
+    'openapi': '3.0.0',
+    'info': {'title': 'Pets', 'version': '1.0.0'},
+    'servers': [{'url': BASE_URL}],
+    'paths': {
+        '/pets/{id}': {
+            'get': {
+                'operationId': 'getPet',
+                'parameters': [
+                    {'name': 'id', 'in': 'path', 'required': True, 'schema': {'type': 'string'}},
+                    {'name': 'X-Tenant', 'in': 'header', 'schema': {'type': 'string'}},
+                    {'name': 'Accept-Language', 'in': 'header', 'schema': {'type': 'string'}},
+                ],
+            },
+        },
+    },
+}
+
+
+@pytest.fixture
+def make_manager(tmp_path):
+    """Build a manager for a spec whose upstream is a mock transport handler."""
+
+    def make(
+        handler: Callable[[httpx.Request], Any],
+        config: Optional[Dict[str, Any]] = None,
+        spec: Optional[Dict[str, Any]] = None,
+    ) -> OpenAPIToolsManager:
+        spec_path = tmp_path / 'spec.json'
+        spec_path.write_text(json.dumps(spec or PET_SPEC))
+        manager = OpenAPIToolsManager(str(spec_path), config=config)
+        manager.client = httpx.AsyncClient(base_url=BASE_URL, transport=httpx.MockTransport(handler))
+        return manager
+
+    return make
@@ -0,0 +1,40 @@
+import base64
+import json
+
+from mcp import types
+
+from conftest import PET_SPEC
+from mcp_server import MCPOpenAPIServer
+
+
+def make_server(tmp_path, links: bool) -> MCPOpenAPIServer:
+    spec_path = tmp_path / 'spec.json'
+    spec_path.write_text(json.dumps(PET_SPEC))
+    return MCPOpenAPIServer(str(spec_path), config={'blobs': {'links': links, 'inline_max_bytes': 16}})
+
+
+def test_large_results_become_blob_links(tmp_path):
+    server = make_server(tmp_path, links=True)
+    content = server._tool_content({'content_type': 'text/plain', 'data': 'x' * 100})
+    assert isinstance(content[1], types.ResourceLink)
+    assert server._get_resource_templates()
+    server.blobs.close()
+
+
+def test_without_blob_links_results_stay_inline(tmp_path):
+    server = make_server(tmp_path, links=False)
+
+    text = server._tool_content({'content_type': 'text/plain', 'data': 'x' * 100})
+    assert text == [types.TextContent(type='text', text='x' * 100)]
+
+    pdf = b'%PDF' + bytes(100)
+    [embedded] = server._tool_content({'content_type': 'application/pdf', 'data': pdf})
+    assert isinstance(embedded, types.EmbeddedResource)
+    assert base64.b64decode(embedded.resource.blob) == pdf
+
+    [image] = server._tool_content({'content_type': 'image/png', 'data': bytes(100)})
+    assert isinstance(image, types.ImageContent)
+
+    assert server._get_resource_templates() == []
+    assert server.blobs.stats()['stored'] == 0
+    server.blobs.close()
@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+import httpx
+
+
+def slow_handler(calls):
+    """Upstream that answers after a pause, so concurrent calls overlap."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={
+            'tenant': request.headers.get('x-tenant'),
+            'language': request.headers.get('accept-language'),
+        })
+
+    return handler
+
+
+def test_calls_differing_in_a_header_parameter_are_not_merged(make_manager):
+    calls = []
+    manager = make_manager(slow_handler(calls))
+
+    async def run():
+        return await asyncio.gather(
+            manager.execute_api_call('getPet', {'id': '5', 'X-Tenant': 'a'}),
+            manager.execute_api_call('getPet', {'id': '5', 'X-Tenant': 'b'}),
+            manager.execute_api_call('getPet', {'id': '5', 'X-Tenant': 'a', 'Accept-Language': 'fr'}),
+        )
+
+    results = asyncio.run(run())
+    assert [json.loads(result['data']) for result in results] == [
+        {'tenant': 'a', 'language': None},
+        {'tenant': 'b', 'language': None},
+        {'tenant': 'a', 'language': 'fr'},
+    ]
+    assert len(calls) == 3
+    assert manager.singleflight.coalesced == 0
+
+
+def test_identical_calls_are_merged(make_manager):
+    calls = []
+    manager = make_manager(slow_handler(calls))
+
+    async def run():
+        return await asyncio.gather(*[
+            manager.execute_api_call('getPet', {'id': '5', 'X-Tenant': 'a'}) for _ in range(3)
+        ])
+
+    results = asyncio.run(run())
+    assert all(json.loads(result['data'])['tenant'] == 'a' for result in results)
+    assert len(calls) == 1
+    assert manager.singleflight.coalesced == 2
@@ -0,0 +1,57 @@
+import asyncio
+
+from hedging import Hedger
+
+SLOW = 0.2
+FAST = 0.005
+
+
+def slow_replica(index: int):
+    """Attempts of one request: from request 20 on, every 10th primary hits a slow replica."""
+    calls = 0
+
+    async def attempt() -> int:
+        nonlocal calls
+        calls += 1
+        slow = calls == 1 and index >= 20 and index % 10 == 0
+        await asyncio.sleep(SLOW if slow else FAST)
+        return index
+
+    return attempt
+
+
+def run_requests(hedger: Hedger, count: int = 120) -> None:
+    async def run():
+        for index in range(count):
+            assert await hedger.run('getPet', slow_replica(index)) == index
+        # Let measured losers finish
+        await asyncio.sleep(SLOW * 1.5)
+
+    asyncio.run(run())
+
+
+def test_hedging_improves_p99_under_a_slow_replica():
+    hedger = Hedger(percentile=90, min_delay=0.01, min_samples=20, max_ratio=0.5, measure_ratio=1.0)
+    run_requests(hedger)
+    stats = hedger.stats()
+
+    assert stats['hedge_wins'] == 10
+    assert stats['measured_losers'] == 10
+    assert stats['censored_losers'] == 0
+    # The slow primaries are in the primary distribution, hedged callers waited far less
+    assert stats['p99_primary_ms'] >= SLOW * 1000 * 0.95
+    assert stats['p99_effective_ms'] < SLOW * 1000 / 2
+    assert stats['p99_improvement_ms'] > SLOW * 1000 / 2
+
+
+def test_cancelled_losers_are_recorded_as_lower_bounds():
+    hedger = Hedger(percentile=90, min_delay=0.01, min_samples=20, max_ratio=0.5, measure_ratio=0.0)
+    run_requests(hedger)
+    stats = hedger.stats()
+
+    assert stats['hedge_wins'] == 10
+    assert stats['measured_losers'] == 0
+    assert stats['censored_losers'] == 10
+    # Every request contributes a primary sample, won or lost
+    assert hedger.primary_latency.count == 120
+    assert stats['p99_primary_ms'] >= stats['p99_effective_ms']
@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+import httpx
+
+CHARGES = [{'id': f'ch_{n}', 'amount': n} for n in range(7)]
+
+
+def list_spec(cursor_param: str) -> dict:
+    """A list operation paged by `cursor_param` and `limit`."""
+    return {
+        'openapi': '3.0.0',
+        'info': {'title': 'Charges', 'version': '1.0.0'},
+        'servers': [{'url': 'http://api.test/v1'}],
+        'paths': {
+            '/charges': {
+                'get': {
+                    'operationId': 'listCharges',
+                    'parameters': [
+                        {'name': 'limit', 'in': 'query', 'schema': {'type': 'integer'}},
+                        {'name': cursor_param, 'in': 'query', 'schema': {'type': 'string'}},
+                    ],
+                },
+            },
+        },
+    }
+
+
+def stripe_handler(calls, cursor_param: str = 'starting_after', ignore_cursor: bool = False):
+    """Pages of CHARGES with `has_more` and no next cursor: the client pages from the last id."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        limit = int(request.url.params.get('limit', 3))
+        after = None if ignore_cursor else request.url.params.get(cursor_param)
+        start = 0 if after is None else [charge['id'] for charge in CHARGES].index(after) + 1
+        page = CHARGES[start:start + limit]
+        return httpx.Response(200, json={'object': 'list', 'data': page, 'has_more': start + limit < len(CHARGES)})
+
+    return handler
+
+
+def list_all(manager, arguments=None):
+    result = asyncio.run(manager.execute_api_call('listCharges_all', arguments or {'limit': 3}))
+    data = result['data']
+    return json.loads(data) if isinstance(data, str) else data
+
+
+def test_has_more_without_cursor_pages_from_the_last_item_id(make_manager):
+    calls = []
+    manager = make_manager(stripe_handler(calls), spec=list_spec('starting_after'))
+    result = list_all(manager)
+
+    assert [item['id'] for item in result['items']] == [charge['id'] for charge in CHARGES]
+    assert result['complete'] is True
+    assert [request.url.params.get('starting_after') for request in calls] == [None, 'ch_2', 'ch_5']
+
+
+def test_has_more_without_a_usable_cursor_is_not_complete(make_manager):
+    calls = []
+    manager = make_manager(stripe_handler(calls, cursor_param='cursor'), spec=list_spec('cursor'))
+    result = list_all(manager)
+
+    assert result['count'] == 3
+    assert result['complete'] is False
+    assert result['stopped_by'] == 'no_next_cursor'
+    assert len(calls) == 1
+
+
+def test_a_cursor_that_does_not_advance_stops(make_manager):
+    calls = []
+    manager = make_manager(stripe_handler(calls, ignore_cursor=True), spec=list_spec('starting_after'))
+    result = list_all(manager)
+
+    assert result['complete'] is False
+    assert result['stopped_by'] == 'no_next_cursor'
+    assert len(calls) == 2
+
+
+THINGS = [{'id': n} for n in range(250)]
+
+THINGS_SPEC = {
+    'openapi': '3.0.0',
+    'info': {'title': 'Things', 'version': '1.0.0'},
+    'servers': [{'url': 'http://api.test/v1'}],
+    'paths': {
+        '/things': {
+            'get': {
+                'operationId': 'listThings',
+                'parameters': [
+                    {'name': 'limit', 'in': 'query', 'schema': {'type': 'integer'}},
+                    {'name': 'offset', 'in': 'query', 'schema': {'type': 'integer'}},
+                ],
+            },
+        },
+    },
+}
+
+
+def capped_handler(calls, cap: int = 100):
+    """Offset pages of THINGS, never more than `cap` per page whatever the limit asked for."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        offset = int(request.url.params.get('offset', 0))
+        limit = min(int(request.url.params.get('limit', cap)), cap)
+        return httpx.Response(200, json={'items': THINGS[offset:offset + limit], 'total': len(THINGS)})
+
+    return handler
+
+
+def test_a_page_size_above_the_server_cap_still_fetches_every_page(make_manager):
+    calls = []
+    manager = make_manager(capped_handler(calls), spec=THINGS_SPEC)
+    result = json.loads(asyncio.run(manager.execute_api_call('listThings_all', {'limit': 500}))['data'])
+
+    assert result['items'] == THINGS
+    assert result['complete'] is True
+    assert sorted(int(request.url.params.get('offset', 0)) for request in calls) == [0, 100, 200]
+
+
+def test_filling_max_items_exactly_is_complete(make_manager):
+    manager = make_manager(stripe_handler([]), spec=list_spec('starting_after'))
+    result = list_all(manager, {'limit': 3, '_max_items': len(CHARGES)})
+
+    assert result['count'] == len(CHARGES)
+    assert result['complete'] is True
+
+
+def test_reaching_max_items_with_more_pages_is_not_complete(make_manager):
+    manager = make_manager(stripe_handler([]), spec=list_spec('starting_after'))
+    result = list_all(manager, {'limit': 3, '_max_items': 6})
+
+    assert result['count'] == 6
+    assert result['complete'] is False
+    assert result['stopped_by'] == 'max_items'
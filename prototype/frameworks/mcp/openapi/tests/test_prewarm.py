@@ -0,0 +1,28 @@
+import json
+
+from click.testing import CliRunner
+
+from conftest import PET_SPEC
+from mcp_server import main
+
+
+def prewarm(tmp_path, config: str):
+    spec_path = tmp_path / 'spec.json'
+    spec_path.write_text(json.dumps(PET_SPEC))
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(config)
+    cache_dir = tmp_path / 'cache'
+    args = [str(spec_path), '--cache-dir', str(cache_dir), '--config', str(config_path), '--prewarm-cache']
+    return CliRunner().invoke(main, args), cache_dir
+
+
+def test_prewarm_writes_the_spec_cache(tmp_path):
+    result, cache_dir = prewarm(tmp_path, "response:\n  json_mode: minify\n")
+    assert result.exit_code == 0, result.output
+    assert any(path.suffix == '.marshal' for path in cache_dir.iterdir())
+
+
+def test_prewarm_builds_with_the_server_config(tmp_path):
+    result, _ = prewarm(tmp_path, "response:\n  json_mode: bogus\n")
+    assert result.exit_code != 0
+    assert 'json_mode' in str(result.exception)
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import httpx
+
+CACHE_CONFIG = {'response_cache': {'enabled': True, 'default_ttl': 60}}
+
+
+def tenant_handler(calls):
+    """Upstream echoing the tenant header, cacheable for a minute."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        body = {'id': request.url.path.rsplit('/', 1)[-1], 'tenant': request.headers.get('x-tenant')}
+        return httpx.Response(200, json=body, headers={'Cache-Control': 'max-age=60'})
+
+    return handler
+
+
+def test_header_parameters_are_part_of_the_key(make_manager):
+    calls = []
+    manager = make_manager(tenant_handler(calls), CACHE_CONFIG)
+
+    async def run():
+        first = await manager.execute_api_call('getPet', {'id': '5'})
+        other_tenant = await manager.execute_api_call('getPet', {'id': '5', 'X-Tenant': 'b'})
+        again = await manager.execute_api_call('getPet', {'id': '5', 'X-Tenant': 'b'})
+        return first, other_tenant, again
+
+    first, other_tenant, again = asyncio.run(run())
+    assert json.loads(first['data'])['tenant'] is None
+    assert json.loads(other_tenant['data'])['tenant'] == 'b'
+    assert again == other_tenant
+    assert len(calls) == 2
+
+
+def test_vary_star_is_not_cached(make_manager):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={'n': len(calls)}, headers={'Cache-Control': 'max-age=60', 'Vary': '*'})
+
+    manager = make_manager(handler, CACHE_CONFIG)
+
+    async def run():
+        await manager.execute_api_call('getPet', {'id': '1'})
+        await manager.execute_api_call('getPet', {'id': '1'})
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_vary_headers_must_match(make_manager):
+    from response_cache import ResponseCache
+
+    cache = ResponseCache(default_ttl=60)
+    calls = []
+
+    async def send(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(
+            200, json={'n': len(calls)}, headers={'Cache-Control': 'max-age=60', 'Vary': 'Accept-Encoding'},
+            request=request,
+        )
+
+    async def run():
+        # The key leaves out Host; a Vary naming a header outside the key is still honored
+        gzip = httpx.Request('GET', 'http://api.test/v1/pets/1', headers={'Accept-Encoding': 'gzip'})
+        await cache.fetch(gzip, send)
+        await cache.fetch(httpx.Request('GET', 'http://api.test/v1/pets/1', headers={'Accept-Encoding': 'gzip'}), send)
+        assert cache._entries[cache.key(gzip)].vary == (('accept-encoding', 'gzip'),)
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+def test_private_responses_are_not_cached(make_manager):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={'owner': 'me'}, headers={'Cache-Control': 'private, max-age=60'})
+
+    manager = make_manager(handler, CACHE_CONFIG)
+
+    async def run():
+        await manager.execute_api_call('getPet', {'id': '5'})
+        await manager.execute_api_call('getPet', {'id': '5'})
+
+    asyncio.run(run())
+    assert len(calls) == 2
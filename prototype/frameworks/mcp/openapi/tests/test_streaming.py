@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import httpx
+
+WATCH_SPEC = {
+    'openapi': '3.0.0',
+    'info': {'title': 'Events', 'version': '1.0.0'},
+    'servers': [{'url': 'http://api.test/v1'}],
+    'paths': {
+        '/events': {
+            'get': {
+                'operationId': 'watchEvents',
+                'responses': {'200': {'content': {'application/x-ndjson': {}}}},
+            },
+        },
+    },
+}
+
+
+def endless_stream(sent):
+    """A watch endpoint: one NDJSON record after another, forever."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        async def records():
+            while True:
+                sent.append(1)
+                yield json.dumps({'id': len(sent), 'type': 'ADDED'}).encode() + b'\n'
+                await asyncio.sleep(0)
+
+        return httpx.Response(200, headers={'Content-Type': 'application/x-ndjson'}, content=records())
+
+    return handler
+
+
+def call(manager):
+    return asyncio.run(asyncio.wait_for(manager.execute_api_call('watchEvents', {}), 10))
+
+
+def test_endless_stream_stops_at_max_items(make_manager):
+    sent = []
+    manager = make_manager(endless_stream(sent), {'streaming': {'max_items': 10}}, spec=WATCH_SPEC)
+    result = json.loads(call(manager)['data'])
+
+    assert [record['id'] for record in result[:10]] == list(range(1, 11))
+    assert 'truncated' in result[10] and 'max_items' in result[10]
+    assert len(sent) < 100
+
+
+def test_endless_stream_stops_at_max_bytes(make_manager):
+    sent = []
+    config = {'streaming': {'max_items': 100000, 'max_bytes': 1000}}
+    manager = make_manager(endless_stream(sent), config, spec=WATCH_SPEC)
+    result = json.loads(call(manager)['data'])
+
+    assert 0 < len(result) - 1 < 100
+    assert 'max_bytes' in result[-1]
+    assert len(sent) < 100
+
+
+def test_finished_stream_is_not_truncated(make_manager):
+    body = b''.join(json.dumps({'id': i}).encode() + b'\n' for i in range(10))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={'Content-Type': 'application/x-ndjson'}, content=body)
+
+    manager = make_manager(handler, {'streaming': {'max_items': 10}}, spec=WATCH_SPEC)
+    result = json.loads(call(manager)['data'])
+    assert result == [{'id': i} for i in range(10)]
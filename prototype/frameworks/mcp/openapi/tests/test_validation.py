@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+import httpx
+from mcp import types
+
+from mcp_server import MCPOpenAPIServer
+
+COUNTER_SPEC = {
+    'openapi': '3.0.0',
+    'info': {'title': 'Counters', 'version': '1.0.0'},
+    'servers': [{'url': 'http://api.test/v1'}],
+    'paths': {
+        '/counters/{n}': {
+            'get': {
+                'operationId': 'getCounter',
+                'parameters': [{'name': 'n', 'in': 'path', 'required': True, 'schema': {'type': 'integer'}}],
+            },
+        },
+    },
+}
+
+
+def echo(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={'path': request.url.path})
+
+
+def call_tool(server: MCPOpenAPIServer, name: str, arguments: dict) -> types.CallToolResult:
+    handler = server.app.request_handlers[types.CallToolRequest]
+    request = types.CallToolRequest(method='tools/call', params=types.CallToolRequestParams(name=name, arguments=arguments))
+    return asyncio.run(handler(request)).root
+
+
+def test_validation_is_chosen_per_api(make_manager):
+    checked = make_manager(echo, spec=COUNTER_SPEC)
+    unchecked = make_manager(echo, {'validation': {'enabled': False}}, spec=COUNTER_SPEC)
+    server = MCPOpenAPIServer(apis={'checked': checked, 'unchecked': unchecked})
+
+    # The SDK's strict schema check stays off, so the compiled validator coerces "42"
+    result = call_tool(server, 'checked__getCounter', {'n': '42'})
+    assert not result.isError
+    assert json.loads(result.content[0].text) == {'path': '/v1/counters/42'}
+
+    # Compiled validation still rejects what it can't coerce
+    result = call_tool(server, 'checked__getCounter', {'n': 'many'})
+    assert 'n' in result.content[0].text and 'integer' in result.content[0].text
+
+    # The API with validation off passes arguments through unchecked
+    result = call_tool(server, 'unchecked__getCounter', {'n': 'many'})
+    assert json.loads(result.content[0].text) == {'path': '/v1/counters/many'}
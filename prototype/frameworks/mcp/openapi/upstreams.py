@@ -0,0 +1,140 @@
+import itertools
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+
+class Upstream:
+    """One server from the spec's `servers` list and its load and health state."""
+
+    __slots__ = (
+        'base_url', 'outstanding', 'consecutive_failures', 'ejected_until',
+        'requests', 'failures', 'ejections',
+    )
+
+    def __init__(self, base_url: str):
+        """Initialize with the server's base URL."""
+        self.base_url = httpx.URL(base_url)
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+
+    def is_ejected(self, now: float) -> bool:
+        """Whether the upstream is currently taken out of rotation."""
+        return now < self.ejected_until
+
+    def rewrite(self, request: httpx.Request, primary: 'Upstream') -> httpx.Request:
+        """Return a copy of a request built against the primary server, aimed at this one."""
+        if self is primary:
+            return request
+
+        # Swap the primary's base path for ours, keeping the operation path and query
+        raw_path = request.url.raw_path
+        primary_prefix = primary.base_url.raw_path.rstrip(b'/')
+        if primary_prefix and raw_path.startswith(primary_prefix):
+            raw_path = raw_path[len(primary_prefix):]
+        raw_path = self.base_url.raw_path.rstrip(b'/') + raw_path
+
+        url = request.url.copy_with(
+            scheme=self.base_url.scheme,
+            host=self.base_url.host,
+            port=self.base_url.port,
+            raw_path=raw_path,
+        )
+        # Let httpx set Host for the new URL
+        headers = [(k, v) for k, v in request.headers.raw if k.lower() != b'host']
+        return httpx.Request(
+            request.method, url, headers=headers, content=request.content, extensions=request.extensions
+        )
+
+
+class UpstreamPool:
+    """Least-outstanding-requests balancing with passive health ejection.
+
+    An upstream that fails `failure_threshold` times in a row (transport error
+    or 5xx) is ejected for `ejection_time` seconds, unless that would take
+    more than `max_ejection_percent` of the pool out of rotation.
+    """
+
+    def __init__(
+        self,
+        base_urls: Sequence[str],
+        failure_threshold: int = 5,
+        ejection_time: float = 30.0,
+        max_ejection_percent: float = 50.0,
+    ):
+        """Initialize with the server base URLs, the first being the primary."""
+        if not base_urls:
+            raise ValueError("No servers to send requests to")
+        self.upstreams = [Upstream(url) for url in base_urls]
+        self.primary = self.upstreams[0]
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+        self.max_ejection_percent = max_ejection_percent
+        # Rotates the starting point so ties don't always go to the primary
+        self._rotation = itertools.cycle(range(len(self.upstreams)))
+
+    def pick(self, exclude: Sequence[Upstream] = ()) -> Optional[Upstream]:
+        """Pick the healthy upstream with the fewest outstanding requests."""
+        now = time.monotonic()
+        start = next(self._rotation)
+        ordered = self.upstreams[start:] + self.upstreams[:start]
+        candidates = [u for u in ordered if u not in exclude]
+        if not candidates:
+            return None
+
+        healthy = [u for u in candidates if not u.is_ejected(now)]
+        # If everything is ejected, keep serving rather than failing every call
+        return min(healthy or candidates, key=lambda u: u.outstanding)
+
+    def begin(self, upstream: Upstream) -> None:
+        """Record a request starting on an upstream."""
+        upstream.outstanding += 1
+        upstream.requests += 1
+
+    def end(self, upstream: Upstream, ok: Optional[bool]) -> None:
+        """Record a request finishing on an upstream and update its health.
+
+        `ok=None` means the outcome says nothing about the upstream (e.g. we cancelled it).
+        """
+        upstream.outstanding -= 1
+        if ok is None:
+            return
+        if ok:
+            upstream.consecutive_failures = 0
+            return
+
+        upstream.failures += 1
+        upstream.consecutive_failures += 1
+        if upstream.consecutive_failures >= self.failure_threshold and self._can_eject():
+            upstream.ejected_until = time.monotonic() + self.ejection_time
+            upstream.ejections += 1
+            upstream.consecutive_failures = 0
+
+    def _can_eject(self) -> bool:
+        """Whether one more upstream may be ejected."""
+        if len(self.upstreams) == 1:
+            return False
+        now = time.monotonic()
+        ejected = sum(1 for u in self.upstreams if u.is_ejected(now))
+        return (ejected + 1) * 100 <= self.max_ejection_percent * len(self.upstreams)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Load and health of every upstream."""
+        now = time.monotonic()
+        return [
+            {
+                'base_url': str(u.base_url),
+                'outstanding': u.outstanding,
+                'requests': u.requests,
+                'failures': u.failures,
+                'ejections': u.ejections,
+                'ejected': u.is_ejected(now),
+            }
+            for u in self.upstreams
+        ]
@@ -0,0 +1,346 @@
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+# Stop collecting after this many problems; the model fixes the first few and retries
+MAX_ERRORS = 10
+
+_INTEGER = re.compile(r'^[+-]?\d+$')
+
+# check(value, path, errors) -> the (possibly coerced) value
+Check = Callable[[Any, str, List['ArgumentProblem']], Any]
+
+
+class ArgumentProblem:
+    """One invalid argument: where it is and what is wrong with it."""
+
+    __slots__ = ('path', 'message')
+
+    def __init__(self, path: str, message: str):
+        """Initialize with the argument path (e.g. `owner.name`, `tags[2]`) and the problem."""
+        self.path = path
+        self.message = message
+
+    def to_dict(self) -> Dict[str, str]:
+        """The problem as a plain dict."""
+        return {'path': self.path, 'message': self.message}
+
+
+class ArgumentError(ValueError):
+    """Tool arguments that don't match the input schema, listed so the model can fix them in one go."""
+
+    def __init__(self, tool: str, problems: List[ArgumentProblem]):
+        """Initialize with the tool name and every problem found."""
+        self.tool = tool
+        self.problems = problems
+        lines = [f"- {problem.path or '(arguments)'}: {problem.message}" for problem in problems]
+        super().__init__(f"Invalid arguments for {tool}:\n" + "\n".join(lines))
+
+
+def _describe(value: Any) -> str:
+    """Short rendering of an offending value for error messages."""
+    text = json.dumps(value, default=str)
+    return text if len(text) <= 40 else text[:37] + '...'
+
+
+def _join(path: str, key: str) -> str:
+    """Path of an object member."""
+    return f"{path}.{key}" if path else key
+
+
+def _coerce(value: Any, expected: str, coerce: bool) -> Any:
+    """Return value as the expected JSON type, or raise TypeError."""
+    if expected == 'string':
+        if isinstance(value, str):
+            return value
+        if coerce and isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+    elif expected == 'integer':
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if coerce and isinstance(value, str) and _INTEGER.match(value.strip()):
+            return int(value.strip())
+    elif expected == 'number':
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+        if coerce and isinstance(value, str):
+            try:
+                return float(value) if not _INTEGER.match(value.strip()) else int(value.strip())
+            except ValueError:
+                pass
+    elif expected == 'boolean':
+        if isinstance(value, bool):
+            return value
+        if coerce and isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+            return value.strip().lower() == 'true'
+    elif expected == 'null':
+        if value is None:
+            return value
+    elif expected == 'array':
+        if isinstance(value, list):
+            return value
+        if coerce and isinstance(value, str) and value.strip().startswith('['):
+            try:
+                parsed = json.loads(value)
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, list):
+                return parsed
+        if coerce and value is not None:
+            # A single item where a list is expected
+            return [value]
+    elif expected == 'object':
+        if isinstance(value, dict):
+            return value
+        if coerce and isinstance(value, str) and value.strip().startswith('{'):
+            # Models sometimes send nested objects as JSON strings
+            try:
+                parsed = json.loads(value)
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, dict):
+                return parsed
+    raise TypeError(expected)
+
+
+class ValidatorCompiler:
+    """Compile JSON Schemas (as produced by generate_input_schema) into checking closures.
+
+    Supports the keywords tool input schemas use: type, enum, const, properties,
+    required, additionalProperties, items, the numeric and length bounds,
+    pattern, allOf/anyOf/oneOf and local `#/$defs/...` refs. Other keywords are
+    not checked and are left for upstream to reject. With `coerce`, values
+    of the wrong JSON type are converted where unambiguous ("42" -> 42).
+    """
+
+    def __init__(self, root: Dict[str, Any], coerce: bool = True):
+        """Initialize with the root schema (holding `$defs`) and the coercion switch."""
+        self.root = root
+        self.coerce = coerce
+        self._refs: Dict[str, Check] = {}
+
+    def compile(self, schema: Any) -> Check:
+        """Compile one schema node."""
+        if not isinstance(schema, dict) or not schema:
+            return lambda value, path, errors: value
+
+        if '$ref' in schema:
+            return self._compile_ref(schema['$ref'])
+
+        checks: List[Check] = []
+        if 'type' in schema:
+            checks.append(self._type_check(schema['type']))
+        if 'enum' in schema:
+            checks.append(self._enum_check(schema['enum']))
+        if 'const' in schema:
+            checks.append(self._enum_check([schema['const']]))
+        if any(key in schema for key in ('properties', 'required', 'additionalProperties')):
+            checks.append(self._object_check(schema))
+        if 'items' in schema or 'minItems' in schema or 'maxItems' in schema:
+            checks.append(self._array_check(schema))
+        if any(key in schema for key in ('minimum', 'maximum', 'exclusiveMinimum', 'exclusiveMaximum')):
+            checks.append(self._range_check(schema))
+        if any(key in schema for key in ('minLength', 'maxLength', 'pattern')):
+            checks.append(self._string_check(schema))
+        for sub_schema in schema.get('allOf', ()):
+            checks.append(self.compile(sub_schema))
+        for keyword in ('anyOf', 'oneOf'):
+            if keyword in schema:
+                # oneOf is checked like anyOf: the first matching branch wins
+                checks.append(self._any_of_check([self.compile(s) for s in schema[keyword]]))
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value: Any, path: str, errors: List[ArgumentProblem]) -> Any:
+            for check in checks:
+                before = len(errors)
+                value = check(value, path, errors)
+                if len(errors) > before:
+                    break
+            return value
+        return check_all
+
+    def _compile_ref(self, ref: str) -> Check:
+        """Compile a local ref once, tolerating recursion."""
+        if ref in self._refs:
+            return self._refs[ref]
+        target: Any = None
+        if ref.startswith('#/'):
+            target = self.root
+            for part in ref[2:].split('/'):
+                target = target.get(part.replace('~1', '/').replace('~0', '~')) if isinstance(target, dict) else None
+        if target is None:
+            # Refs we can't follow are not checked
+            return lambda value, path, errors: value
+
+        compiled: List[Check] = []
+
+        def check_ref(value: Any, path: str, errors: List[ArgumentProblem]) -> Any:
+            return compiled[0](value, path, errors)
+        # Register before compiling so recursive refs find it
+        self._refs[ref] = check_ref
+        compiled.append(self.compile(target))
+        return check_ref
+
+    def _type_check(self, expected: Any) -> Check:
+        """Check (and coerce to) one of the allowed JSON types."""
+        types = [expected] if isinstance(expected, str) else list(expected)
+        # Try exact matches before coercions, e.g. keep "5" a string under ["string", "integer"]
+        coerce = self.coerce
+
+        def check_type(value: Any, path: str, errors: List[ArgumentProblem]) -> Any:
+            for strict in (True, False) if coerce else (True,):
+                for name in types:
+                    try:
+                        return _coerce(value, name, coerce=not strict)
+                    except TypeError:
+                        continue
+            errors.append(ArgumentProblem(path, f"expected {' or '.join(types)}, got {_describe(value)}"))
+            return value
+        return check_type
+
+    def _enum_check(self, allowed: List[Any]) -> Check:
+        """Check a value is one of a fixed set."""
+        def check_enum(value: Any, path: str, errors: List[ArgumentProblem]) -> Any:
+            if value not in allowed:
+                choices = ', '.join(_describe(choice) for choice in allowed[:10])
+                errors.append(ArgumentProblem(path, f"must be one of {choices}, got {_describe(value)}"))
+            return value
+        return check_enum
+
+    def _object_check(self, schema: Dict[str, Any]) -> Check:
+        """Check required members and each member's schema."""
+        properties = {name: self.compile(sub) for name, sub in (schema.get('properties') or {}).items()}
+        required = list(schema.get('required') or ())
+        additional = schema.get('additionalProperties', True)
+        additional_check = self.compile(additional) if isinstance(additional, dict) else None
+
+        def check_object(value: Any, path: str, errors: List[ArgumentProblem]) -> Any:
+            if not isinstance(value, dict):
+                return value
+            for name in required:
+                if name not in value:
+                    errors.append(ArgumentProblem(_join(path, name), "required property is missing"))
+            result = {}
+            for name, member in value.items():
+                if len(errors) >= MAX_ERRORS:
+                    result[name] = member
+                    continue
+                check = properties.get(name, additional_check)
+                if check is not None:
+                    result[name] = check(member, _join(path, name), errors)
+                elif additional is False and name not in properties:
+                    errors.append(ArgumentProblem(_join(path, name), "unknown property"))
+                else:
+                    result[name] = member
+            return result
+        return check_object
+
+    def _array_check(self, schema: Dict[str, Any]) -> Check:
+        """Check array length and each item's schema."""
+        item_check = self.compile(schema['items']) if isinstance(schema.get('items'), dict) else None
+        min_items = schema.get('minItems')
+        max_items = schema.get('maxItems')
+
+        def check_array(value: Any, path: str, errors: List[ArgumentProblem]) -> Any:
+            if not isinstance(value, list):
+                return value
+            if min_items is not None and len(value) < min_items:
+                errors.append(ArgumentProblem(path, f"needs at least {min_items} items, got {len(value)}"))
+            if max_items is not None and len(value) > max_items:
+                errors.append(ArgumentProblem(path, f"takes at most {max_items} items, got {len(value)}"))
+            if item_check is None:
+                return value
+            return [item_check(item, f"{path}[{index}]", errors) for index, item in enumerate(value)]
+        return check_array
+
+    def _range_check(self, schema: Dict[str, Any]) -> Check:
+        """Check numeric bounds (OpenAPI 3.0 boolean exclusive bounds included)."""
+        minimum, maximum = schema.get('minimum'), schema.get('maximum')
+        exclusive_min, exclusive_max = schema.get('exclusiveMinimum'), schema.get('exclusiveMaximum')
+        if exclusive_min is True:
+            exclusive_min, minimum = minimum, None
+        if exclusive_max is True:
+            exclusive_max, maximum = maximum, None
+        bounds = [
+            (bound, test, message) for bound, test, message in (
+                (minimum, lambda v, b: v >= b, "must be >= {}"),
+                (maximum, lambda v, b: v <= b, "must be <= {}"),
+                (exclusive_min, lambda v, b: v > b, "must be > {}"),
+                (exclusive_max, lambda v, b: v < b, "must be < {}"),
+            )
+            if isinstance(bound, (int, float)) and not isinstance(bound, bool)
+        ]
+
+        def check_range(value: Any, path: str, errors: List[ArgumentProblem]) -> Any:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                for bound, test, message in bounds:
+                    if not test(value, bound):
+                        errors.append(ArgumentProblem(path, f"{message.format(bound)}, got {value}"))
+                        break
+            return value
+        return check_range
+
+    def _string_check(self, schema: Dict[str, Any]) -> Check:
+        """Check string length and pattern."""
+        min_length, max_length = schema.get('minLength'), schema.get('maxLength')
+        pattern = None
+        if schema.get('pattern'):
+            try:
+                pattern = re.compile(schema['pattern'])
+            except re.error:
+                # ECMA-262 patterns Python can't compile are left unchecked
+                pattern = None
+
+        def check_string(value: Any, path: str, errors: List[ArgumentProblem]) -> Any:
+            if not isinstance(value, str):
+                return value
+            if min_length is not None and len(value) < min_length:
+                errors.append(ArgumentProblem(path, f"must be at least {min_length} characters"))
+            elif max_length is not None and len(value) > max_length:
+                errors.append(ArgumentProblem(path, f"must be at most {max_length} characters"))
+            elif pattern is not None and not pattern.search(value):
+                errors.append(ArgumentProblem(path, f"must match {pattern.pattern}"))
+            return value
+        return check_string
+
+    def _any_of_check(self, branches: List[Check]) -> Check:
+        """Accept the value as coerced by the first branch it matches."""
+        def check_any_of(value: Any, path: str, errors: List[ArgumentProblem]) -> Any:
+            first_problems: Optional[List[ArgumentProblem]] = None
+            for branch in branches:
+                problems: List[ArgumentProblem] = []
+                result = branch(value, path, problems)
+                if not problems:
+                    return result
+                if first_problems is None:
+                    first_problems = problems
+            errors.append(ArgumentProblem(
+                path,
+                "doesn't match any allowed schema"
+                + (f" (first: {first_problems[0].message})" if first_problems else ""),
+            ))
+            return value
+        return check_any_of
+
+
+class ArgumentValidator:
+    """A tool's input schema compiled once, checking and coercing arguments before dispatch."""
+
+    __slots__ = ('tool', '_check')
+
+    def __init__(self, tool: str, schema: Dict[str, Any], coerce: bool = True):
+        """Compile the schema of the named tool."""
+        self.tool = tool
+        self._check = ValidatorCompiler(schema, coerce=coerce).compile(schema)
+
+    def __call__(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the arguments with coercions applied, or raise ArgumentError listing every problem."""
+        problems: List[ArgumentProblem] = []
+        result = self._check(arguments, '', problems)
+        if problems:
+            raise ArgumentError(self.tool, problems[:MAX_ERRORS])
+        return result
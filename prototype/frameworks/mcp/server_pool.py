@@ -0,0 +1,317 @@
+"""Warm pool of pre-spawned, initialized stdio MCP server processes.
+
+Spawning `python server.py` costs interpreter start, imports and MCP
+initialization before a session can send its first request. The pool keeps
+`size` servers initialized and hands them out to new client sessions, so a
+session starts with a round trip instead of a process launch.
+
+Servers are recycled after `max_uses` leases, and dropped when they stop
+answering pings. Only pool servers whose sessions keep no per-client state,
+or use max_uses=1 for a fresh (but still pre-spawned) server per client.
+
+Compare pool hits with cold spawns:
+
+    python server_pool.py tool_server.py --size 4 --max-uses 10 --sessions 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+# Warm servers kept ready
+POOL_SIZE = 4
+# Leases a server process serves before it's replaced
+MAX_USES = 50
+# Seconds a server may take to start and initialize
+SPAWN_TIMEOUT = 30.0
+# Idle servers are pinged this often so crashed ones are replaced before they're handed out
+HEALTH_INTERVAL = 15.0
+PING_TIMEOUT = 5.0
+
+MessageHandler = Callable[[Any], Awaitable[None]]
+
+
+def describe_error(error: BaseException) -> str:
+    """A one-line description of an error, looking inside exception groups."""
+    while isinstance(error, BaseExceptionGroup) and error.exceptions:
+        error = error.exceptions[0]
+    return str(error) or type(error).__name__
+
+
+class PooledServer:
+    """One initialized stdio server, its process and session held open by a task of its own."""
+
+    def __init__(self, params: StdioServerParameters):
+        self.params = params
+        self.session: Optional[ClientSession] = None
+        self.uses = 0
+        self.error: Optional[BaseException] = None
+        # Notifications go to whichever session holds the lease
+        self.message_handler: Optional[MessageHandler] = None
+        self.ready = asyncio.Event()
+        self.stop = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Spawn the process and initialize the session in the background."""
+        self.task = asyncio.create_task(self._run(), name=f"pooled-{self.params.command}")
+
+    async def _run(self):
+        """Hold the process and session open until stopped."""
+        try:
+            async with stdio_client(self.params) as (read, write):
+                async with ClientSession(read, write, message_handler=self._forward) as session:
+                    await asyncio.wait_for(session.initialize(), SPAWN_TIMEOUT)
+                    self.session = session
+                    self.ready.set()
+                    await self.stop.wait()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.session = None
+            self.ready.set()
+
+    async def _forward(self, message):
+        """Pass a server message on to the current lessee."""
+        if self.message_handler is not None:
+            await self.message_handler(message)
+
+    async def wait_ready(self) -> bool:
+        """Wait for the server to start; False if it failed to."""
+        await self.ready.wait()
+        return self.session is not None
+
+    async def alive(self) -> bool:
+        """Whether the server still answers a ping."""
+        if self.session is None:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), PING_TIMEOUT)
+            return True
+        except Exception as e:
+            self.error = e
+            return False
+
+    async def close(self):
+        """Close the session and end the process."""
+        self.stop.set()
+        if self.task is not None:
+            await asyncio.gather(self.task, return_exceptions=True)
+
+
+class ServerPool:
+    """Keeps `size` initialized stdio servers warm and leases them to client sessions."""
+
+    def __init__(self, params: StdioServerParameters, size: int = POOL_SIZE, max_uses: int = MAX_USES):
+        self.params = params
+        self.size = size
+        self.max_uses = max_uses
+        self.idle: Deque[PooledServer] = deque()
+        self.starting: Set[PooledServer] = set()
+        self.closed = False
+        # Seconds to hand out a server, by whether it came from the pool
+        self.hit_latencies: List[float] = []
+        self.miss_latencies: List[float] = []
+        self.recycled = 0
+        self.crashed = 0
+        self._tasks: Set[asyncio.Task] = set()
+        self._health: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Spawn the warm servers concurrently and wait for them."""
+        self._replenish()
+        await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        # The pool may have been closed while it warmed up
+        if not self.closed:
+            self._health = asyncio.create_task(self._check_health())
+
+    def _background(self, coroutine: Awaitable[None]):
+        """Run a coroutine in the background, keeping a reference until it's done."""
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _replenish(self):
+        """Spawn servers until the warm ones (idle and starting) number `size`."""
+        while not self.closed and len(self.idle) + len(self.starting) < self.size:
+            server = PooledServer(self.params)
+            server.start()
+            self.starting.add(server)
+            self._background(self._warm(server))
+
+    async def _warm(self, server: PooledServer):
+        """Move a spawned server to the idle queue once it's initialized."""
+        ok = await server.wait_ready()
+        self.starting.discard(server)
+        # Released servers may have filled the pool meanwhile
+        if ok and not self.closed and len(self.idle) < self.size:
+            self.idle.append(server)
+        else:
+            # Failed spawns aren't retried here, the next acquire spawns cold
+            self.crashed += not ok
+            await server.close()
+
+    async def _check_health(self):
+        """Ping idle servers, replacing the ones that died."""
+        while True:
+            await asyncio.sleep(HEALTH_INTERVAL)
+            for server in list(self.idle):
+                if not await server.alive() and server in self.idle:
+                    self.idle.remove(server)
+                    self.crashed += 1
+                    self._background(server.close())
+            self._replenish()
+
+    async def acquire(self, message_handler: Optional[MessageHandler] = None) -> PooledServer:
+        """A ready server: a warm one if any, else one spawned now.
+
+        Its session has already been initialized; don't call initialize() on it again.
+        """
+        if self.closed:
+            raise RuntimeError("The server pool is closed")
+        start = time.perf_counter()
+        server = None
+        while self.idle:
+            candidate = self.idle.popleft()
+            if candidate.session is not None:
+                server = candidate
+                break
+            # Its process exited since the last health check
+            self.crashed += 1
+            self._background(candidate.close())
+
+        if server is not None:
+            self.hit_latencies.append(time.perf_counter() - start)
+        else:
+            server = PooledServer(self.params)
+            server.start()
+            if not await server.wait_ready():
+                raise ConnectionError(f"MCP server {self.params.command} {' '.join(self.params.args)} failed to start: {describe_error(server.error)}")
+            self.miss_latencies.append(time.perf_counter() - start)
+        # Warm a replacement for the next session
+        self._replenish()
+        server.message_handler = message_handler
+        return server
+
+    def release(self, server: PooledServer):
+        """Return a leased server, recycling it if it's used up or no longer answers."""
+        server.message_handler = None
+        server.uses += 1
+        if self.closed or server.uses >= self.max_uses:
+            self.recycled += not self.closed
+            self._background(server.close())
+        else:
+            self._background(self._return(server))
+
+    async def _return(self, server: PooledServer):
+        """Put a released server back in the pool if it's healthy and there's room."""
+        if not await server.alive():
+            self.crashed += 1
+            await server.close()
+        elif self.closed or len(self.idle) >= self.size:
+            await server.close()
+        else:
+            self.idle.append(server)
+        self._replenish()
+
+    @asynccontextmanager
+    async def lease(self, message_handler: Optional[MessageHandler] = None) -> AsyncIterator[ClientSession]:
+        """An initialized session for the duration of the block.
+
+        The pool ran the initialize handshake when it spawned the server, so
+        use the session as it is; calling initialize() again is a protocol error.
+        """
+        server = await self.acquire(message_handler)
+        try:
+            yield server.session
+        finally:
+            self.release(server)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters and hand-out latencies in milliseconds."""
+        def median_ms(latencies: List[float]) -> Optional[float]:
+            return round(statistics.median(latencies) * 1000, 3) if latencies else None
+
+        return {
+            "idle": len(self.idle),
+            "starting": len(self.starting),
+            "hits": len(self.hit_latencies),
+            "misses": len(self.miss_latencies),
+            "recycled": self.recycled,
+            "crashed": self.crashed,
+            "hit_ms_p50": median_ms(self.hit_latencies),
+            "miss_ms_p50": median_ms(self.miss_latencies),
+        }
+
+    async def close(self):
+        """Stop every idle and starting server; leased ones stop when released."""
+        self.closed = True
+        if self._health is not None:
+            self._health.cancel()
+        servers = list(self.idle) + list(self.starting)
+        self.idle.clear()
+        await asyncio.gather(*[server.close() for server in servers])
+        await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+def summarize(label: str, latencies: List[float]) -> str:
+    """Median, p95 and mean of latencies in milliseconds."""
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"{label:12s} p50 {statistics.median(ordered) * 1000:8.1f} ms | p95 {p95 * 1000:8.1f} ms | "
+        f"mean {statistics.mean(ordered) * 1000:8.1f} ms ({len(ordered)} sessions)"
+    )
+
+
+async def compare(script: str, size: int, max_uses: int, sessions: int):
+    """Time sessions up to their first response: cold spawns, then leases from a warm pool."""
+    params = StdioServerParameters(command="python" if script.endswith(".py") else "node", args=[script])
+
+    cold = []
+    for _ in range(sessions):
+        start = time.perf_counter()
+        async with stdio_client(params) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                await session.list_tools()
+                cold.append(time.perf_counter() - start)
+
+    pool = ServerPool(params, size=size, max_uses=max_uses)
+    start = time.perf_counter()
+    await pool.start()
+    print(f"Pool of {size} warmed up in {(time.perf_counter() - start) * 1000:.0f} ms")
+    pooled = []
+    try:
+        for _ in range(sessions):
+            start = time.perf_counter()
+            async with pool.lease() as session:
+                await session.list_tools()
+                pooled.append(time.perf_counter() - start)
+            # A new session arriving a little later, as they do
+            await asyncio.sleep(0.05)
+        print(summarize("cold spawn", cold))
+        print(summarize("pool lease", pooled))
+        print(f"Speedup x{statistics.median(cold) / statistics.median(pooled):.0f}; pool stats: {pool.stats()}")
+    finally:
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare session startup from a warm server pool with cold spawns")
+    parser.add_argument("script", help="Server script (.py or .js)")
+    parser.add_argument("--size", type=int, default=POOL_SIZE, help="Warm servers kept ready")
+    parser.add_argument("--max-uses", type=int, default=MAX_USES, help="Leases per server process before it's replaced")
+    parser.add_argument("--sessions", type=int, default=20, help="Sessions started each way")
+    args = parser.parse_args()
+    asyncio.run(compare(args.script, args.size, args.max_uses, args.sessions))
+
+
+if __name__ == "__main__":
+    main()